@@ -0,0 +1,210 @@
+"""
+Benchmark de arranque
+Mide en procesos nuevos cuánto tarda en importarse cada punto de entrada
+(python -X importtime), qué dependencias pesadas se cargan al arrancar y,
+opcionalmente, el tiempo hasta que la ventana de main2.py se dibuja.
+
+Uso:
+    python EnvPrueba/benchmark_arranque.py
+    python EnvPrueba/benchmark_arranque.py --modulos main2,servicio,core --repeticiones 5
+    python EnvPrueba/benchmark_arranque.py --ventana --salida logs/bench/arranque.json
+
+El texto crudo de -X importtime queda en logs/bench/importtime_<modulo>.txt
+(se puede abrir con 'tuna' para verlo como árbol).
+"""
+
+import argparse
+import json
+import logging
+import os
+import re
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+RAIZ_PROYECTO = Path(__file__).resolve().parent.parent
+if str(RAIZ_PROYECTO) not in sys.path:
+    sys.path.insert(0, str(RAIZ_PROYECTO))
+
+from utils.logger_prueba import setup_logger
+
+# Dependencias que no deberían importarse antes de mostrar la ventana
+PESADAS = ('torch', 'ultralytics', 'cv2', 'PIL', 'numpy')
+
+LINEA_IMPORTTIME = re.compile(r'^import time:\s+(\d+)\s+\|\s+(\d+)\s+\|(\s+)(\S+)')
+
+# Ventana: se imprime el instante (epoch) del primer ciclo ocioso de Tk
+SCRIPT_VENTANA = """
+import time, tkinter as tk
+import main2
+root = tk.Tk()
+app = main2.SistemaPLCYOLO(root)
+root.protocol("WM_DELETE_WINDOW", app.cerrar)
+def _dibujada():
+    print("VENTANA", time.time(), flush=True)
+    root.after({espera_ms}, app.cerrar)
+root.after_idle(_dibujada)
+root.mainloop()
+"""
+
+
+# ==========================================================
+# === 1. IMPORT TIME ===
+# ==========================================================
+
+def parsear_importtime(texto: str):
+    """
+    Convierte la salida de -X importtime en registros.
+
+    Returns:
+        Lista de {'modulo', 'propio_ms', 'acumulado_ms', 'nivel'} (nivel 0 = import directo)
+    """
+    registros = []
+    for linea in texto.splitlines():
+        coincidencia = LINEA_IMPORTTIME.match(linea)
+        if not coincidencia:
+            continue
+        propio, acumulado, sangria, modulo = coincidencia.groups()
+        registros.append({
+            'modulo': modulo,
+            'propio_ms': int(propio) / 1000.0,
+            'acumulado_ms': int(acumulado) / 1000.0,
+            'nivel': (len(sangria) - 1) // 2,
+        })
+    return registros
+
+
+def medir_import(modulo: str, repeticiones: int, directorio_raw: Path):
+    """
+    Importa 'modulo' en 'repeticiones' procesos nuevos.
+
+    Returns:
+        Diccionario con tiempos de proceso, total de imports, top y pesadas cargadas
+    """
+    comando = [sys.executable, '-X', 'importtime', '-c', f'import {modulo}']
+    tiempos_proceso = []
+    totales = []
+    registros = []
+    for i in range(repeticiones):
+        t_inicio = time.perf_counter()
+        proceso = subprocess.run(comando, cwd=str(RAIZ_PROYECTO), capture_output=True, text=True)
+        tiempos_proceso.append((time.perf_counter() - t_inicio) * 1000.0)
+        if proceso.returncode != 0:
+            error = proceso.stderr.strip().splitlines()[-1] if proceso.stderr.strip() else 'sin detalle'
+            return {'modulo': modulo, 'error': error}
+        registros = parsear_importtime(proceso.stderr)
+        totales.append(sum(r['acumulado_ms'] for r in registros if r['nivel'] == 0))
+        if i == 0:
+            (directorio_raw / f"importtime_{modulo}.txt").write_text(proceso.stderr, encoding='utf-8')
+
+    # El detalle es el de la última corrida (caché de disco caliente, más estable)
+    importados = {r['modulo'] for r in registros}
+    return {
+        'modulo': modulo,
+        'proceso_ms': {
+            'primera': round(tiempos_proceso[0], 1),
+            'min': round(min(tiempos_proceso), 1),
+            'media': round(sum(tiempos_proceso) / len(tiempos_proceso), 1),
+        },
+        'imports_ms': {'primera': round(totales[0], 1), 'min': round(min(totales), 1)},
+        'modulos_importados': len(registros),
+        'pesadas_al_importar': [p for p in PESADAS if p in importados],
+        'top_acumulado': [{'modulo': r['modulo'], 'ms': round(r['acumulado_ms'], 1)}
+                          for r in sorted(registros, key=lambda r: -r['acumulado_ms'])[:15]],
+        'top_propio': [{'modulo': r['modulo'], 'ms': round(r['propio_ms'], 1)}
+                       for r in sorted(registros, key=lambda r: -r['propio_ms'])[:15]],
+    }
+
+
+# ==========================================================
+# === 2. TIEMPO HASTA LA VENTANA ===
+# ==========================================================
+
+def medir_ventana(espera_ms: int, repeticiones: int):
+    """
+    Lanza main2.py y mide desde el inicio del proceso hasta el primer ciclo
+    ocioso de Tk (ventana dibujada). Requiere entorno gráfico.
+
+    Returns:
+        Diccionario con los tiempos, o {'error'} si no se pudo medir
+    """
+    tiempos = []
+    script = SCRIPT_VENTANA.format(espera_ms=espera_ms)
+    for _ in range(repeticiones):
+        t_inicio = time.time()
+        proceso = subprocess.run([sys.executable, '-c', script], cwd=str(RAIZ_PROYECTO),
+                                 capture_output=True, text=True, timeout=120)
+        marcas = [l for l in proceso.stdout.splitlines() if l.startswith('VENTANA ')]
+        if not marcas:
+            error = proceso.stderr.strip().splitlines()[-1] if proceso.stderr.strip() else 'sin detalle'
+            return {'error': error}
+        tiempos.append((float(marcas[0].split()[1]) - t_inicio) * 1000.0)
+    return {
+        'primera_ms': round(tiempos[0], 1),
+        'min_ms': round(min(tiempos), 1),
+        'media_ms': round(sum(tiempos) / len(tiempos), 1),
+    }
+
+
+# ==========================================================
+# === 3. PUNTO DE ENTRADA ===
+# ==========================================================
+
+def _parsear_argumentos(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark de arranque (import time y ventana)")
+    parser.add_argument('--modulos', default='main2,servicio,core',
+                        help="Módulos a importar, separados por coma")
+    parser.add_argument('--repeticiones', type=int, default=3, help="Procesos por módulo")
+    parser.add_argument('--ventana', action='store_true', help="Medir también el tiempo hasta la ventana de main2")
+    parser.add_argument('--espera-ventana-ms', type=int, default=3000,
+                        help="Tiempo con la ventana abierta antes de cerrarla (deja correr la precarga)")
+    parser.add_argument('--salida', default=None, help="Archivo JSON del reporte (por defecto logs/bench/)")
+    return parser.parse_args(argv)
+
+
+def main(argv=None) -> int:
+    args = _parsear_argumentos(argv)
+    logger = setup_logger('BenchmarkArranque', nivel=logging.INFO)
+
+    salida = Path(args.salida or f"logs/bench/arranque_{time.strftime('%Y%m%d_%H%M%S')}.json")
+    salida.parent.mkdir(parents=True, exist_ok=True)
+
+    resultados = []
+    for modulo in [m.strip() for m in args.modulos.split(',') if m.strip()]:
+        logger.info(f"🏁 import {modulo} ({args.repeticiones} procesos)...")
+        resultado = medir_import(modulo, max(1, args.repeticiones), salida.parent)
+        resultados.append(resultado)
+        if 'error' in resultado:
+            logger.error(f"   ❌ {resultado['error']}")
+            continue
+        pesadas = ', '.join(resultado['pesadas_al_importar']) or 'ninguna'
+        logger.info(f"   proceso {resultado['proceso_ms']['min']} ms (primera {resultado['proceso_ms']['primera']} ms) | "
+                    f"imports {resultado['imports_ms']['min']} ms | {resultado['modulos_importados']} módulos | "
+                    f"pesadas: {pesadas}")
+        for entrada in resultado['top_acumulado'][:5]:
+            logger.info(f"      {entrada['ms']:8.1f} ms  {entrada['modulo']}")
+
+    reporte = {
+        'fecha': time.strftime('%Y-%m-%d %H:%M:%S'),
+        'python': sys.version.split()[0],
+        'plataforma': sys.platform,
+        'imports': resultados,
+    }
+    if args.ventana:
+        logger.info("🪟 Midiendo tiempo hasta la ventana de main2...")
+        reporte['ventana'] = medir_ventana(args.espera_ventana_ms, max(1, args.repeticiones))
+        if 'error' in reporte['ventana']:
+            logger.error(f"   ❌ {reporte['ventana']['error']}")
+        else:
+            logger.info(f"   ventana dibujada en {reporte['ventana']['min_ms']} ms "
+                        f"(primera {reporte['ventana']['primera_ms']} ms)")
+
+    with open(salida, 'w', encoding='utf-8') as f:
+        json.dump(reporte, f, indent=2, ensure_ascii=False)
+    logger.info(f"📄 Reporte: {salida}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,305 @@
+"""
+Benchmark de ciclo completo con PLC simulado
+Mide el tiempo real desde que el PLC escribe la solicitud (99) en el registro
+de trigger hasta que el sistema escribe la respuesta, con el pipeline real:
+MotorInspeccion + PLCController (pymcprotocol) + VisionProcessor + FuenteCamara
+contra el servidor MC 3E local de plc_simulado.py.
+
+Uso:
+    python EnvPrueba/benchmark_handshake.py --video-sup videoCS.mp4 --video-lat videoCL.mp4
+    python EnvPrueba/benchmark_handshake.py --tasas 0.5,1,2,4 --duracion-s 60 --plazo-ms 400 \\
+        --poll-ms 10 --post-ms 0 --salida logs/bench/handshake.json
+    python EnvPrueba/benchmark_handshake.py --modelo-sup stub:superior --modelo-lat stub:lateral \\
+        --video-sup sintetico --video-lat sintetico
+"""
+
+import argparse
+import json
+import logging
+import os
+import sys
+import tempfile
+import threading
+import time
+from pathlib import Path
+
+RAIZ_PROYECTO = Path(__file__).resolve().parent.parent
+if str(RAIZ_PROYECTO) not in sys.path:
+    sys.path.insert(0, str(RAIZ_PROYECTO))
+
+from core.plc_controller import PLCController
+from core.camera_source import FuenteCamara
+from core.inspection_engine import MotorInspeccion
+from utils.logger_prueba import setup_logger
+
+from benchmark_replay import percentiles, preparar_video
+from plc_simulado import PLCSimulado, _numero_dispositivo
+
+
+# ==========================================================
+# === 1. MEDICIÓN DEL HANDSHAKE ===
+# ==========================================================
+
+class MedicionHandshake:
+    """
+    Lleva la cuenta de solicitudes y respuestas del lado del PLC.
+
+    - disparar(): escribe 99 si no hay una solicitud pendiente; si la hay, la
+      ranura se cuenta como perdida (el PLC real tendría que esperar)
+    - al_escribir(): callback del PLC simulado; una escritura != 99 en el
+      registro de trigger cierra la solicitud pendiente
+    """
+
+    def __init__(self, plc: PLCSimulado, dispositivo_trigger: str, valor_solicitud: int, plazo_ms: float):
+        self.plc = plc
+        self.dispositivo_trigger = dispositivo_trigger
+        self.num_trigger = _numero_dispositivo(dispositivo_trigger)
+        self.valor_solicitud = valor_solicitud
+        self.plazo_ms = plazo_ms
+        self._lock = threading.Lock()
+        self.reiniciar()
+
+    def reiniciar(self) -> None:
+        with self._lock:
+            self.t_pendiente = None
+            self.disparos = 0
+            self.perdidos = 0
+            self.tardios = 0
+            self.espurias = 0
+            self.latencias_ms = []
+            self.codigos = {}
+
+    def disparar(self) -> bool:
+        with self._lock:
+            if self.t_pendiente is not None:
+                self.perdidos += 1
+                return False
+            self.disparos += 1
+            self.t_pendiente = time.perf_counter()
+        self.plc.escribir(self.dispositivo_trigger, self.valor_solicitud)
+        return True
+
+    def al_escribir(self, inicio: int, valores, t_escritura: float) -> None:
+        if inicio != self.num_trigger or valores[0] == self.valor_solicitud:
+            return
+        with self._lock:
+            if self.t_pendiente is None:
+                self.espurias += 1
+                return
+            latencia_ms = (t_escritura - self.t_pendiente) * 1000.0
+            self.t_pendiente = None
+            self.latencias_ms.append(latencia_ms)
+            if latencia_ms > self.plazo_ms:
+                self.tardios += 1
+            self.codigos[str(valores[0])] = self.codigos.get(str(valores[0]), 0) + 1
+
+    def extraer_latencias(self) -> list:
+        """Retorna las latencias acumuladas y vacía la lista (mediciones por intervalo)"""
+        with self._lock:
+            latencias, self.latencias_ms = self.latencias_ms, []
+        return latencias
+
+    def esperar_pendiente(self, timeout_s: float) -> None:
+        limite = time.monotonic() + timeout_s
+        while self.t_pendiente is not None and time.monotonic() < limite:
+            time.sleep(0.005)
+
+
+def preparar_plc_simulado(ruta_config_plc: str, latencia_s: float, plazo_ms: float):
+    """
+    Arranca el PLC simulado y escribe una copia temporal de la configuración
+    del PLCController con las mismas direcciones apuntando al simulado.
+
+    Returns:
+        (plc, medicion, ruta_config_temporal) - borrar la ruta al terminar
+    """
+    try:
+        with open(ruta_config_plc, 'r', encoding='utf-8') as f:
+            config_plc = json.load(f)
+    except FileNotFoundError:
+        config_plc = {}
+    direcciones = config_plc.get('direcciones', {})
+    codigos = config_plc.get('codigos_estado', {})
+
+    plc = PLCSimulado(latencia_s=latencia_s)
+    medicion = MedicionHandshake(plc, direcciones.get('dispositivo_trigger', 'D701'),
+                                 codigos.get('valor_solicitud', 99), plazo_ms)
+    plc.al_escribir = medicion.al_escribir
+    config_plc.setdefault('conexion', {}).update({'ip_plc': '127.0.0.1', 'puerto_plc': plc.iniciar()})
+    descriptor, ruta_temporal = tempfile.mkstemp(prefix='plc_simulado_', suffix='.json')
+    with os.fdopen(descriptor, 'w', encoding='utf-8') as f:
+        json.dump(config_plc, f)
+    return plc, medicion, ruta_temporal
+
+
+# ==========================================================
+# === 2. EJECUCIÓN POR TASA DE DISPAROS ===
+# ==========================================================
+
+def ejecutar_tasa(tasa_hz: float, duracion_s: float, medicion: MedicionHandshake,
+                  config: dict, logger, vision_processor, fuente_sup, fuente_lat, config_plc: str) -> dict:
+    """Corre el motor real contra el PLC simulado disparando a 'tasa_hz' durante 'duracion_s'"""
+    controlador = PLCController(config_plc)
+    if not controlador.conectar():
+        raise ConnectionError("No se pudo conectar al PLC simulado")
+
+    motor = MotorInspeccion(config, logger, vision_processor, fuente_sup, fuente_lat,
+                            controlador_plc=controlador, modo_simulacion=False)
+    escrituras_fallidas = 0
+    motor.start()
+
+    # Esperar a que el motor termine la calibración y empiece a consultar
+    while motor.is_alive() and not vision_processor.calibrado_y:
+        time.sleep(0.05)
+    time.sleep(0.2)
+
+    medicion.reiniciar()
+    periodo = 1.0 / tasa_hz
+    t_inicio = time.monotonic()
+    t_siguiente = t_inicio
+    while time.monotonic() - t_inicio < duracion_s and motor.is_alive():
+        medicion.disparar()
+        t_siguiente += periodo
+        espera = t_siguiente - time.monotonic()
+        if espera > 0:
+            time.sleep(espera)
+    duracion_real_s = time.monotonic() - t_inicio
+    medicion.esperar_pendiente(max(1.0, medicion.plazo_ms / 1000.0 * 2))
+
+    motor.detener()
+    motor.join(timeout=10.0)
+    while not motor.eventos.empty():
+        if motor.eventos.get_nowait()['tipo'] == 'escritura_fallida':
+            escrituras_fallidas += 1
+    controlador.desconectar()
+    # La ranura sin respuesta al final no es un disparo perdido, es una solicitud sin atender
+    sin_respuesta = 1 if medicion.t_pendiente is not None else 0
+    medicion.plc.escribir(medicion.dispositivo_trigger, 0)
+
+    return {
+        'tasa_objetivo_hz': tasa_hz,
+        'duracion_s': round(duracion_real_s, 3),
+        'disparos': medicion.disparos,
+        'respuestas': len(medicion.latencias_ms),
+        'perdidos': medicion.perdidos,
+        'tardios': medicion.tardios,
+        'sin_respuesta': sin_respuesta,
+        'respuestas_espurias': medicion.espurias,
+        'escrituras_fallidas': escrituras_fallidas,
+        'respuestas_por_s': round(len(medicion.latencias_ms) / duracion_real_s, 3) if duracion_real_s else 0.0,
+        'latencia_ms': percentiles(medicion.latencias_ms),
+        'codigos_respuesta': dict(medicion.codigos),
+        'motor_ciclos': motor.ciclos,
+    }
+
+
+# ==========================================================
+# === 3. PUNTO DE ENTRADA ===
+# ==========================================================
+
+def _parsear_argumentos(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark solicitud→respuesta con PLC simulado (MC 3E)")
+    parser.add_argument('--config', default='config/plc_config_prueba.json', help="Configuración del sistema")
+    parser.add_argument('--config-plc', default='config/plc_config.json',
+                        help="Direcciones y códigos del PLC (la conexión se redirige al simulado)")
+    parser.add_argument('--modelo-sup', default=None,
+                        help="Modelo Superior o 'stub:superior' (por defecto 'servicio.modelo_sup')")
+    parser.add_argument('--modelo-lat', default=None,
+                        help="Modelo Lateral o 'stub:lateral' (por defecto 'servicio.modelo_lat')")
+    parser.add_argument('--video-sup', default='videoCS.mp4', help="Video Superior o 'sintetico[:N]' (se repite como cámara en vivo)")
+    parser.add_argument('--video-lat', default='videoCL.mp4', help="Video Lateral o 'sintetico[:N]' (se repite como cámara en vivo)")
+    parser.add_argument('--tasas', default='0.5,1,2', help="Tasas de solicitudes a probar, en Hz (ej. 0.5,1,2,4)")
+    parser.add_argument('--duracion-s', type=float, default=30.0, help="Duración de cada tasa")
+    parser.add_argument('--plazo-ms', type=float, default=500.0, help="Respuesta más lenta aceptable")
+    parser.add_argument('--poll-ms', type=float, default=None, help="Sobrescribe sistema.delay_lectura_plc_ms")
+    parser.add_argument('--post-ms', type=float, default=None, help="Sobrescribe sistema.delay_post_proceso_ms")
+    parser.add_argument('--latencia-plc-ms', type=float, default=0.0, help="Retardo agregado por respuesta MC")
+    parser.add_argument('--salida', default=None, help="Archivo JSON del reporte (por defecto logs/bench/)")
+    return parser.parse_args(argv)
+
+
+def main(argv=None) -> int:
+    args = _parsear_argumentos(argv)
+    logger = setup_logger('BenchmarkHandshake', nivel=logging.INFO)
+
+    with open(args.config, 'r', encoding='utf-8') as f:
+        config = json.load(f)
+    config.setdefault('vision', {})['generar_anotaciones'] = False
+    sistema = config.setdefault('sistema', {})
+    if args.poll_ms is not None:
+        sistema['delay_lectura_plc_ms'] = args.poll_ms
+    if args.post_ms is not None:
+        sistema['delay_post_proceso_ms'] = args.post_ms
+
+    # Configuración del PLCController: mismas direcciones, conexión al simulado
+    plc, medicion, ruta_config_plc = preparar_plc_simulado(args.config_plc, args.latencia_plc_ms / 1000.0,
+                                                           args.plazo_ms)
+
+    modelo_sup = args.modelo_sup or config.get('servicio', {}).get('modelo_sup', 'bestCS.pt')
+    modelo_lat = args.modelo_lat or config.get('servicio', {}).get('modelo_lat', 'bestPruebaCL.pt')
+    logger_pipeline = setup_logger('BenchmarkPipeline', nivel=logging.WARNING)
+
+    from core.vision_processor_prueba import VisionProcessor
+    vision_processor = VisionProcessor(config, logger_pipeline, modelo_sup, modelo_lat)
+    if not vision_processor.modelos_cargados:
+        logger.error("❌ No se pudieron cargar los modelos")
+        return 1
+
+    temporales = [ruta_config_plc]
+    videos = [preparar_video(ruta, temporales) for ruta in (args.video_sup, args.video_lat)]
+
+    config_camara = {'simular_tiempo_real': True, 'reconexion_inicial_s': 0.05}
+    fuente_sup = FuenteCamara(videos[0], 'superior', config_camara, logger_pipeline)
+    fuente_lat = FuenteCamara(videos[1], 'lateral', config_camara, logger_pipeline)
+    fuente_sup.abrir()
+    fuente_lat.abrir()
+
+    resultados = []
+    try:
+        for tasa in [float(t) for t in args.tasas.split(',') if t.strip()]:
+            logger.info(f"🏁 Tasa {tasa} Hz durante {args.duracion_s} s...")
+            resultado = ejecutar_tasa(tasa, args.duracion_s, medicion, config, logger_pipeline,
+                                      vision_processor, fuente_sup, fuente_lat, ruta_config_plc)
+            resultados.append(resultado)
+            latencia = resultado['latencia_ms']
+            logger.info(f"   {resultado['respuestas']}/{resultado['disparos']} respondidas | "
+                        f"perdidos {resultado['perdidos']} | tardíos {resultado['tardios']} | "
+                        f"p50 {latencia.get('p50')} ms p99 {latencia.get('p99')} ms")
+    finally:
+        fuente_sup.liberar()
+        fuente_lat.liberar()
+        plc.detener()
+        for ruta in temporales:
+            os.remove(ruta)
+
+    sostenibles = [r['tasa_objetivo_hz'] for r in resultados
+                   if r['perdidos'] == 0 and r['tardios'] == 0 and r['sin_respuesta'] == 0 and r['respuestas']]
+    reporte = {
+        'fecha': time.strftime('%Y-%m-%d %H:%M:%S'),
+        'parametros': {
+            'video_sup': args.video_sup,
+            'video_lat': args.video_lat,
+            'plazo_ms': args.plazo_ms,
+            'delay_lectura_plc_ms': sistema.get('delay_lectura_plc_ms', 100),
+            'delay_post_proceso_ms': sistema.get('delay_post_proceso_ms', 500),
+            'latencia_plc_ms': args.latencia_plc_ms,
+            'dispositivo_trigger': medicion.dispositivo_trigger,
+        },
+        'tasa_max_sostenida_hz': max(sostenibles) if sostenibles else None,
+        'max_respuestas_por_s': max((r['respuestas_por_s'] for r in resultados), default=0.0),
+        'por_tasa': resultados,
+        'plc': {'lecturas': plc.lecturas, 'escrituras': plc.escrituras, 'errores': plc.errores},
+    }
+
+    salida = args.salida or f"logs/bench/handshake_{time.strftime('%Y%m%d_%H%M%S')}.json"
+    Path(salida).parent.mkdir(parents=True, exist_ok=True)
+    with open(salida, 'w', encoding='utf-8') as f:
+        json.dump(reporte, f, indent=2, ensure_ascii=False)
+    logger.info(f"✅ Tasa máxima sostenida: {reporte['tasa_max_sostenida_hz']} Hz | "
+                f"máx {reporte['max_respuestas_por_s']} respuestas/s")
+    logger.info(f"📄 Reporte: {salida}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,347 @@
+"""
+Benchmark de reproducción offline (sin ventanas)
+Ejecuta el VisionProcessor real sobre un par de videos (o carpetas de frames)
+grabados y guarda un JSON comparable entre corridas: throughput, percentiles
+de latencia por modelo y por etapa, pico de memoria y decisiones por frame.
+
+Uso:
+    python EnvPrueba/benchmark_replay.py --video-sup videoCS.mp4 --video-lat videoCL.mp4
+    python EnvPrueba/benchmark_replay.py --video-sup frames_sup/ --video-lat frames_lat/ \\
+        --max-frames 500 --salida logs/bench/base.json
+    python EnvPrueba/benchmark_replay.py ... --comparar logs/bench/base.json
+    python EnvPrueba/benchmark_replay.py --modelo-sup stub:superior --modelo-lat stub:lateral \\
+        --video-sup sintetico:2000 --video-lat sintetico:2000
+"""
+
+import argparse
+import json
+import logging
+import os
+import platform
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import cv2
+
+# Permite ejecutar el script desde la raíz del proyecto o desde EnvPrueba/
+RAIZ_PROYECTO = Path(__file__).resolve().parent.parent
+if str(RAIZ_PROYECTO) not in sys.path:
+    sys.path.insert(0, str(RAIZ_PROYECTO))
+
+from utils.logger_prueba import setup_logger
+
+EXTENSIONES_IMAGEN = ('.jpg', '.jpeg', '.png', '.bmp')
+VIDEO_SINTETICO = 'sintetico'
+PREFIJO_SINTETICO = VIDEO_SINTETICO + ':'
+ETAPAS = ('inferencia_lat', 'inferencia_sup', 'postproceso', 'validacion', 'total')
+
+
+# ==========================================================
+# === 1. FUENTES DE FRAMES (VIDEO O CARPETA) ===
+# ==========================================================
+
+def iterar_frames(ruta: str):
+    """
+    Genera los frames de un video, de una carpeta de imágenes (orden alfabético)
+    o 'sintetico:N' (ver frames_sinteticos)
+    """
+    if ruta.startswith(PREFIJO_SINTETICO):
+        yield from frames_sinteticos(int(ruta[len(PREFIJO_SINTETICO):]))
+        return
+
+    if os.path.isdir(ruta):
+        for nombre in sorted(os.listdir(ruta)):
+            if nombre.lower().endswith(EXTENSIONES_IMAGEN):
+                frame = cv2.imread(os.path.join(ruta, nombre))
+                if frame is not None:
+                    yield frame
+        return
+
+    cap = cv2.VideoCapture(ruta)
+    if not cap.isOpened():
+        raise IOError(f"No se puede abrir {ruta}")
+    try:
+        while True:
+            ret, frame = cap.read()
+            if not ret:
+                break
+            yield frame
+    finally:
+        cap.release()
+
+
+def frames_sinteticos(cantidad: int):
+    """
+    Genera N frames negros 1280x720 con un contador, para correr con modelos
+    stub: sin grabaciones. Reutiliza el mismo buffer en cada frame.
+    """
+    import numpy as np
+    frame = np.zeros((720, 1280, 3), dtype=np.uint8)
+    for i in range(cantidad):
+        frame[:] = 0
+        cv2.putText(frame, str(i), (40, 80), cv2.FONT_HERSHEY_SIMPLEX, 2.0, (255, 255, 255), 3)
+        yield frame
+
+
+def crear_video_sintetico(ruta: str, frames: int = 300, fps: float = 30.0) -> str:
+    """Escribe frames_sinteticos(frames) a un video MJPG (para fuentes que abren un archivo)"""
+    escritor = cv2.VideoWriter(ruta, cv2.VideoWriter_fourcc(*'MJPG'), fps, (1280, 720))
+    if not escritor.isOpened():
+        raise IOError(f"No se pudo crear el video sintético {ruta}")
+    for frame in frames_sinteticos(frames):
+        escritor.write(frame)
+    escritor.release()
+    return ruta
+
+
+def preparar_video(ruta: str, temporales: list) -> str:
+    """
+    Resuelve la ruta de un video de entrada. 'sintetico' o 'sintetico:N' crea
+    un video temporal de N frames (300 por defecto) y lo agrega a 'temporales'.
+    """
+    if ruta != VIDEO_SINTETICO and not ruta.startswith(PREFIJO_SINTETICO):
+        return ruta
+    _, _, cantidad = ruta.partition(':')
+    descriptor, ruta_temporal = tempfile.mkstemp(prefix='video_sintetico_', suffix='.avi')
+    os.close(descriptor)
+    temporales.append(ruta_temporal)
+    return crear_video_sintetico(ruta_temporal, int(cantidad) if cantidad else 300)
+
+
+# ==========================================================
+# === 2. MEDICIÓN ===
+# ==========================================================
+
+def memoria_maxima_mb():
+    """Pico de memoria residente del proceso (None si la plataforma no lo expone)"""
+    try:
+        import resource
+        pico = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        # Linux reporta KB, macOS bytes
+        return round(pico / (1024 * 1024) if sys.platform == 'darwin' else pico / 1024, 1)
+    except ImportError:
+        pass
+    try:
+        import psutil
+        return round(psutil.Process().memory_info().peak_wset / (1024 * 1024), 1)
+    except (ImportError, AttributeError):
+        return None
+
+
+def percentiles(valores):
+    """p50/p95/p99/max/media en ms de una lista de duraciones en ms"""
+    if not valores:
+        return {}
+    ordenados = sorted(valores)
+
+    def p(fraccion):
+        return round(ordenados[min(len(ordenados) - 1, int(fraccion * len(ordenados)))], 3)
+
+    return {
+        'p50': p(0.50),
+        'p95': p(0.95),
+        'p99': p(0.99),
+        'max': round(ordenados[-1], 3),
+        'media': round(sum(ordenados) / len(ordenados), 3),
+    }
+
+
+# ==========================================================
+# === 3. EJECUCIÓN DEL BENCHMARK ===
+# ==========================================================
+
+def ejecutar_benchmark(vision_processor, ruta_sup: str, ruta_lat: str,
+                       max_frames: int = 0, calentamiento: int = 5, logger=None) -> dict:
+    """
+    Procesa los pares de frames y arma el reporte.
+
+    Args:
+        vision_processor: VisionProcessor con modelos cargados
+        ruta_sup: Video o carpeta de frames Superior
+        ruta_lat: Video o carpeta de frames Lateral
+        max_frames: Límite de pares a medir (0 = todos)
+        calentamiento: Pares iniciales procesados pero no medidos
+        logger: Instancia del logger
+
+    Returns:
+        Diccionario del reporte (sin metadatos de la corrida)
+    """
+    frames_sup = iterar_frames(ruta_sup)
+    frames_lat = iterar_frames(ruta_lat)
+
+    # Calibración Y con el primer frame Superior (no se mide)
+    primero_sup = next(frames_sup, None)
+    primero_lat = next(frames_lat, None)
+    if primero_sup is None or primero_lat is None:
+        raise IOError("Alguna de las fuentes no tiene frames")
+    t_inicio = time.perf_counter()
+    vision_processor.calibrar_y(primero_sup)
+    calibracion_ms = (time.perf_counter() - t_inicio) * 1000.0
+
+    latencias = {etapa: [] for etapa in ETAPAS}
+    decisiones = []
+    por_codigo = {}
+    medidos = 0
+    indice = 0
+    t_medicion = None
+
+    for frame_sup, frame_lat in zip(frames_sup, frames_lat):
+        indice += 1
+        if indice == calentamiento + 1:
+            t_medicion = time.perf_counter()
+
+        t_inicio = time.perf_counter()
+        resultado = vision_processor.procesar_frames_dual(frame_sup, frame_lat)
+        t_vision = time.perf_counter()
+        vision_processor.validar_resultado(resultado)
+        t_fin = time.perf_counter()
+
+        if indice <= calentamiento:
+            continue
+
+        tiempos = resultado.get('tiempos_ms', {})
+        inf_lat = tiempos.get('inferencia_lat', 0.0)
+        inf_sup = tiempos.get('inferencia_sup', 0.0)
+        latencias['inferencia_lat'].append(inf_lat)
+        if inf_sup:
+            latencias['inferencia_sup'].append(inf_sup)
+        latencias['postproceso'].append((t_vision - t_inicio) * 1000.0 - inf_lat - inf_sup)
+        latencias['validacion'].append((t_fin - t_vision) * 1000.0)
+        latencias['total'].append((t_fin - t_inicio) * 1000.0)
+
+        codigo = resultado['codigo_respuesta_plc']
+        por_codigo[str(codigo)] = por_codigo.get(str(codigo), 0) + 1
+        decisiones.append([indice, codigo, resultado['filas'], int(resultado['desviacion_y_px']),
+                           int(resultado['correccion_z_cmm'])])
+
+        medidos += 1
+        if max_frames and medidos >= max_frames:
+            break
+        if logger and medidos % 100 == 0:
+            logger.info(f"   {medidos} frames medidos...")
+
+    duracion_s = time.perf_counter() - t_medicion if t_medicion else 0.0
+    return {
+        'frames_medidos': medidos,
+        'frames_calentamiento': min(calentamiento, indice),
+        'duracion_s': round(duracion_s, 3),
+        'throughput_fps': round(medidos / duracion_s, 2) if duracion_s else 0.0,
+        'calibracion_ms': round(calibracion_ms, 3),
+        'calibrado_y': vision_processor.calibrado_y,
+        'latencias_ms': {etapa: percentiles(valores) for etapa, valores in latencias.items()},
+        'memoria_max_mb': memoria_maxima_mb(),
+        'decisiones': {
+            'por_codigo': por_codigo,
+            'campos': ['frame', 'codigo', 'filas', 'desviacion_y_px', 'correccion_z_cmm'],
+            'detalle': decisiones,
+        },
+    }
+
+
+def comparar(actual: dict, base: dict) -> None:
+    """Imprime p50/p95 y throughput de la corrida actual contra una base"""
+    def delta(a, b):
+        return f"{a:9.2f} vs {b:9.2f} ({(a - b) / b * 100:+6.1f}%)" if b else f"{a:9.2f} vs {'-':>9}"
+
+    print(f"\n{'Comparación':<20} actual vs base ({base.get('etiqueta') or base.get('fecha')})")
+    print(f"{'throughput_fps':<20} {delta(actual['throughput_fps'], base.get('throughput_fps', 0))}")
+    for etapa in ETAPAS:
+        a = actual['latencias_ms'].get(etapa, {})
+        b = base.get('latencias_ms', {}).get(etapa, {})
+        for p in ('p50', 'p95'):
+            if p in a:
+                print(f"{etapa + ' ' + p:<20} {delta(a[p], b.get(p, 0))}")
+
+    # Cambios de decisión: el benchmark también sirve como prueba de regresión
+    decisiones_base = {d[0]: d[1:] for d in base.get('decisiones', {}).get('detalle', [])}
+    distintas = [d[0] for d in actual['decisiones']['detalle']
+                 if d[0] in decisiones_base and decisiones_base[d[0]] != d[1:]]
+    print(f"{'decisiones distintas':<20} {len(distintas)}" + (f" (frames {distintas[:10]}...)" if distintas else ""))
+
+
+# ==========================================================
+# === 4. PUNTO DE ENTRADA ===
+# ==========================================================
+
+def _parsear_argumentos(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark offline del VisionProcessor sobre videos grabados")
+    parser.add_argument('--config', default='config/plc_config_prueba.json', help="Configuración JSON (sección vision)")
+    parser.add_argument('--modelo-sup', default=None,
+                        help="Modelo Superior o 'stub:superior' (por defecto 'servicio.modelo_sup')")
+    parser.add_argument('--modelo-lat', default=None,
+                        help="Modelo Lateral o 'stub:lateral' (por defecto 'servicio.modelo_lat')")
+    parser.add_argument('--video-sup', default='videoCS.mp4', help="Video, carpeta de frames o 'sintetico:N' Superior")
+    parser.add_argument('--video-lat', default='videoCL.mp4', help="Video, carpeta de frames o 'sintetico:N' Lateral")
+    parser.add_argument('--max-frames', type=int, default=0, help="Pares de frames a medir (0 = todos)")
+    parser.add_argument('--calentamiento', type=int, default=5, help="Pares iniciales sin medir")
+    parser.add_argument('--anotaciones', action='store_true', help="Incluir el costo de results.plot()")
+    parser.add_argument('--etiqueta', default='', help="Nombre de la corrida (ej. 'antes-cascada')")
+    parser.add_argument('--salida', default=None, help="Archivo JSON del reporte (por defecto logs/bench/)")
+    parser.add_argument('--comparar', default=None, help="Reporte JSON base para comparar")
+    return parser.parse_args(argv)
+
+
+def main(argv=None) -> int:
+    args = _parsear_argumentos(argv)
+    logger = setup_logger('Benchmark', nivel=logging.INFO)
+
+    with open(args.config, 'r', encoding='utf-8') as f:
+        config = json.load(f)
+    config.setdefault('vision', {})['generar_anotaciones'] = args.anotaciones
+    modelo_sup = args.modelo_sup or config.get('servicio', {}).get('modelo_sup', 'bestCS.pt')
+    modelo_lat = args.modelo_lat or config.get('servicio', {}).get('modelo_lat', 'bestPruebaCL.pt')
+
+    # Solo el nivel WARNING del procesador: el benchmark no mide el costo de los logs
+    logger_vision = setup_logger('BenchmarkVision', nivel=logging.WARNING)
+
+    from core.vision_processor_prueba import VisionProcessor
+    t_inicio = time.perf_counter()
+    vision_processor = VisionProcessor(config, logger_vision, modelo_sup, modelo_lat)
+    carga_modelos_s = time.perf_counter() - t_inicio
+    if not vision_processor.modelos_cargados:
+        logger.error("❌ No se pudieron cargar los modelos")
+        return 1
+
+    logger.info(f"🏁 Benchmark: {args.video_sup} + {args.video_lat}")
+    reporte = {
+        'etiqueta': args.etiqueta,
+        'fecha': time.strftime('%Y-%m-%d %H:%M:%S'),
+        'entorno': {
+            'python': platform.python_version(),
+            'plataforma': platform.platform(),
+            'opencv': cv2.__version__,
+        },
+        'parametros': {
+            'video_sup': args.video_sup,
+            'video_lat': args.video_lat,
+            'modelo_sup': modelo_sup,
+            'modelo_lat': modelo_lat,
+            'anotaciones': args.anotaciones,
+            'max_frames': args.max_frames,
+        },
+        'carga_modelos_s': round(carga_modelos_s, 3),
+    }
+    reporte.update(ejecutar_benchmark(vision_processor, args.video_sup, args.video_lat,
+                                      args.max_frames, args.calentamiento, logger))
+
+    salida = args.salida or f"logs/bench/replay_{time.strftime('%Y%m%d_%H%M%S')}.json"
+    Path(salida).parent.mkdir(parents=True, exist_ok=True)
+    with open(salida, 'w', encoding='utf-8') as f:
+        json.dump(reporte, f, indent=2, ensure_ascii=False)
+
+    total = reporte['latencias_ms']['total']
+    logger.info(f"✅ {reporte['frames_medidos']} frames | {reporte['throughput_fps']} fps | "
+                f"total p50 {total.get('p50')} ms p99 {total.get('p99')} ms | "
+                f"memoria máx {reporte['memoria_max_mb']} MB")
+    logger.info(f"📄 Reporte: {salida}")
+
+    if args.comparar:
+        with open(args.comparar, 'r', encoding='utf-8') as f:
+            comparar(reporte, json.load(f))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
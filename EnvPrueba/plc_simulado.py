@@ -0,0 +1,233 @@
+"""
+PLC simulado - Servidor local de protocolo MC 3E (binario)
+Reemplaza al PLC Mitsubishi en pruebas: responde a pymcprotocol.Type3E
+(lectura/escritura por palabras de registros D) sobre TCP.
+
+Soporta:
+- 0x0401 / 0x0000  Lectura en lote por palabras (batchread_wordunits)
+- 0x1401 / 0x0000  Escritura en lote por palabras (batchwrite_wordunits)
+- Dispositivo D (código 0xA8), series Q/L (número de dispositivo de 3 bytes)
+"""
+
+import socket
+import socketserver
+import threading
+import time
+from array import array
+from typing import Callable, List, Optional
+
+
+# Cabecera de solicitud hasta el campo de longitud (inclusive)
+TAMANO_CABECERA = 9
+SUBCABECERA_SOLICITUD = b'\x50\x00'
+SUBCABECERA_RESPUESTA = b'\xd0\x00'
+
+COMANDO_LECTURA_LOTE = 0x0401
+COMANDO_ESCRITURA_LOTE = 0x1401
+CODIGO_DISPOSITIVO_D = 0xA8
+
+# Códigos de fin (end code) devueltos al cliente
+FIN_OK = 0x0000
+FIN_COMANDO_NO_SOPORTADO = 0xC059
+FIN_FUERA_DE_RANGO = 0xC056
+
+CANTIDAD_REGISTROS_D = 12288  # D0..D12287 (Q estándar)
+
+
+class PLCSimulado:
+    """
+    PLC simulado con memoria de registros D.
+
+    - El servidor atiende cada conexión en un hilo (como varios clientes MC)
+    - 'al_escribir' recibe (numero_dispositivo, valores, t_perf_counter) en
+      cada escritura, para medir respuestas en benchmarks
+    - 'latencia_s' agrega un retardo fijo a cada respuesta (red/PLC real)
+    """
+
+    def __init__(self,
+                 host: str = '127.0.0.1',
+                 puerto: int = 0,
+                 latencia_s: float = 0.0,
+                 al_escribir: Optional[Callable[[int, List[int], float], None]] = None):
+        """
+        Args:
+            host: Dirección de escucha
+            puerto: Puerto TCP (0 = elegir uno libre, ver self.puerto tras iniciar())
+            latencia_s: Retardo agregado a cada respuesta
+            al_escribir: Callback opcional para cada escritura de registros D
+        """
+        self.host = host
+        self.puerto = puerto
+        self.latencia_s = latencia_s
+        self.al_escribir = al_escribir
+
+        self.memoria = array('h', [0] * CANTIDAD_REGISTROS_D)
+        self._lock = threading.Lock()
+        self._servidor = None
+        self._hilo = None
+
+        self.lecturas = 0
+        self.escrituras = 0
+        self.errores = 0
+
+    # ==================== MEMORIA (acceso local) ====================
+
+    def leer(self, dispositivo: str, cantidad: int = 1) -> List[int]:
+        """Lee registros D directamente (ej. leer('D701'))"""
+        inicio = _numero_dispositivo(dispositivo)
+        with self._lock:
+            return list(self.memoria[inicio:inicio + cantidad])
+
+    def escribir(self, dispositivo: str, valores) -> None:
+        """Escribe registros D directamente, como lo haría la lógica del PLC"""
+        inicio = _numero_dispositivo(dispositivo)
+        if isinstance(valores, int):
+            valores = [valores]
+        with self._lock:
+            for i, valor in enumerate(valores):
+                self.memoria[inicio + i] = valor
+
+    def leer_int32(self, dispositivo: str) -> int:
+        """Lee un valor de 32 bits con signo almacenado como [low, high]"""
+        bajo, alto = self.leer(dispositivo, 2)
+        valor = (bajo & 0xFFFF) | ((alto & 0xFFFF) << 16)
+        return valor - (1 << 32) if valor & 0x80000000 else valor
+
+    # ==================== SERVIDOR ====================
+
+    def iniciar(self) -> int:
+        """
+        Arranca el servidor TCP en segundo plano.
+
+        Returns:
+            Puerto en el que escucha
+        """
+        socketserver.ThreadingTCPServer.allow_reuse_address = True
+        self._servidor = socketserver.ThreadingTCPServer((self.host, self.puerto), _crear_manejador(self))
+        self._servidor.daemon_threads = True
+        self.puerto = self._servidor.server_address[1]
+        self._hilo = threading.Thread(target=self._servidor.serve_forever, name="PLCSimulado", daemon=True)
+        self._hilo.start()
+        print(f"🏭 PLC simulado (MC 3E binario) escuchando en {self.host}:{self.puerto}")
+        return self.puerto
+
+    def detener(self) -> None:
+        if self._servidor:
+            self._servidor.shutdown()
+            self._servidor.server_close()
+            self._servidor = None
+
+    def procesar_trama(self, cabecera: bytes, cuerpo: bytes) -> bytes:
+        """
+        Procesa una trama de solicitud y arma la respuesta.
+
+        Args:
+            cabecera: 9 bytes (subcabecera, red, PC, módulo, estación, longitud)
+            cuerpo: 'longitud' bytes (temporizador, comando, subcomando, datos)
+
+        Returns:
+            Trama de respuesta completa
+        """
+        comando = int.from_bytes(cuerpo[2:4], 'little')
+        subcomando = int.from_bytes(cuerpo[4:6], 'little')
+        datos = b''
+        fin = FIN_OK
+
+        if subcomando != 0x0000 or comando not in (COMANDO_LECTURA_LOTE, COMANDO_ESCRITURA_LOTE):
+            fin = FIN_COMANDO_NO_SOPORTADO
+        else:
+            inicio = int.from_bytes(cuerpo[6:9], 'little')
+            codigo = cuerpo[9]
+            cantidad = int.from_bytes(cuerpo[10:12], 'little')
+            if codigo != CODIGO_DISPOSITIVO_D or inicio + cantidad > CANTIDAD_REGISTROS_D:
+                fin = FIN_FUERA_DE_RANGO
+            elif comando == COMANDO_LECTURA_LOTE:
+                with self._lock:
+                    datos = self.memoria[inicio:inicio + cantidad].tobytes()
+                self.lecturas += 1
+            else:
+                valores = array('h')
+                valores.frombytes(cuerpo[12:12 + 2 * cantidad])
+                t_escritura = time.perf_counter()
+                with self._lock:
+                    self.memoria[inicio:inicio + cantidad] = valores
+                self.escrituras += 1
+                if self.al_escribir:
+                    self.al_escribir(inicio, valores.tolist(), t_escritura)
+
+        if fin != FIN_OK:
+            self.errores += 1
+        if self.latencia_s:
+            time.sleep(self.latencia_s)
+
+        # Respuesta: subcabecera D000 + ruta (eco) + longitud + código de fin + datos
+        return (SUBCABECERA_RESPUESTA + cabecera[2:7]
+                + (2 + len(datos)).to_bytes(2, 'little')
+                + fin.to_bytes(2, 'little')
+                + datos)
+
+
+def _numero_dispositivo(dispositivo: str) -> int:
+    if not dispositivo.upper().startswith('D'):
+        raise ValueError(f"Solo se simulan registros D: {dispositivo}")
+    return int(dispositivo[1:])
+
+
+def _recibir_exacto(conexion: socket.socket, cantidad: int) -> Optional[bytes]:
+    datos = b''
+    while len(datos) < cantidad:
+        parte = conexion.recv(cantidad - len(datos))
+        if not parte:
+            return None
+        datos += parte
+    return datos
+
+
+def _crear_manejador(plc: PLCSimulado):
+    class ManejadorMC(socketserver.BaseRequestHandler):
+        def handle(self):
+            self.request.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+            while True:
+                try:
+                    cabecera = _recibir_exacto(self.request, TAMANO_CABECERA)
+                    if cabecera is None:
+                        return
+                    if cabecera[:2] != SUBCABECERA_SOLICITUD:
+                        print(f"⚠️ PLC simulado: subcabecera inválida {cabecera[:2].hex()}, cerrando conexión")
+                        return
+                    longitud = int.from_bytes(cabecera[7:9], 'little')
+                    cuerpo = _recibir_exacto(self.request, longitud)
+                    if cuerpo is None:
+                        return
+                    self.request.sendall(plc.procesar_trama(cabecera, cuerpo))
+                except (ConnectionError, OSError):
+                    return
+
+    return ManejadorMC
+
+
+# =============================================================================
+# EJEMPLO DE USO
+# =============================================================================
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="PLC simulado (MC 3E binario)")
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--puerto', type=int, default=5007)
+    parser.add_argument('--trigger', default='D701', help="Registro de solicitud")
+    parser.add_argument('--intervalo-s', type=float, default=3.0, help="Segundos entre solicitudes (99)")
+    args = parser.parse_args()
+
+    def mostrar_escritura(inicio, valores, _t):
+        print(f"   ✍️ D{inicio} ← {valores}")
+
+    plc = PLCSimulado(args.host, args.puerto, al_escribir=mostrar_escritura)
+    plc.iniciar()
+    try:
+        while True:
+            time.sleep(args.intervalo_s)
+            print(f"📤 {args.trigger} = 99 (solicitud)")
+            plc.escribir(args.trigger, 99)
+    except KeyboardInterrupt:
+        plc.detener()
@@ -0,0 +1,427 @@
+"""
+Prueba de resistencia (soak test) con detección de deriva
+Corre el pipeline completo (MotorInspeccion + PLCController + VisionProcessor
++ FuenteCamara) contra el PLC simulado durante horas, a una tasa de disparos
+acelerada, y muestrea periódicamente:
+
+- Memoria residente (RSS) y memoria trazada por tracemalloc
+- Asignaciones que más crecieron desde el inicio (tracemalloc, por línea)
+- Cantidad de objetos vivos del recolector (gc)
+- Latencia solicitud → respuesta (p50/p99 del intervalo)
+
+Al final ajusta una recta (mínimos cuadrados) a cada serie y falla (código de
+salida 1) si la pendiente por hora supera los umbrales de la sección 'soak'
+del JSON o de los argumentos.
+
+Uso:
+    python EnvPrueba/soak_test.py --horas 4 --tasa-hz 5
+    python EnvPrueba/soak_test.py --modelo-sup stub:superior --modelo-lat stub:lateral \\
+        --video-sup sintetico --video-lat sintetico --horas 0.5 --intervalo-muestreo-s 30
+"""
+
+import argparse
+import gc
+import json
+import logging
+import os
+import queue
+import sys
+import threading
+import time
+import tracemalloc
+from collections import Counter
+from pathlib import Path
+
+RAIZ_PROYECTO = Path(__file__).resolve().parent.parent
+if str(RAIZ_PROYECTO) not in sys.path:
+    sys.path.insert(0, str(RAIZ_PROYECTO))
+
+from core.plc_controller import PLCController
+from core.camera_source import FuenteCamara
+from core.inspection_engine import MotorInspeccion
+from utils.logger_prueba import setup_logger
+
+from benchmark_handshake import preparar_plc_simulado
+from benchmark_replay import percentiles, preparar_video
+
+# Pendientes máximas aceptadas (por hora). 0 o None = no se evalúa.
+UMBRALES_POR_DEFECTO = {
+    'max_pendiente_rss_mb_h': 20.0,
+    'max_pendiente_trazada_mb_h': 10.0,
+    'max_pendiente_p99_ms_h': 20.0,
+    'max_pendiente_objetos_h': 0,
+}
+
+# Serie muestreada → umbral que le corresponde
+SERIES_EVALUADAS = {
+    'rss_mb': 'max_pendiente_rss_mb_h',
+    'trazada_mb': 'max_pendiente_trazada_mb_h',
+    'p99_ms': 'max_pendiente_p99_ms_h',
+    'objetos_gc': 'max_pendiente_objetos_h',
+}
+
+
+# ==========================================================
+# === 1. MUESTREO DE MEMORIA ===
+# ==========================================================
+
+def memoria_residente_mb():
+    """RSS actual del proceso (None si la plataforma no lo expone)"""
+    try:
+        with open('/proc/self/statm', 'r') as f:
+            paginas = int(f.read().split()[1])
+        return round(paginas * os.sysconf('SC_PAGE_SIZE') / (1024 * 1024), 2)
+    except (OSError, ValueError, AttributeError):
+        pass
+    try:
+        import psutil
+        return round(psutil.Process().memory_info().rss / (1024 * 1024), 2)
+    except ImportError:
+        return None
+
+
+def _filtrar_snapshot(snapshot):
+    """Excluye las asignaciones del propio tracemalloc y del sistema de imports"""
+    return snapshot.filter_traces((
+        tracemalloc.Filter(False, tracemalloc.__file__),
+        tracemalloc.Filter(False, '<frozen importlib._bootstrap>'),
+        tracemalloc.Filter(False, '<frozen importlib._bootstrap_external>'),
+        tracemalloc.Filter(False, '<unknown>'),
+    ))
+
+
+def top_crecimiento(snapshot_base, snapshot, cantidad: int):
+    """Líneas de código cuya memoria retenida más creció desde snapshot_base"""
+    diferencias = _filtrar_snapshot(snapshot).compare_to(_filtrar_snapshot(snapshot_base), 'lineno')
+    top = []
+    for estadistica in diferencias[:cantidad]:
+        if estadistica.size_diff <= 0:
+            break
+        marco = estadistica.traceback[0]
+        top.append({
+            'ubicacion': f"{marco.filename}:{marco.lineno}",
+            'crecimiento_kb': round(estadistica.size_diff / 1024, 1),
+            'total_kb': round(estadistica.size / 1024, 1),
+            'bloques': estadistica.count,
+        })
+    return top
+
+
+def contar_tipos():
+    """Objetos vivos del recolector por tipo"""
+    return Counter(type(o).__name__ for o in gc.get_objects())
+
+
+# ==========================================================
+# === 2. DERIVA (REGRESIÓN LINEAL) ===
+# ==========================================================
+
+def pendiente_por_hora(tiempos_s, valores):
+    """
+    Pendiente de mínimos cuadrados de 'valores' respecto al tiempo.
+
+    Returns:
+        Unidades por hora, o None con menos de 3 puntos válidos
+    """
+    puntos = [(t / 3600.0, v) for t, v in zip(tiempos_s, valores) if v is not None]
+    if len(puntos) < 3:
+        return None
+    n = len(puntos)
+    media_t = sum(t for t, _ in puntos) / n
+    media_v = sum(v for _, v in puntos) / n
+    varianza_t = sum((t - media_t) ** 2 for t, _ in puntos)
+    if varianza_t == 0:
+        return None
+    covarianza = sum((t - media_t) * (v - media_v) for t, v in puntos)
+    return covarianza / varianza_t
+
+
+def evaluar_deriva(muestras, umbrales, calentamiento_s: float):
+    """
+    Ajusta cada serie (descartando el calentamiento) y la compara con su umbral.
+
+    Returns:
+        ({serie: {'pendiente_h', 'umbral_h', 'excedida'}}, hay_fallo)
+    """
+    validas = [m for m in muestras if m['t_s'] >= calentamiento_s]
+    tiempos = [m['t_s'] for m in validas]
+    evaluacion = {}
+    fallo = False
+    for serie, clave_umbral in SERIES_EVALUADAS.items():
+        pendiente = pendiente_por_hora(tiempos, [m.get(serie) for m in validas])
+        umbral = umbrales.get(clave_umbral)
+        excedida = bool(umbral) and pendiente is not None and pendiente > umbral
+        fallo = fallo or excedida
+        evaluacion[serie] = {
+            'pendiente_h': round(pendiente, 3) if pendiente is not None else None,
+            'umbral_h': umbral or None,
+            'excedida': excedida,
+        }
+    return evaluacion, fallo
+
+
+# ==========================================================
+# === 3. PIPELINE BAJO CARGA ===
+# ==========================================================
+
+def consumir_eventos(motor: MotorInspeccion, detener: threading.Event, contadores: Counter) -> None:
+    """Hace de interfaz: vacía la cola del motor y toma los frames como lo haría el render"""
+    while not detener.is_set():
+        try:
+            evento = motor.eventos.get(timeout=0.1)
+            contadores[evento['tipo']] += 1
+        except queue.Empty:
+            pass
+        motor.obtener_frames()
+
+
+def muestrear(t_inicio: float, medicion, motor, fuentes, snapshot_base, contadores, cantidad_top: int):
+    """Toma una muestra de memoria, objetos y latencia del último intervalo"""
+    latencias = medicion.extraer_latencias()
+    dist = percentiles(latencias)
+    muestra = {
+        't_s': round(time.monotonic() - t_inicio, 1),
+        'rss_mb': memoria_residente_mb(),
+        'trazada_mb': None,
+        'objetos_gc': len(gc.get_objects()),
+        'respuestas': len(latencias),
+        'p50_ms': dist.get('p50'),
+        'p99_ms': dist.get('p99'),
+        'ciclos': motor.ciclos,
+        'perdidos': medicion.perdidos,
+        'tardios': medicion.tardios,
+        'eventos_descartados': motor.eventos_descartados,
+        'reconexiones_camara': sum(f.reconexiones for f in fuentes),
+        'eventos': dict(contadores),
+    }
+    if snapshot_base is not None:
+        muestra['trazada_mb'] = round(tracemalloc.get_traced_memory()[0] / (1024 * 1024), 2)
+        muestra['top_crecimiento'] = top_crecimiento(snapshot_base, tracemalloc.take_snapshot(), cantidad_top)
+    return muestra
+
+
+# ==========================================================
+# === 4. PUNTO DE ENTRADA ===
+# ==========================================================
+
+def _parsear_argumentos(argv=None):
+    parser = argparse.ArgumentParser(description="Soak test del pipeline con PLC simulado y detección de deriva")
+    parser.add_argument('--config', default='config/plc_config_prueba.json', help="Configuración del sistema")
+    parser.add_argument('--config-plc', default='config/plc_config.json',
+                        help="Direcciones y códigos del PLC (la conexión se redirige al simulado)")
+    parser.add_argument('--modelo-sup', default=None,
+                        help="Modelo Superior o 'stub:superior' (por defecto 'servicio.modelo_sup')")
+    parser.add_argument('--modelo-lat', default=None,
+                        help="Modelo Lateral o 'stub:lateral' (por defecto 'servicio.modelo_lat')")
+    parser.add_argument('--video-sup', default='videoCS.mp4', help="Video Superior o 'sintetico[:N]' (en bucle)")
+    parser.add_argument('--video-lat', default='videoCL.mp4', help="Video Lateral o 'sintetico[:N]' (en bucle)")
+    parser.add_argument('--horas', type=float, default=None, help="Duración (por defecto 'soak.horas')")
+    parser.add_argument('--tasa-hz', type=float, default=None, help="Solicitudes por segundo (por defecto 'soak.tasa_hz')")
+    parser.add_argument('--intervalo-muestreo-s', type=float, default=None,
+                        help="Segundos entre muestras (por defecto 'soak.intervalo_muestreo_s')")
+    parser.add_argument('--calentamiento-s', type=float, default=None,
+                        help="Muestras iniciales excluidas del ajuste (por defecto 'soak.calentamiento_s')")
+    parser.add_argument('--plazo-ms', type=float, default=500.0, help="Respuesta más lenta aceptable")
+    parser.add_argument('--sin-tracemalloc', action='store_true', help="No trazar asignaciones (menos sobrecarga)")
+    parser.add_argument('--marcos-tracemalloc', type=int, default=1, help="Profundidad de traceback de tracemalloc")
+    parser.add_argument('--top', type=int, default=10, help="Asignaciones con mayor crecimiento a reportar")
+    for clave in UMBRALES_POR_DEFECTO:
+        parser.add_argument('--' + clave.replace('_', '-'), dest=clave, type=float, default=None,
+                            help=f"Sobrescribe 'soak.{clave}' (0 = no evaluar)")
+    parser.add_argument('--salida', default=None, help="Archivo JSON del reporte (por defecto logs/bench/)")
+    return parser.parse_args(argv)
+
+
+def main(argv=None) -> int:
+    args = _parsear_argumentos(argv)
+    logger = setup_logger('SoakTest', nivel=logging.INFO)
+
+    with open(args.config, 'r', encoding='utf-8') as f:
+        config = json.load(f)
+    config.setdefault('vision', {})['generar_anotaciones'] = False
+    config_soak = config.get('soak', {})
+    horas = args.horas if args.horas is not None else config_soak.get('horas', 4.0)
+    tasa_hz = args.tasa_hz if args.tasa_hz is not None else config_soak.get('tasa_hz', 5.0)
+    intervalo_s = args.intervalo_muestreo_s or config_soak.get('intervalo_muestreo_s', 60.0)
+    calentamiento_s = (args.calentamiento_s if args.calentamiento_s is not None
+                       else config_soak.get('calentamiento_s', 300.0))
+    umbrales = {clave: config_soak.get(clave, defecto) for clave, defecto in UMBRALES_POR_DEFECTO.items()}
+    umbrales.update({clave: getattr(args, clave) for clave in UMBRALES_POR_DEFECTO
+                     if getattr(args, clave) is not None})
+
+    # Ciclo acelerado: sin esperas artificiales entre consultas y tras responder
+    sistema = config.setdefault('sistema', {})
+    sistema['delay_lectura_plc_ms'] = config_soak.get('delay_lectura_plc_ms', 10)
+    sistema['delay_post_proceso_ms'] = 0
+
+    if not args.sin_tracemalloc:
+        tracemalloc.start(max(1, args.marcos_tracemalloc))
+
+    plc, medicion, ruta_config_plc = preparar_plc_simulado(args.config_plc, 0.0, args.plazo_ms)
+    temporales = [ruta_config_plc]
+
+    modelo_sup = args.modelo_sup or config.get('servicio', {}).get('modelo_sup', 'bestCS.pt')
+    modelo_lat = args.modelo_lat or config.get('servicio', {}).get('modelo_lat', 'bestPruebaCL.pt')
+    logger_pipeline = setup_logger('SoakPipeline', nivel=logging.WARNING)
+
+    from core.vision_processor_prueba import VisionProcessor
+    vision_processor = VisionProcessor(config, logger_pipeline, modelo_sup, modelo_lat)
+    if not vision_processor.modelos_cargados:
+        logger.error("❌ No se pudieron cargar los modelos")
+        plc.detener()
+        os.remove(ruta_config_plc)
+        return 1
+
+    videos = [preparar_video(ruta, temporales) for ruta in (args.video_sup, args.video_lat)]
+
+    config_camara = {'simular_tiempo_real': True, 'reconexion_inicial_s': 0.05}
+    fuente_sup = FuenteCamara(videos[0], 'superior', config_camara, logger_pipeline)
+    fuente_lat = FuenteCamara(videos[1], 'lateral', config_camara, logger_pipeline)
+    fuente_sup.abrir()
+    fuente_lat.abrir()
+
+    controlador = PLCController(ruta_config_plc)
+    if not controlador.conectar():
+        logger.error("❌ No se pudo conectar al PLC simulado")
+        fuente_sup.liberar()
+        fuente_lat.liberar()
+        plc.detener()
+        for ruta in temporales:
+            os.remove(ruta)
+        return 1
+    motor = MotorInspeccion(config, logger_pipeline, vision_processor, fuente_sup, fuente_lat,
+                            controlador_plc=controlador, modo_simulacion=False)
+    detener_consumidor = threading.Event()
+    contadores = Counter()
+    consumidor = threading.Thread(target=consumir_eventos, args=(motor, detener_consumidor, contadores),
+                                  name="SoakConsumidor", daemon=True)
+
+    duracion_s = horas * 3600.0
+    logger.info(f"🏁 Soak test: {horas} h a {tasa_hz} Hz, muestra cada {intervalo_s} s "
+                f"(tracemalloc {'no' if args.sin_tracemalloc else 'sí'})")
+    muestras = []
+    tipos_inicio = None
+    tipos_fin = None
+    motivo_fin = 'duracion'
+    try:
+        motor.start()
+        consumidor.start()
+        while motor.is_alive() and not vision_processor.calibrado_y:
+            time.sleep(0.05)
+        time.sleep(0.2)
+
+        gc.collect()
+        tipos_inicio = contar_tipos()
+        snapshot_base = None if args.sin_tracemalloc else tracemalloc.take_snapshot()
+        medicion.reiniciar()
+
+        periodo = 1.0 / tasa_hz
+        t_inicio = time.monotonic()
+        t_siguiente = t_inicio
+        t_muestra = t_inicio + intervalo_s
+        while time.monotonic() - t_inicio < duracion_s:
+            if not motor.is_alive():
+                motivo_fin = 'motor_detenido'
+                logger.error("❌ El motor se detuvo antes de terminar el soak test")
+                break
+            medicion.disparar()
+            t_siguiente += periodo
+
+            if time.monotonic() >= t_muestra:
+                muestra = muestrear(t_inicio, medicion, motor, (fuente_sup, fuente_lat),
+                                    snapshot_base, contadores, args.top)
+                muestras.append(muestra)
+                t_muestra += intervalo_s
+                logger.info(f"📈 {muestra['t_s'] / 60:.1f} min | RSS {muestra['rss_mb']} MB | "
+                            f"trazada {muestra['trazada_mb']} MB | objetos {muestra['objetos_gc']} | "
+                            f"p99 {muestra['p99_ms']} ms | ciclos {muestra['ciclos']} | "
+                            f"perdidos {muestra['perdidos']}")
+                if muestra.get('top_crecimiento'):
+                    mayor = muestra['top_crecimiento'][0]
+                    logger.info(f"   mayor crecimiento: {mayor['ubicacion']} +{mayor['crecimiento_kb']} KB")
+
+            espera = t_siguiente - time.monotonic()
+            if espera > 0:
+                time.sleep(espera)
+            else:
+                # Atrasado (el muestreo tarda): no disparar en ráfaga para recuperar
+                t_siguiente = time.monotonic()
+    except KeyboardInterrupt:
+        motivo_fin = 'interrumpido'
+        logger.warning("⚠️ Soak test interrumpido: se evalúan las muestras tomadas")
+    finally:
+        motor.detener()
+        motor.join(timeout=10.0)
+        detener_consumidor.set()
+        consumidor.join(timeout=2.0)
+        controlador.desconectar()
+        fuente_sup.liberar()
+        fuente_lat.liberar()
+        plc.detener()
+        if tipos_inicio is not None:
+            gc.collect()
+            tipos_fin = contar_tipos()
+        top_final = []
+        if tracemalloc.is_tracing():
+            if muestras and muestras[-1].get('top_crecimiento'):
+                top_final = muestras[-1]['top_crecimiento']
+            tracemalloc.stop()
+        for ruta in temporales:
+            os.remove(ruta)
+
+    evaluacion, fallo = evaluar_deriva(muestras, umbrales, calentamiento_s)
+    fallo = fallo or motivo_fin == 'motor_detenido'
+    crecimiento_tipos = []
+    if tipos_inicio is not None and tipos_fin is not None:
+        tipos_fin.subtract(tipos_inicio)
+        crecimiento_tipos = [{'tipo': t, 'crecimiento': n} for t, n in tipos_fin.most_common(args.top) if n > 0]
+
+    reporte = {
+        'fecha': time.strftime('%Y-%m-%d %H:%M:%S'),
+        'parametros': {
+            'horas': horas,
+            'tasa_hz': tasa_hz,
+            'intervalo_muestreo_s': intervalo_s,
+            'calentamiento_s': calentamiento_s,
+            'modelo_sup': modelo_sup,
+            'modelo_lat': modelo_lat,
+            'video_sup': args.video_sup,
+            'video_lat': args.video_lat,
+            'tracemalloc': not args.sin_tracemalloc,
+        },
+        'resultado': 'FALLO' if fallo else 'OK',
+        'motivo_fin': motivo_fin,
+        'umbrales_h': umbrales,
+        'deriva': evaluacion,
+        'totales': {
+            'disparos': medicion.disparos,
+            'perdidos': medicion.perdidos,
+            'tardios': medicion.tardios,
+            'ciclos_motor': motor.ciclos,
+            'eventos_descartados': motor.eventos_descartados,
+            'plc': {'lecturas': plc.lecturas, 'escrituras': plc.escrituras, 'errores': plc.errores},
+        },
+        'top_crecimiento_final': top_final,
+        'crecimiento_objetos_por_tipo': crecimiento_tipos,
+        'muestras': [{k: v for k, v in m.items() if k != 'top_crecimiento'} for m in muestras],
+    }
+
+    salida = args.salida or f"logs/bench/soak_{time.strftime('%Y%m%d_%H%M%S')}.json"
+    Path(salida).parent.mkdir(parents=True, exist_ok=True)
+    with open(salida, 'w', encoding='utf-8') as f:
+        json.dump(reporte, f, indent=2, ensure_ascii=False)
+
+    for serie, datos in evaluacion.items():
+        if datos['pendiente_h'] is None:
+            continue
+        marca = '❌' if datos['excedida'] else '✅'
+        logger.info(f"{marca} {serie}: {datos['pendiente_h']:+.3f}/h (umbral {datos['umbral_h']})")
+    if fallo:
+        logger.error(f"❌ Soak test FALLIDO ({motivo_fin}) | reporte: {salida}")
+        return 1
+    logger.info(f"✅ Soak test OK: {len(muestras)} muestras | reporte: {salida}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -2,6 +2,7 @@ import cv2
 from ultralytics import YOLO
 import time
 import os
+from core.camera_source import FuenteCamara
 # IMPORTAR AQUÍ LA LIBRERÍA DE COMUNICACIÓN PLC (Ej: import pycomm3)
 
 # ==========================================================
@@ -9,8 +10,11 @@ import os
 # ==========================================================
 MODEL_SUP_PATH = "modelos/modelo_superior_qc.pt"
 MODEL_LAT_PATH = "modelos/modelo_lateral_anomalias.pt"
-CAM_SUP_ID = 0 
+CAM_SUP_ID = 0 # Índice USB o URL de cámara IP (ej: "rtsp://192.168.100.50:554/stream1")
 CAM_LAT_ID = 1 
+# Opciones de lectura/reconexión (mismas claves que la sección 'camaras' del JSON)
+CONFIG_CAMARAS = {"buffer_frames": 1, "timeout_lectura_s": 2.0,
+                  "reconexion_inicial_s": 0.5, "reconexion_max_s": 10.0}
 CONFIDENCE_THRESHOLD = 0.5 
 
 # Clases de Visión (DEBE COINCIDIR CON TU ENTRENAMIENTO)
@@ -85,20 +89,25 @@ def cargar_modelos(path_sup, path_lat):
         return None, None
 
 def inicializar_camaras(id_sup, id_lat):
-    """Inicializa las cámaras de video."""
-    cap_sup = cv2.VideoCapture(id_sup)
-    cap_lat = cv2.VideoCapture(id_lat)
-    if not cap_sup.isOpened():
-        print(f"❌ ERROR: No se puede abrir la Cámara Superior (ID: {id_sup})")
-        return None, None
-    if not cap_lat.isOpened():
-        print(f"❌ ERROR: No se puede abrir la Cámara Lateral (ID: {id_lat})")
+    """
+    Inicializa las cámaras de video (USB o IP).
+    Si una cámara no responde al inicio, su hilo lector sigue reintentando
+    en segundo plano y los ciclos sin frame se reportan como error de captura.
+    """
+    cap_sup = FuenteCamara(id_sup, 'superior', CONFIG_CAMARAS)
+    cap_lat = FuenteCamara(id_lat, 'lateral', CONFIG_CAMARAS)
+    if not cap_sup.abrir():
+        print(f"⚠️ Cámara Superior (ID: {id_sup}) no disponible, reintentando en segundo plano")
+    if not cap_lat.abrir():
+        print(f"⚠️ Cámara Lateral (ID: {id_lat}) no disponible, reintentando en segundo plano")
+    if not cap_sup.esta_abierta() or not cap_lat.esta_abierta():
+        print("❌ ERROR: No se pudieron inicializar las cámaras")
         return None, None
     return cap_sup, cap_lat
 
 def tomar_frame(cap):
-    """Captura un solo frame de la cámara."""
-    ret, frame = cap.read()
+    """Captura el frame más reciente de la cámara."""
+    ret, frame = cap.leer()
     if ret:
         return frame
     return None
@@ -341,8 +350,8 @@ def control_maestro_produccion():
         # Cierre seguro de recursos
         print("\n--- CERRANDO SISTEMA DE VISIÓN ---")
         # Se agrega manejo de 'model_sup' y 'model_lat' si es necesario
-        if 'cap_sup' in locals() and cap_sup.isOpened(): cap_sup.release()
-        if 'cap_lat' in locals() and cap_lat.isOpened(): cap_lat.release()
+        if 'cap_sup' in locals() and cap_sup: cap_sup.liberar()
+        if 'cap_lat' in locals() and cap_lat: cap_lat.liberar()
         cv2.destroyAllWindows()
 
 
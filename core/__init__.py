@@ -3,7 +3,25 @@ Módulo core del sistema PLC-YOLO
 Contiene la lógica principal de comunicación y procesamiento
 """
 
-from .plc_controller import PLCController
-from .vision_processor import VisionProcessor
+import importlib
 
-__all__ = ['PLCController', 'VisionProcessor']
\ No newline at end of file
+# Imports diferidos (PEP 562): 'import core.camera_source' no debe arrastrar
+# ultralytics/torch. Cada clase se importa en el primer acceso.
+_EXPORTACIONES = {
+    'PLCController': '.plc_controller',
+    'VisionProcessor': '.vision_processor',
+}
+
+__all__ = ['PLCController', 'VisionProcessor']
+
+
+def __getattr__(nombre):
+    if nombre in _EXPORTACIONES:
+        valor = getattr(importlib.import_module(_EXPORTACIONES[nombre], __name__), nombre)
+        globals()[nombre] = valor
+        return valor
+    raise AttributeError(f"module {__name__!r} has no attribute {nombre!r}")
+
+
+def __dir__():
+    return sorted(list(globals()) + __all__)
\ No newline at end of file
@@ -0,0 +1,195 @@
+"""
+CalibrationStore - Persistencia de la calibración Y
+Guarda los centros ideales de columna (X_CENTROS_IDEALES) junto con el hash
+del modelo Superior, la cámara y la resolución con que se calcularon, para
+reutilizarlos al reiniciar sin volver a inferir sobre el primer frame.
+"""
+
+import hashlib
+import json
+import os
+import threading
+import time
+from typing import Dict, Optional, Tuple
+
+from core.stub_detector import es_ruta_stub
+from utils.logger_prueba import log_diferido
+
+VERSION_ARCHIVO = 1
+MAX_ENTRADAS = 20  # una por combinación modelo/cámara/resolución
+
+
+def hash_modelo(path: str, config_vision: Optional[Dict] = None) -> str:
+    """
+    Hash SHA-256 (16 hex) del archivo del modelo.
+
+    Para modelos 'stub:' se usa la ruta y la configuración del detector
+    simulado (cambiar el escenario invalida la calibración).
+    """
+    h = hashlib.sha256()
+    if es_ruta_stub(path):
+        h.update(path.encode('utf-8'))
+        config_stub = (config_vision or {}).get('detector_simulado', {})
+        h.update(json.dumps(config_stub, sort_keys=True).encode('utf-8'))
+    else:
+        with open(path, 'rb') as f:
+            for bloque in iter(lambda: f.read(1 << 20), b''):
+                h.update(bloque)
+    return h.hexdigest()[:16]
+
+
+class AlmacenCalibracion:
+    """
+    Archivo JSON con las últimas calibraciones Y, una por clave
+    (hash de modelo, cámara, resolución).
+
+    - buscar() retorna los centros si la clave coincide y no venció
+    - guardar() reemplaza la entrada de la clave y escribe de forma atómica
+      (archivo temporal + os.replace), así un corte de energía no deja el
+      archivo a medio escribir
+    """
+
+    def __init__(self, archivo: str = 'config/calibracion_y.json', max_dias: float = 0, logger=None):
+        """
+        Args:
+            archivo: Ruta del JSON de calibraciones
+            max_dias: Antigüedad máxima aceptada (0 = sin vencimiento)
+            logger: Instancia del logger
+        """
+        self.archivo = archivo
+        self.max_dias = max_dias
+        self.logger = logger
+        self._lock = threading.Lock()
+        # (ruta, tamaño, mtime) → hash: no rehashear el .pt en cada inicio del motor
+        self._cache_hash: Dict[Tuple, str] = {}
+
+    def clave(self, modelo_path: str, camara, resolucion: Tuple[int, int], config_vision: Optional[Dict] = None) -> Dict:
+        """
+        Arma la clave de una calibración.
+
+        Args:
+            modelo_path: Ruta del modelo Superior
+            camara: Identificador de la fuente Superior (índice, archivo o URL)
+            resolucion: (ancho, alto) del frame Superior
+            config_vision: Sección 'vision' (solo para modelos 'stub:')
+
+        Returns:
+            Diccionario {'modelo_hash', 'modelo', 'camara', 'resolucion'}
+        """
+        return {
+            'modelo_hash': self._hash_cacheado(modelo_path, config_vision),
+            'modelo': os.path.basename(str(modelo_path)),
+            'camara': str(camara),
+            'resolucion': [int(resolucion[0]), int(resolucion[1])],
+        }
+
+    def buscar(self, clave: Dict, total_posiciones: int) -> Optional[Dict]:
+        """
+        Busca una calibración vigente para la clave.
+
+        Returns:
+            Entrada guardada ({'centros': {columna: x}, 'fecha', ...}) o None
+        """
+        for entrada in self._leer().get('calibraciones', []):
+            if not self._coincide(entrada, clave):
+                continue
+            centros = {int(col): int(x) for col, x in entrada.get('centros', {}).items()}
+            if len(centros) != total_posiciones:
+                self._log(f"⚠️ Calibración guardada con {len(centros)} columnas (se esperan {total_posiciones}), se ignora", 'warning')
+                return None
+            if self.max_dias and time.time() - entrada.get('timestamp', 0) > self.max_dias * 86400:
+                self._log(f"⚠️ Calibración guardada vencida ({entrada.get('fecha')}), se recalibra", 'warning')
+                return None
+            return dict(entrada, centros=centros)
+        return None
+
+    def guardar(self, clave: Dict, centros: Dict[int, int], detalle: Optional[Dict] = None) -> bool:
+        """
+        Guarda (o reemplaza) la calibración de la clave.
+
+        Args:
+            clave: Resultado de clave()
+            centros: X_CENTROS_IDEALES {columna: x}
+            detalle: Datos extra a conservar (ej. distancia entre columnas)
+
+        Returns:
+            True si se escribió el archivo
+        """
+        ahora = time.time()
+        entrada = dict(clave)
+        entrada.update(detalle or {})
+        entrada.update({
+            'centros': {str(col): int(x) for col, x in sorted(centros.items())},
+            'timestamp': ahora,
+            'fecha': time.strftime('%Y-%m-%d %H:%M:%S', time.localtime(ahora)),
+        })
+        with self._lock:
+            datos = self._leer()
+            calibraciones = [e for e in datos.get('calibraciones', []) if not self._coincide(e, clave)]
+            calibraciones.insert(0, entrada)
+            datos = {'version': VERSION_ARCHIVO, 'calibraciones': calibraciones[:MAX_ENTRADAS]}
+            try:
+                directorio = os.path.dirname(self.archivo)
+                if directorio:
+                    os.makedirs(directorio, exist_ok=True)
+                temporal = self.archivo + '.tmp'
+                with open(temporal, 'w', encoding='utf-8') as f:
+                    json.dump(datos, f, indent=2, ensure_ascii=False)
+                os.replace(temporal, self.archivo)
+            except OSError as e:
+                self._log(f"⚠️ No se pudo guardar la calibración en {self.archivo}: {e}", 'warning')
+                return False
+        self._log(f"💾 Calibración Y guardada ({clave['modelo']}, cámara {clave['camara']}, "
+                  f"{clave['resolucion'][0]}x{clave['resolucion'][1]})")
+        return True
+
+    # ==================== INTERNOS ====================
+
+    @staticmethod
+    def _coincide(entrada: Dict, clave: Dict) -> bool:
+        return (entrada.get('modelo_hash') == clave['modelo_hash']
+                and entrada.get('camara') == clave['camara']
+                and entrada.get('resolucion') == clave['resolucion'])
+
+    def _leer(self) -> Dict:
+        try:
+            with open(self.archivo, 'r', encoding='utf-8') as f:
+                datos = json.load(f)
+            if datos.get('version') != VERSION_ARCHIVO:
+                return {}
+            return datos
+        except FileNotFoundError:
+            return {}
+        except (OSError, ValueError) as e:
+            self._log(f"⚠️ Archivo de calibración ilegible ({self.archivo}): {e}", 'warning')
+            return {}
+
+    def _hash_cacheado(self, path: str, config_vision: Optional[Dict]) -> str:
+        if es_ruta_stub(path):
+            return hash_modelo(path, config_vision)
+        estado = os.stat(path)
+        clave_cache = (os.path.abspath(path), estado.st_size, estado.st_mtime_ns)
+        if clave_cache not in self._cache_hash:
+            self._cache_hash[clave_cache] = hash_modelo(path)
+        return self._cache_hash[clave_cache]
+
+    def _log(self, mensaje: str, nivel: str = 'info', *args):
+        """Helper para loggear (formato %% diferido)"""
+        log_diferido(self.logger, mensaje, nivel, *args)
+
+
+def crear_almacen_desde_config(config: Dict, logger=None) -> Optional[AlmacenCalibracion]:
+    """
+    Crea el almacén si 'vision.calibracion.persistir' es true en el JSON.
+
+    Returns:
+        AlmacenCalibracion, o None si la persistencia está deshabilitada
+    """
+    config_calibracion = config.get('vision', {}).get('calibracion', {})
+    if not config_calibracion.get('persistir', False):
+        return None
+    return AlmacenCalibracion(
+        archivo=config_calibracion.get('archivo', 'config/calibracion_y.json'),
+        max_dias=config_calibracion.get('max_dias', 0),
+        logger=logger
+    )
@@ -0,0 +1,384 @@
+"""
+CameraSource - Módulo de adquisición de video
+Abstrae cámaras USB, archivos de video y cámaras IP (RTSP/HTTP)
+con lectura de baja latencia y reconexión automática
+"""
+
+import os
+import threading
+import time
+from typing import Dict, Optional, Tuple, Union
+
+from utils.lazy_imports import ModuloDiferido
+from utils.logger_prueba import log_diferido
+from utils.metrics import METRICAS
+
+cv2 = ModuloDiferido('cv2')  # se importa al abrir la primera fuente
+
+
+# Prefijos que identifican una cámara IP
+PREFIJOS_RED = ('rtsp://', 'rtsps://', 'http://', 'https://')
+
+
+class FuenteCamara:
+    """
+    Fuente de video para una cámara (Superior o Lateral).
+
+    Responsabilidades:
+    - Abrir la fuente: índice USB, archivo de video o URL RTSP/HTTP
+    - En fuentes en vivo, mantener SOLO el frame más reciente (sin buffer acumulado)
+    - Reconectar automáticamente con backoff exponencial ante cortes de red
+    - Contabilizar frames leídos/descartados, reconexiones y latencia del frame
+
+    Los archivos de video se leen secuencialmente (modo simulación, se procesa
+    cada frame). Con 'simular_tiempo_real' un archivo se comporta como una
+    cámara IP: se lee a su FPS nominal en un hilo, se descartan frames si el
+    consumidor no alcanza y el fin de archivo se trata como un corte de red.
+    """
+
+    def __init__(self,
+                 fuente: Union[int, str],
+                 nombre: str = 'camara',
+                 config: Optional[Dict] = None,
+                 logger=None):
+        """
+        Inicializa la fuente (no la abre todavía, ver abrir()).
+
+        Args:
+            fuente: Índice USB (int o "0"), ruta de archivo o URL rtsp://, http://
+            nombre: Nombre de la cámara para logs ('superior', 'lateral')
+            config: Sección de la cámara en el JSON ('camaras' → nombre)
+            logger: Instancia del logger (si es None, usa print)
+        """
+        config = config or {}
+        self.nombre = nombre
+        self.logger = logger
+
+        if isinstance(fuente, str) and fuente.strip().isdigit():
+            fuente = int(fuente.strip())
+        self.fuente = fuente
+
+        self.es_red = isinstance(fuente, str) and fuente.lower().startswith(PREFIJOS_RED)
+        self.es_usb = isinstance(fuente, int)
+        self.simular_tiempo_real = bool(config.get('simular_tiempo_real', False))
+        # En vivo: hilo lector + último frame. Archivo: lectura secuencial directa.
+        self.en_vivo = self.es_red or self.es_usb or self.simular_tiempo_real
+
+        self.buffer_frames = int(config.get('buffer_frames', 1))
+        self.timeout_lectura_s = float(config.get('timeout_lectura_s', 2.0))
+        self.timeout_apertura_s = float(config.get('timeout_apertura_s', 5.0))
+        self.reconexion_inicial_s = float(config.get('reconexion_inicial_s', 0.5))
+        self.reconexion_max_s = float(config.get('reconexion_max_s', 10.0))
+        self.transporte_rtsp = config.get('transporte_rtsp', 'tcp')
+
+        self._cap = None
+        self._hilo = None
+        self._detener = threading.Event()
+        self._cond = threading.Condition()
+        self._abierta = False
+        self.conectada = False
+        self.fps = 0.0
+
+        # Último frame (solo en vivo)
+        self._frame = None
+        self._t_frame = 0.0
+        self._seq = 0
+        self._seq_consumido = 0
+
+        # Contadores
+        self.frames_leidos = 0
+        self.frames_entregados = 0
+        self.frames_descartados = 0
+        self.lecturas_fallidas = 0
+        self.reconexiones = 0
+        self.latencia_ms = 0.0
+        self.latencia_max_ms = 0.0
+
+        # Métricas exportadas (por cámara)
+        etiquetas = {'camara': nombre}
+        self._m_leidos = METRICAS.contador('camara_frames_leidos_total', 'Frames leídos de la fuente', etiquetas)
+        self._m_descartados = METRICAS.contador('camara_frames_descartados_total', 'Frames reemplazados sin consumir', etiquetas)
+        self._m_fallidas = METRICAS.contador('camara_lecturas_fallidas_total', 'Lecturas fallidas o vencidas', etiquetas)
+        self._m_reconexiones = METRICAS.contador('camara_reconexiones_total', 'Reconexiones exitosas', etiquetas)
+        self._m_edad = METRICAS.histograma('camara_edad_frame_segundos', 'Antigüedad del frame al entregarlo', etiquetas)
+        self._m_conectada = METRICAS.medidor('camara_conectada', '1 si la fuente está conectada', etiquetas)
+
+    # ==================== LOG ====================
+
+    def _log(self, mensaje: str, nivel: str = 'info', *args):
+        """Helper para loggear (formato %% diferido)"""
+        log_diferido(self.logger, mensaje, nivel, *args)
+
+    # ==================== APERTURA ====================
+
+    def _crear_captura(self):
+        """Crea el cv2.VideoCapture con las opciones de baja latencia"""
+        if self.es_red:
+            if self.fuente.lower().startswith(('rtsp://', 'rtsps://')) and self.transporte_rtsp:
+                os.environ.setdefault('OPENCV_FFMPEG_CAPTURE_OPTIONS',
+                                      f'rtsp_transport;{self.transporte_rtsp}')
+            params = []
+            if hasattr(cv2, 'CAP_PROP_OPEN_TIMEOUT_MSEC'):
+                params += [cv2.CAP_PROP_OPEN_TIMEOUT_MSEC, int(self.timeout_apertura_s * 1000)]
+            if hasattr(cv2, 'CAP_PROP_READ_TIMEOUT_MSEC'):
+                params += [cv2.CAP_PROP_READ_TIMEOUT_MSEC, int(self.timeout_lectura_s * 1000)]
+            cap = cv2.VideoCapture(self.fuente, cv2.CAP_FFMPEG, params) if params \
+                else cv2.VideoCapture(self.fuente, cv2.CAP_FFMPEG)
+        else:
+            cap = cv2.VideoCapture(self.fuente)
+
+        if cap.isOpened() and self.en_vivo:
+            # Buffer mínimo: no acumular frames viejos en el driver
+            cap.set(cv2.CAP_PROP_BUFFERSIZE, self.buffer_frames)
+        return cap
+
+    def abrir(self) -> bool:
+        """
+        Abre la fuente. En fuentes en vivo arranca el hilo lector, que
+        seguirá reintentando aunque la primera conexión falle.
+
+        Returns:
+            True si la fuente quedó abierta (en vivo: si el hilo está corriendo
+            y la primera conexión fue exitosa)
+        """
+        if self._abierta:
+            return True
+
+        self._cap = self._crear_captura()
+        self.conectada = self._cap.isOpened()
+        self._m_conectada.set(1 if self.conectada else 0)
+        if self.conectada:
+            self.fps = self._cap.get(cv2.CAP_PROP_FPS) or 0.0
+
+        if not self.en_vivo:
+            self._abierta = self.conectada
+            if not self.conectada:
+                self._log(f"❌ No se pudo abrir la fuente {self.nombre}: {self.fuente}", 'error')
+            return self._abierta
+
+        if not self.conectada:
+            self._log(f"⚠️ Cámara {self.nombre} no disponible ({self.fuente}), reintentando en segundo plano...", 'warning')
+            self._cap.release()
+            self._cap = None
+
+        self._detener.clear()
+        self._abierta = True
+        self._hilo = threading.Thread(target=self._bucle_lector, name=f"Camara-{self.nombre}", daemon=True)
+        self._hilo.start()
+        return self.conectada
+
+    def esta_abierta(self) -> bool:
+        """True si la fuente está abierta (en vivo: aunque esté reconectando)"""
+        return self._abierta
+
+    def liberar(self) -> None:
+        """
+        Detiene el hilo lector y libera la captura.
+
+        En vivo la captura la libera el propio hilo lector al salir: si sigue
+        bloqueado en read() al vencer el join, liberarla desde aquí dejaría
+        a read() trabajando sobre una captura ya liberada.
+        """
+        self._abierta = False
+        self._detener.set()
+        with self._cond:
+            self._cond.notify_all()
+        if self._hilo and self._hilo.is_alive():
+            self._hilo.join(timeout=self.timeout_lectura_s + 1.0)
+            if self._hilo.is_alive():
+                self._log(f"⚠️ Cámara {self.nombre}: el hilo lector no terminó, "
+                          f"liberará la captura al salir", 'warning')
+        elif self._cap is not None:
+            self._cap.release()
+            self._cap = None
+        self._hilo = None
+        self.conectada = False
+        self._m_conectada.set(0)
+
+    # ==================== HILO LECTOR (EN VIVO) ====================
+
+    def _reconectar(self) -> bool:
+        """Reintenta abrir la fuente con backoff exponencial hasta lograrlo o detenerse"""
+        intento = 0
+        while not self._detener.is_set():
+            espera = min(self.reconexion_inicial_s * (2 ** intento), self.reconexion_max_s)
+            if self._detener.wait(espera):
+                return False
+            intento += 1
+            cap = self._crear_captura()
+            if cap.isOpened():
+                self._cap = cap
+                self.fps = cap.get(cv2.CAP_PROP_FPS) or self.fps
+                self.conectada = True
+                self.reconexiones += 1
+                self._m_reconexiones.inc()
+                self._m_conectada.set(1)
+                self._log(f"✅ Cámara {self.nombre} reconectada (intento {intento})")
+                return True
+            cap.release()
+            if intento == 1 or intento % 10 == 0:
+                self._log(f"⚠️ Cámara {self.nombre}: reconexión fallida (intento {intento}, próximo en "
+                          f"{min(self.reconexion_inicial_s * (2 ** intento), self.reconexion_max_s):.1f}s)", 'warning')
+        return False
+
+    def _bucle_lector(self):
+        """Lee continuamente y conserva solo el frame más reciente"""
+        periodo = 0.0
+        t_siguiente = time.monotonic()
+
+        while not self._detener.is_set():
+            if self._cap is None and not self._reconectar():
+                break
+
+            if self.simular_tiempo_real:
+                # Archivo como cámara en vivo: respetar el FPS nominal
+                periodo = 1.0 / self.fps if self.fps > 0 else 1.0 / 30.0
+                t_siguiente += periodo
+                retraso = t_siguiente - time.monotonic()
+                if retraso > 0:
+                    if self._detener.wait(retraso):
+                        break
+                else:
+                    t_siguiente = time.monotonic()
+
+            ok, frame = self._cap.read()
+            if not ok or frame is None:
+                self.lecturas_fallidas += 1
+                self._m_fallidas.inc()
+                self.conectada = False
+                self._m_conectada.set(0)
+                self._log(f"⚠️ Cámara {self.nombre}: lectura fallida, reconectando...", 'warning')
+                self._cap.release()
+                self._cap = None
+                continue
+
+            t_captura = time.monotonic()
+            with self._cond:
+                if self._seq > self._seq_consumido:
+                    self.frames_descartados += 1
+                    self._m_descartados.inc()
+                self._frame = frame
+                self._t_frame = t_captura
+                self._seq += 1
+                self.frames_leidos += 1
+                self._cond.notify_all()
+            self._m_leidos.inc()
+
+        if self._cap is not None:
+            self._cap.release()
+            self._cap = None
+        self.conectada = False
+
+    # ==================== LECTURA ====================
+
+    def leer(self, timeout_s: Optional[float] = None) -> Tuple[bool, Optional[object]]:
+        """
+        Devuelve el siguiente frame disponible.
+
+        En vivo: el frame más reciente que aún no se haya entregado; espera
+        hasta timeout_s si no hay uno nuevo. Un fallo de lectura NO cierra la
+        fuente: el hilo lector sigue reconectando.
+
+        Args:
+            timeout_s: Espera máxima (por defecto 'timeout_lectura_s')
+
+        Returns:
+            (ok, frame) con la misma semántica que cv2.VideoCapture.read()
+        """
+        if not self._abierta:
+            return False, None
+
+        if not self.en_vivo:
+            ok, frame = self._cap.read()
+            if ok:
+                self.frames_leidos += 1
+                self.frames_entregados += 1
+                self._m_leidos.inc()
+            else:
+                self.lecturas_fallidas += 1
+                self._m_fallidas.inc()
+            return ok, frame
+
+        limite = time.monotonic() + (self.timeout_lectura_s if timeout_s is None else timeout_s)
+        with self._cond:
+            while self._seq <= self._seq_consumido and self._abierta:
+                restante = limite - time.monotonic()
+                if restante <= 0:
+                    self.lecturas_fallidas += 1
+                    self._m_fallidas.inc()
+                    return False, None
+                self._cond.wait(restante)
+            if not self._abierta:
+                return False, None
+            frame = self._frame
+            self._seq_consumido = self._seq
+            self.frames_entregados += 1
+            self.latencia_ms = (time.monotonic() - self._t_frame) * 1000.0
+            self.latencia_max_ms = max(self.latencia_max_ms, self.latencia_ms)
+        self._m_edad.observar(self.latencia_ms / 1000.0)
+        return True, frame
+
+    def reiniciar(self) -> None:
+        """Vuelve al primer frame (solo archivos en modo secuencial)"""
+        if not self.en_vivo and self._cap is not None:
+            self._cap.set(cv2.CAP_PROP_POS_FRAMES, 0)
+
+    def estadisticas(self) -> Dict:
+        """
+        Retorna los contadores de la fuente.
+
+        Returns:
+            Diccionario con frames leídos/entregados/descartados, reconexiones y latencia
+        """
+        return {
+            'nombre': self.nombre,
+            'conectada': self.conectada,
+            'en_vivo': self.en_vivo,
+            'fps': self.fps,
+            'frames_leidos': self.frames_leidos,
+            'frames_entregados': self.frames_entregados,
+            'frames_descartados': self.frames_descartados,
+            'lecturas_fallidas': self.lecturas_fallidas,
+            'reconexiones': self.reconexiones,
+            'latencia_ms': round(self.latencia_ms, 2),
+            'latencia_max_ms': round(self.latencia_max_ms, 2),
+        }
+
+
+def crear_fuente_desde_config(config: Dict, nombre: str, logger=None) -> Optional[FuenteCamara]:
+    """
+    Crea la fuente de una cámara a partir de la sección 'camaras' del JSON.
+
+    Args:
+        config: Configuración completa (del JSON)
+        nombre: 'superior' o 'lateral'
+        logger: Instancia del logger
+
+    Returns:
+        FuenteCamara sin abrir, o None si la cámara no tiene 'fuente' configurada
+    """
+    config_camara = config.get('camaras', {}).get(nombre, {})
+    fuente = config_camara.get('fuente')
+    if fuente is None or fuente == '':
+        return None
+    return FuenteCamara(fuente, nombre, config_camara, logger)
+
+
+# =============================================================================
+# EJEMPLO DE USO
+# =============================================================================
+if __name__ == "__main__":
+    import sys
+
+    # Prueba con un archivo local simulando una cámara IP:
+    #   python -m core.camera_source videoCS.mp4
+    ruta = sys.argv[1] if len(sys.argv) > 1 else "videoCS.mp4"
+    camara = FuenteCamara(ruta, 'prueba', {'simular_tiempo_real': True, 'reconexion_inicial_s': 0.2})
+
+    if camara.abrir():
+        t_fin = time.monotonic() + 10
+        while time.monotonic() < t_fin:
+            ok, frame = camara.leer()
+            time.sleep(0.1)  # Consumidor más lento que la cámara → frames descartados
+        print(camara.estadisticas())
+        camara.liberar()
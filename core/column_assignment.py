@@ -0,0 +1,62 @@
+"""
+ColumnAssignment - Asignación de detecciones Superiores a columnas ideales
+Convierte las cajas 'posicion_columna' / 'posicion_vacia' de un frame en un
+estado por columna (producto, vacío o desconocido) sin contar dos veces la
+misma columna.
+"""
+
+from typing import Tuple
+
+import numpy as np
+
+# Estado de cada columna ideal tras la asignación de detecciones
+COLUMNA_DESCONOCIDA = -1
+COLUMNA_VACIA = 0
+COLUMNA_PRODUCTO = 1
+SIMBOLOS_COLUMNA = {COLUMNA_DESCONOCIDA: '?', COLUMNA_VACIA: 'V', COLUMNA_PRODUCTO: 'P'}
+
+
+def asignar_columnas(x_detecciones: np.ndarray,
+                     estado_detecciones: np.ndarray,
+                     x_ideales: np.ndarray,
+                     max_distancia_px: float) -> Tuple[np.ndarray, np.ndarray, int]:
+    """
+    Asigna cada detección a lo sumo a una columna ideal y viceversa.
+
+    Matriz de distancias detección × columna con NumPy; los pares dentro de
+    'max_distancia_px' se toman del más cercano al más lejano (a igual
+    distancia gana VACÍO) y se descartan los que repiten detección o
+    columna. Ordenar los n × m pares cuesta O(nm log nm) (con n, m ≈ 10 es
+    despreciable frente a la inferencia); con la compuerta en medio paso
+    cada detección deja a lo sumo dos pares, así el recorrido posterior es O(n).
+
+    Args:
+        x_detecciones: Centros X (n,)
+        estado_detecciones: COLUMNA_PRODUCTO / COLUMNA_VACIA por detección (n,)
+        x_ideales: Centros ideales ordenados por columna (m,)
+        max_distancia_px: Compuerta de asignación
+
+    Returns:
+        (estado por columna (m,) int8, x asignado por columna (m,) con NaN
+         si no hay, detecciones descartadas por duplicadas o fuera de la compuerta)
+    """
+    n_columnas = x_ideales.size
+    estados = np.full(n_columnas, COLUMNA_DESCONOCIDA, dtype=np.int8)
+    x_asignado = np.full(n_columnas, np.nan)
+    if x_detecciones.size == 0 or n_columnas == 0:
+        return estados, x_asignado, int(x_detecciones.size)
+
+    distancias = np.abs(x_detecciones[:, None] - x_ideales[None, :]).ravel()
+    desempate = np.repeat(estado_detecciones, n_columnas)
+    orden = np.lexsort((desempate, distancias))
+    orden = orden[distancias[orden] <= max_distancia_px]
+    filas, columnas = np.divmod(orden, n_columnas)
+
+    deteccion_usada = np.zeros(x_detecciones.size, dtype=bool)
+    for fila, columna in zip(filas.tolist(), columnas.tolist()):
+        if deteccion_usada[fila] or estados[columna] != COLUMNA_DESCONOCIDA:
+            continue
+        deteccion_usada[fila] = True
+        estados[columna] = estado_detecciones[fila]
+        x_asignado[columna] = x_detecciones[fila]
+    return estados, x_asignado, int(x_detecciones.size - deteccion_usada.sum())
@@ -0,0 +1,195 @@
+"""
+ColumnCalibration - Calibración Y robusta con varios frames
+Acumula los centros X de 'posicion_columna' / 'posicion_vacia' de N frames
+Superiores y ajusta por mínimos cuadrados la rejilla x = offset + k * paso.
+Tolera columnas que faltan en algunos frames (o en todos), detecciones
+duplicadas y falsos positivos aislados.
+"""
+
+import time
+from typing import Dict, Optional
+
+import numpy as np
+
+ITERACIONES_AJUSTE = 3
+
+
+def ajustar_columnas(centros_x, total_posiciones: int, tolerancia_px: float,
+                     max_residuo_px: float = 0.0) -> Dict:
+    """
+    Ajusta paso y offset de la rejilla de columnas.
+
+    1. Agrupa los centros (de todos los frames) separados por menos de
+       'tolerancia_px': cada grupo es una columna vista
+    2. Paso inicial = mediana de la separación entre grupos, corregida por
+       los huecos de columnas que nunca se vieron (separación ≈ k * paso);
+       las separaciones que no caen cerca de un múltiplo no cuentan
+    3. Mínimos cuadrados sobre todas las detecciones con índice entero
+       k = round((x - offset) / paso), descartando las que quedan a más de
+       'tolerancia_px' de la rejilla; se repite ITERACIONES_AJUSTE veces
+
+    La columna 1 es la primera columna vista (igual que la calibración de un frame).
+
+    Args:
+        centros_x: Centros X detectados (cualquier forma, se aplanan)
+        total_posiciones: Columnas esperadas
+        tolerancia_px: Separación máxima entre detecciones de la misma columna
+        max_residuo_px: RMS máximo aceptado (0 = sin límite)
+
+    Returns:
+        {'ok', 'motivo', 'centros' {columna: x}, 'paso_px', 'offset_px',
+         'residuo_rms_px', 'residuo_max_px', 'residuo_por_columna' {columna: px},
+         'detecciones', 'descartadas', 'columnas_vistas'}
+    """
+    x = np.sort(np.asarray(centros_x, dtype=np.float64).ravel())
+    resultado = {'ok': False, 'motivo': None, 'centros': {}, 'detecciones': int(x.size)}
+
+    # 1. Grupos (una columna vista = varias detecciones cercanas)
+    inicios = np.concatenate(([0], np.flatnonzero(np.diff(x) > tolerancia_px) + 1)) if x.size else np.empty(0, int)
+    if inicios.size < 2:
+        resultado['motivo'] = f"se necesitan al menos 2 columnas (vistas: {inicios.size})"
+        return resultado
+    cantidades = np.diff(np.concatenate((inicios, [x.size])))
+    centros_grupo = np.add.reduceat(x, inicios) / cantidades
+
+    # 2. Paso inicial robusto a columnas faltantes y falsos positivos (las
+    #    separaciones que no son un múltiplo del paso no lo corrigen)
+    separaciones = np.diff(centros_grupo)
+    paso = float(np.median(separaciones))
+    multiplos = np.rint(separaciones / paso)
+    regulares = (multiplos >= 1) & (np.abs(separaciones - multiplos * paso) <= tolerancia_px)
+    if regulares.any():
+        paso = float(separaciones[regulares].sum() / multiplos[regulares].sum())
+    # Ancla en la columna con más detecciones (un falso positivo aparece en pocos frames)
+    offset = float(centros_grupo[int(np.argmax(cantidades))])
+
+    # 3. Mínimos cuadrados con descarte de atípicos
+    validas = np.ones(x.size, dtype=bool)
+    for _ in range(ITERACIONES_AJUSTE):
+        k = np.rint((x - offset) / paso)
+        validas = np.abs(x - (offset + k * paso)) <= tolerancia_px
+        if np.unique(k[validas]).size < 2:
+            resultado['motivo'] = "las detecciones no forman una rejilla regular"
+            return resultado
+        matriz = np.column_stack((k[validas], np.ones(int(validas.sum()))))
+        (paso, offset), *_ = np.linalg.lstsq(matriz, x[validas], rcond=None)
+        paso, offset = float(paso), float(offset)
+        if paso <= 0:
+            resultado['motivo'] = "paso no positivo"
+            return resultado
+
+    k = np.rint((x - offset) / paso).astype(np.int64)
+    residuos = x - (offset + k * paso)
+    validas = np.abs(residuos) <= tolerancia_px
+    k_min = int(k[validas].min())
+    indices = k[validas] - k_min
+    offset += k_min * paso
+    residuos = residuos[validas]
+
+    columnas_vistas = np.unique(indices)
+    resultado.update({
+        'paso_px': round(paso, 2),
+        'offset_px': round(offset, 2),
+        'residuo_rms_px': round(float(np.sqrt(np.mean(residuos ** 2))), 2),
+        'residuo_max_px': round(float(np.abs(residuos).max()), 2),
+        'residuo_por_columna': {
+            int(col) + 1: round(float(r), 2)
+            for col, r in zip(columnas_vistas,
+                              np.sqrt(np.bincount(indices, weights=residuos ** 2)[columnas_vistas]
+                                      / np.bincount(indices)[columnas_vistas]))
+        },
+        'descartadas': int(x.size - residuos.size),
+        'columnas_vistas': int(columnas_vistas.size),
+    })
+
+    if indices.max() >= total_posiciones:
+        resultado['motivo'] = f"la rejilla abarca {int(indices.max()) + 1} columnas (máximo {total_posiciones})"
+        return resultado
+    if max_residuo_px and resultado['residuo_rms_px'] > max_residuo_px:
+        resultado['motivo'] = f"residuo RMS {resultado['residuo_rms_px']} px > {max_residuo_px} px"
+        return resultado
+
+    ideales = np.rint(offset + np.arange(total_posiciones) * paso).astype(np.int64)
+    resultado['centros'] = {i + 1: int(x_ideal) for i, x_ideal in enumerate(ideales)}
+    resultado['ok'] = True
+    return resultado
+
+
+class CalibradorColumnas:
+    """
+    Acumula los centros de columna de N frames y ajusta la rejilla.
+
+    La inferencia la hace VisionProcessor.detectar_centros_columna con el
+    modelo Superior, en el hilo del motor (nunca en paralelo con una inspección).
+    """
+
+    def __init__(self, vision_processor, frames: int = 10, max_residuo_px: float = 0.0):
+        """
+        Args:
+            vision_processor: VisionProcessor con el modelo Superior cargado
+            frames: Frames a acumular antes de ajustar
+            max_residuo_px: RMS máximo aceptado (0 = sin límite)
+        """
+        self.vision_processor = vision_processor
+        self.frames = max(1, int(frames))
+        self.max_residuo_px = max_residuo_px
+        self._centros = []
+        self.frames_acumulados = 0
+
+    @property
+    def completo(self) -> bool:
+        return self.frames_acumulados >= self.frames
+
+    def agregar(self, frame_sup) -> bool:
+        """Detecta y acumula los centros del frame. Retorna True al completar N frames."""
+        self._centros.append(self.vision_processor.detectar_centros_columna(frame_sup))
+        self.frames_acumulados += 1
+        return self.completo
+
+    def ajustar(self) -> Dict:
+        """Ajusta la rejilla con lo acumulado (ver ajustar_columnas)"""
+        centros = np.concatenate(self._centros) if self._centros else np.empty(0)
+        resultado = ajustar_columnas(centros, self.vision_processor.TOTAL_POSICIONES,
+                                     self.vision_processor.TOLERANCIA_COLUMNA_PX, self.max_residuo_px)
+        resultado['frames'] = self.frames_acumulados
+        return resultado
+
+
+class RecalibracionEnMarcha:
+    """
+    Recalibración con el motor corriendo, de a un frame por ciclo.
+
+    El motor llama avanzar() con el frame Superior que ya capturó, solo entre
+    inspecciones (sin solicitud del PLC o después de responder): la inferencia
+    de calibración nunca compite con una inspección por el modelo Superior.
+    La calibración vigente se sigue usando hasta que avanzar() devuelve el ajuste.
+    """
+
+    def __init__(self, calibrador: CalibradorColumnas, timeout_s: float = 30.0):
+        """
+        Args:
+            calibrador: CalibradorColumnas nuevo (sin frames)
+            timeout_s: Plazo para reunir los frames (ej. cámara detenida)
+        """
+        self.calibrador = calibrador
+        self.timeout_s = timeout_s
+        self._limite = time.monotonic() + timeout_s
+
+    def avanzar(self, frame_sup) -> Optional[Dict]:
+        """
+        Acumula un frame Superior.
+
+        Returns:
+            El ajuste (ver ajustar_columnas) al completar N frames o vencer el
+            plazo, None mientras acumula
+        """
+        if time.monotonic() > self._limite:
+            return {'ok': False, 'centros': {}, 'frames': self.calibrador.frames_acumulados,
+                    'motivo': f"sin frames suficientes en {self.timeout_s:.0f} s"}
+        try:
+            if not self.calibrador.agregar(frame_sup):
+                return None
+            return self.calibrador.ajustar()
+        except Exception as e:
+            return {'ok': False, 'centros': {}, 'motivo': str(e),
+                    'frames': self.calibrador.frames_acumulados}
@@ -0,0 +1,137 @@
+"""
+DriftMonitor - Detección de deriva de la calibración Y
+Sigue, inspección a inspección, el residuo entre los centros de columna
+asignados y los centros ideales (media con signo = desplazamiento de la
+cámara, RMS = desplazamiento + cambio de escala). Cuando el residuo supera
+el umbral durante varias inspecciones seguidas, pide una recalibración en
+marcha al motor.
+"""
+
+from typing import Dict, Optional
+
+from utils.logger_prueba import log_diferido
+from utils.metrics import METRICAS
+
+
+class MonitorDeriva:
+    """
+    Medias móviles exponenciales (EWMA) del residuo: O(1) en memoria y
+    tiempo por inspección, sin guardar historial.
+
+    - actualizar() se llama después de escribir en el PLC (fuera del camino crítico)
+    - Tras pedir una recalibración espera 'espera_inspecciones' antes de
+      volver a evaluar (la recalibración tarda N frames y puede fallar)
+    - reiniciar() al aplicar centros nuevos: el residuo previo ya no vale
+    """
+
+    def __init__(self,
+                 alfa: float = 0.1,
+                 umbral_px: float = 8.0,
+                 umbral_rms_px: float = 12.0,
+                 persistencia: int = 10,
+                 min_columnas: int = 2,
+                 espera_inspecciones: int = 30,
+                 logger=None):
+        """
+        Args:
+            alfa: Peso de la inspección nueva en la EWMA (0-1)
+            umbral_px: |media EWMA| que se considera deriva
+            umbral_rms_px: RMS EWMA que se considera deriva
+            persistencia: Inspecciones seguidas sobre el umbral para recalibrar
+            min_columnas: Columnas asignadas mínimas para usar una inspección
+            espera_inspecciones: Inspecciones sin evaluar tras pedir recalibración
+            logger: Instancia del logger
+        """
+        self.alfa = alfa
+        self.umbral_px = umbral_px
+        self.umbral_rms_px = umbral_rms_px
+        self.persistencia = max(1, int(persistencia))
+        self.min_columnas = max(1, int(min_columnas))
+        self.espera_inspecciones = espera_inspecciones
+        self.logger = logger
+
+        self._m_media = METRICAS.medidor('calibracion_deriva_px', 'Residuo medio EWMA columnas detectadas - ideales')
+        self._m_rms = METRICAS.medidor('calibracion_deriva_rms_px', 'Residuo RMS EWMA columnas detectadas - ideales')
+        self._m_recalibraciones = METRICAS.contador('calibracion_recalibraciones_deriva_total',
+                                                    'Recalibraciones Y pedidas por deriva')
+        self.reiniciar()
+
+    def reiniciar(self) -> None:
+        """Olvida el residuo acumulado (centros nuevos)"""
+        self.media_px = 0.0
+        self.rms_px = 0.0
+        self.muestras = 0
+        self.consecutivas = 0
+        self._espera = 0
+        self._m_media.set(0.0)
+        self._m_rms.set(0.0)
+
+    def actualizar(self, residuo: Optional[Dict]) -> bool:
+        """
+        Incorpora el residuo de una inspección.
+
+        Args:
+            residuo: resultado['residuo_columnas_px'] ({'media', 'rms', 'columnas'})
+
+        Returns:
+            True si hay que recalibrar
+        """
+        if not residuo or residuo.get('columnas', 0) < self.min_columnas:
+            return False
+
+        if self.muestras == 0:
+            self.media_px = residuo['media']
+            self.rms_px = residuo['rms']
+        else:
+            self.media_px += self.alfa * (residuo['media'] - self.media_px)
+            self.rms_px += self.alfa * (residuo['rms'] - self.rms_px)
+        self.muestras += 1
+        self._m_media.set(round(self.media_px, 2))
+        self._m_rms.set(round(self.rms_px, 2))
+
+        if self._espera > 0:
+            self._espera -= 1
+            return False
+
+        if abs(self.media_px) > self.umbral_px or self.rms_px > self.umbral_rms_px:
+            self.consecutivas += 1
+        else:
+            self.consecutivas = 0
+        if self.consecutivas < self.persistencia:
+            return False
+
+        self._log(f"📐 Deriva de calibración Y: media {self.media_px:+.1f} px, RMS {self.rms_px:.1f} px "
+                  f"durante {self.consecutivas} inspecciones", 'warning')
+        self.consecutivas = 0
+        self._espera = self.espera_inspecciones
+        self._m_recalibraciones.inc()
+        return True
+
+    def estado(self) -> Dict:
+        return {'media_px': round(self.media_px, 2), 'rms_px': round(self.rms_px, 2),
+                'muestras': self.muestras, 'consecutivas': self.consecutivas}
+
+    def _log(self, mensaje: str, nivel: str = 'info', *args):
+        """Helper para loggear (formato %% diferido)"""
+        log_diferido(self.logger, mensaje, nivel, *args)
+
+
+def crear_monitor_deriva_desde_config(config: Dict, logger=None) -> Optional[MonitorDeriva]:
+    """
+    Crea el monitor si 'vision.deriva.habilitado' es true en el JSON.
+
+    Returns:
+        MonitorDeriva, o None si está deshabilitado
+    """
+    config_deriva = config.get('vision', {}).get('deriva', {})
+    if not config_deriva.get('habilitado', False):
+        return None
+    return MonitorDeriva(
+        alfa=config_deriva.get('alfa', 0.1),
+        umbral_px=config_deriva.get('umbral_px', 8.0),
+        umbral_rms_px=config_deriva.get('umbral_rms_px', 12.0),
+        persistencia=config_deriva.get('persistencia', 10),
+        min_columnas=config_deriva.get('min_columnas', 2),
+        espera_inspecciones=config_deriva.get('espera_inspecciones', 30),
+        logger=logger
+    )
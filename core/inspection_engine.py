@@ -0,0 +1,514 @@
+"""
+InspectionEngine - Motor de inspección en hilo propio
+Ejecuta el ciclo captura → PLC → visión → validación → escritura PLC
+fuera del hilo de la interfaz gráfica y publica los resultados en una cola
+"""
+
+import queue
+import threading
+import time
+from typing import Dict, Optional, Tuple
+
+from utils.logger_prueba import log_resultado_procesamiento, log_estado_plc
+from utils.metrics import METRICAS
+from utils import tracing
+from utils.profiler import PERFILADOR_NULO
+from core.column_calibration import CalibradorColumnas, RecalibracionEnMarcha
+from core.drift_monitor import crear_monitor_deriva_desde_config
+
+
+class MotorInspeccion(threading.Thread):
+    """
+    Hilo dueño del pipeline de inspección.
+
+    Responsabilidades:
+    - Calibración Y inicial (si el VisionProcessor aún no está calibrado) y
+      recalibración a pedido; con 'vision.calibracion.frames' > 1 se ajusta
+      sobre N frames y, durante la marcha, en un hilo aparte sin frenar el loop
+    - Recalibración automática si el monitor de deriva ('vision.deriva') ve
+      que las columnas se alejan de los centros ideales (solo con inspecciones
+      OK; se rechaza si los centros nuevos se alejan más de
+      TOLERANCIA_COLUMNA_PX de la calibración de puesta en marcha)
+    - Capturar frames de ambas fuentes y consultar el PLC (o simular)
+    - Ejecutar procesar_frames_dual, validar y escribir en el PLC
+    - Publicar eventos en 'self.eventos' (cola acotada) y el último par de
+      frames en un slot que la interfaz lee cuando quiere
+    - Notificar a observadores adicionales (ej. dashboard web), que deben
+      ser no bloqueantes: se llaman en el hilo del motor
+
+    La interfaz NUNCA toca el PLC ni el VisionProcessor mientras el motor
+    corre: solo consume la cola y renderiza. Así la respuesta al PLC no
+    depende de redibujar widgets.
+
+    Eventos publicados (dict con clave 'tipo'):
+    - 'estado': {'mensaje'}
+    - 'calibrado': {'centros', 'ok', 'origen', 'residuo_rms_px', 'motivo'} (origen: 'guardada', 'inferencia'
+      o 'deriva'; residuo_rms_px solo en la calibración de N frames; motivo si se rechazó)
+    - 'resultado': {'resultado', 'valido', 'advertencias', 'ciclo', 'duracion_ms'}
+    - 'escritura_fallida': {}
+    - 'parada': {'resultado'} → el motor se detiene
+    - 'fin': {'mensaje'} → fin de video, el motor se detiene
+    - 'error': {'mensaje'} → excepción no controlada, el motor se detiene
+    """
+
+    def __init__(self,
+                 config: Dict,
+                 logger,
+                 vision_processor,
+                 fuente_sup,
+                 fuente_lat,
+                 controlador_plc=None,
+                 modo_simulacion: bool = True,
+                 tamano_cola: int = 32,
+                 diario=None,
+                 trazador=None,
+                 perfilador=None,
+                 almacen_calibracion=None,
+                 recalibrar: bool = False):
+        """
+        Inicializa el motor (no arranca el hilo, ver start()).
+
+        Args:
+            config: Configuración completa (del JSON)
+            logger: Instancia del logger
+            vision_processor: VisionProcessor con modelos cargados
+            fuente_sup: FuenteCamara Superior (abierta)
+            fuente_lat: FuenteCamara Lateral (abierta)
+            controlador_plc: PLCController conectado (None en simulación)
+            modo_simulacion: True para procesar cada ciclo sin esperar al PLC
+            tamano_cola: Capacidad de la cola de eventos (se descarta el más viejo)
+            diario: DiarioInspeccion opcional (un registro compacto por ciclo)
+            trazador: Trazador opcional (duración por etapa de cada ciclo)
+            perfilador: PerfiladorCiclos opcional (perfilado bajo demanda de N ciclos)
+            almacen_calibracion: AlmacenCalibracion opcional (calibración Y persistida)
+            recalibrar: True para ignorar la calibración guardada en este arranque
+        """
+        super().__init__(name="MotorInspeccion", daemon=True)
+        self.config_sistema = config.get('sistema', {})
+        self.logger = logger
+        self.vision_processor = vision_processor
+        self.fuente_sup = fuente_sup
+        self.fuente_lat = fuente_lat
+        self.controlador_plc = controlador_plc
+        self.modo_simulacion = modo_simulacion
+        self.diario = diario
+        self.trazador = trazador or tracing.TRAZADOR_NULO
+        self.perfilador = perfilador or PERFILADOR_NULO
+        self.almacen_calibracion = almacen_calibracion
+        self._reconectar_plc = threading.Event()
+        self._recalibrar = threading.Event()
+        if recalibrar:
+            self._recalibrar.set()
+        config_calibracion = config.get('vision', {}).get('calibracion', {})
+        self.frames_calibracion = max(1, int(config_calibracion.get('frames', 1)))
+        self.max_residuo_calibracion_px = config_calibracion.get('max_residuo_px', 0.0)
+        self.timeout_calibracion_s = config_calibracion.get('timeout_s', 30.0)
+        self._recalibracion = None
+        self._origen_recalibracion = 'inferencia'
+        self.monitor_deriva = crear_monitor_deriva_desde_config(config, logger)
+        # Centros de la puesta en marcha (guardada o inferencia): tope de la recalibración por deriva
+        self._centros_comisionado = None
+
+        self.delay_lectura_plc_s = self.config_sistema.get('delay_lectura_plc_ms', 100) / 1000.0
+        self.delay_post_proceso_s = self.config_sistema.get('delay_post_proceso_ms', 500) / 1000.0
+        self.delay_simulacion_s = self.config_sistema.get('delay_simulacion_ms', 500) / 1000.0
+
+        self.eventos = queue.Queue(maxsize=tamano_cola)
+        self.eventos_descartados = 0
+
+        self._detener = threading.Event()
+        self._lock_frames = threading.Lock()
+        self._frames = (0, None, None)  # (secuencia, frame_sup, frame_lat)
+        self.ciclos = 0
+        self._ultimo_estado = None
+        self._observadores = []
+
+        self._m_ciclo = METRICAS.histograma('ciclo_inspeccion_segundos', 'Solicitud detectada → respuesta escrita al PLC')
+        self._m_ciclos = METRICAS.contador('ciclos_inspeccion_total', 'Inspecciones procesadas')
+        self._m_eventos_descartados = METRICAS.contador('motor_eventos_descartados_total', 'Eventos descartados por cola llena')
+        self._m_deriva_rechazada = METRICAS.contador('calibracion_deriva_rechazada_total',
+                                                     'Recalibraciones por deriva rechazadas por alejarse de la puesta en marcha')
+
+    # ==================== API (desde cualquier hilo) ====================
+
+    def detener(self) -> None:
+        """Solicita detener el motor al final del ciclo actual"""
+        self._detener.set()
+
+    def solicitar_reconexion_plc(self) -> None:
+        """
+        Reconecta el PLC al inicio del próximo ciclo. La conexión la usa solo
+        el hilo del motor: reconectar desde otro hilo pisaría la sesión MC
+        (self.mc) en medio de una lectura o escritura.
+        """
+        self._reconectar_plc.set()
+
+    def solicitar_recalibracion(self) -> None:
+        """Recalibra Y con el próximo frame Superior (y reemplaza la calibración guardada)"""
+        self._recalibrar.set()
+
+    def agregar_observador(self, observador) -> None:
+        """
+        Registra un callable observador(tipo, datos) que recibe cada evento
+        y además 'frames' ({'frame_sup', 'frame_lat'}) en cada captura.
+        Debe volver de inmediato (solo encolar), corre en el hilo del motor.
+        """
+        self._observadores.append(observador)
+
+    @property
+    def activo(self) -> bool:
+        return self.is_alive() and not self._detener.is_set()
+
+    def obtener_frames(self) -> Tuple[int, Optional[object], Optional[object]]:
+        """
+        Retorna el último par de frames capturados.
+
+        Returns:
+            (secuencia, frame_sup, frame_lat); la secuencia crece con cada captura
+        """
+        with self._lock_frames:
+            return self._frames
+
+    # ==================== PUBLICACIÓN ====================
+
+    def _publicar(self, tipo: str, **datos) -> None:
+        """Publica un evento sin bloquear: si la cola está llena descarta el más viejo"""
+        datos['tipo'] = tipo
+        self._notificar(tipo, datos)
+        while True:
+            try:
+                self.eventos.put_nowait(datos)
+                return
+            except queue.Full:
+                try:
+                    self.eventos.get_nowait()
+                    self.eventos_descartados += 1
+                    self._m_eventos_descartados.inc()
+                except queue.Empty:
+                    pass
+
+    def _publicar_estado(self, mensaje: str) -> None:
+        """Publica el mensaje de estado solo si cambió (no satura la cola)"""
+        if mensaje != self._ultimo_estado:
+            self._ultimo_estado = mensaje
+            self._publicar('estado', mensaje=mensaje)
+
+    def _publicar_frames(self, frame_sup, frame_lat) -> None:
+        with self._lock_frames:
+            self._frames = (self._frames[0] + 1, frame_sup, frame_lat)
+        if self._observadores:
+            self._notificar('frames', {'frame_sup': frame_sup, 'frame_lat': frame_lat})
+
+    def _notificar(self, tipo: str, datos: Dict) -> None:
+        for observador in self._observadores:
+            try:
+                observador(tipo, datos)
+            except Exception as e:
+                self.logger.warning(f"⚠️ Error en observador del motor ({tipo}): {e}")
+
+    # ==================== HILO ====================
+
+    def run(self):
+        try:
+            if not self.vision_processor.calibrado_y and not self._calibrar():
+                return
+            self._publicar_estado("🟢 Sistema ACTIVO - Monitoreando")
+
+            while not self._detener.is_set():
+                delay_s = self._ciclo()
+                if delay_s is None:
+                    break
+                self._detener.wait(delay_s)
+
+        except Exception as e:
+            self.logger.error(f"❌ Error fatal en motor de inspección: {e}", exc_info=True)
+            self._publicar('error', mensaje=str(e))
+        finally:
+            self._detener.set()
+            self.logger.info(f"⏹️ Motor de inspección detenido ({self.ciclos} ciclos procesados)")
+
+    def _calibrar(self) -> bool:
+        """Calibración Y inicial: la guardada si coincide, si no con el primer frame Superior"""
+        ret, frame_sup_calib = self.fuente_sup.leer()
+        if not ret:
+            self.logger.error("❌ Error: No se pudo leer el primer frame del video Superior para calibración Y.")
+            self._publicar('error', mensaje="No se pudo leer el frame de calibración.")
+            return False
+
+        if self._recalibrar.is_set() or not self._recuperar_calibracion(frame_sup_calib):
+            if self.frames_calibracion > 1:
+                self._calibrar_multiframe(frame_sup_calib)
+            else:
+                self._ejecutar_calibracion(frame_sup_calib)
+        self.fuente_sup.reiniciar()
+        return True
+
+    def _clave_calibracion(self, frame_sup) -> Optional[Dict]:
+        if self.almacen_calibracion is None:
+            return None
+        try:
+            alto, ancho = frame_sup.shape[:2]
+            return self.almacen_calibracion.clave(self.vision_processor.modelo_path_sup, self.fuente_sup.fuente,
+                                                  (ancho, alto), self.vision_processor.config_vision)
+        except (OSError, AttributeError) as e:
+            self.logger.warning(f"⚠️ No se pudo identificar la calibración Y: {e}")
+            return None
+
+    def _recuperar_calibracion(self, frame_sup) -> bool:
+        """Aplica la calibración guardada si coincide modelo, cámara y resolución"""
+        clave = self._clave_calibracion(frame_sup)
+        if clave is None:
+            return False
+        entrada = self.almacen_calibracion.buscar(clave, self.vision_processor.TOTAL_POSICIONES)
+        if entrada is None:
+            return False
+        self.vision_processor.aplicar_calibracion(entrada['centros'], entrada.get('distancia_px', 0.0))
+        # Una calibración por deriva guardada conserva la referencia de la puesta en marcha
+        comisionado = entrada.get('centros_comisionado') or entrada['centros']
+        self._centros_comisionado = {int(col): int(x) for col, x in comisionado.items()}
+        self.logger.info(f"♻️ Calibración Y recuperada ({entrada['fecha']}): {self.vision_processor.X_CENTROS_IDEALES}")
+        self._publicar('calibrado', centros=dict(self.vision_processor.X_CENTROS_IDEALES),
+                       ok=self.vision_processor.calibrado_y, origen='guardada')
+        return True
+
+    def _ejecutar_calibracion(self, frame_sup) -> None:
+        """Calibra con inferencia sobre el frame y guarda el resultado si fue exitoso"""
+        self._recalibrar.clear()
+        self.logger.info("🔧 Iniciando calibración Y (Superior)...")
+        self._publicar_estado("Calibrando...")
+        self.vision_processor.calibrar_y(frame_sup)
+
+        self.logger.info(f"Calibración finalizada. Centros Y: {self.vision_processor.X_CENTROS_IDEALES}")
+        self._guardar_y_publicar_calibracion(frame_sup, self.vision_processor.calibrado_y)
+
+    def _calibrar_multiframe(self, frame_sup) -> None:
+        """Calibración inicial sobre los próximos N frames Superiores (bloquea: aún no hay loop)"""
+        self._recalibrar.clear()
+        self.logger.info(f"🔧 Iniciando calibración Y (Superior, {self.frames_calibracion} frames)...")
+        self._publicar_estado("Calibrando...")
+        calibrador = CalibradorColumnas(self.vision_processor, self.frames_calibracion,
+                                        self.max_residuo_calibracion_px)
+        calibrador.agregar(frame_sup)
+        while not calibrador.completo and not self._detener.is_set():
+            ret, frame = self.fuente_sup.leer()
+            if not ret:
+                break
+            calibrador.agregar(frame)
+        self._aplicar_ajuste(calibrador.ajustar(), frame_sup)
+
+    def _iniciar_recalibracion(self, origen: str = 'inferencia') -> None:
+        """Recalibración durante la marcha: se sigue inspeccionando con la calibración vigente"""
+        if origen != 'deriva':
+            self._recalibrar.clear()
+        if self._recalibracion is not None:
+            return  # ya hay una en curso
+        self.logger.info(f"🔧 Recalibración Y en marcha ({self.frames_calibracion} frames, {origen})...")
+        self._origen_recalibracion = origen
+        calibrador = CalibradorColumnas(self.vision_processor, self.frames_calibracion,
+                                        self.max_residuo_calibracion_px)
+        self._recalibracion = RecalibracionEnMarcha(calibrador, self.timeout_calibracion_s)
+
+    def _avanzar_recalibracion(self, frame_sup) -> None:
+        """Un frame de la recalibración en curso (entre inspecciones); aplica el ajuste al completarla"""
+        ajuste = self._recalibracion.avanzar(frame_sup)
+        if ajuste is not None:
+            self._recalibracion = None
+            self._aplicar_ajuste(ajuste, frame_sup, self._origen_recalibracion)
+
+    def _aplicar_ajuste(self, ajuste: Dict, frame_sup, origen: str = 'inferencia') -> None:
+        """Aplica el ajuste de N frames; si falló se conserva la calibración anterior"""
+        if not ajuste['ok']:
+            self.logger.warning(f"⚠️ Calibración Y fallida ({ajuste['frames']} frames, "
+                                f"{ajuste.get('detecciones', 0)} detecciones): {ajuste['motivo']}")
+            self._publicar('calibrado', centros=dict(self.vision_processor.X_CENTROS_IDEALES),
+                           ok=False, origen=origen, motivo=ajuste['motivo'])
+            return
+
+        if origen == 'deriva' and self._centros_comisionado:
+            desvio = self._desvio_comisionado(ajuste['centros'])
+            if desvio > self.vision_processor.TOLERANCIA_COLUMNA_PX:
+                motivo = (f"centros a {desvio:.0f} px de la puesta en marcha "
+                          f"(tolerancia {self.vision_processor.TOLERANCIA_COLUMNA_PX} px)")
+                self.logger.error(f"🚨 Recalibración por deriva rechazada: {motivo}. Se conserva la calibración "
+                                  f"vigente; revisar la cámara o el pallet y recalibrar manualmente.")
+                self._m_deriva_rechazada.inc()
+                self._publicar('calibrado', centros=dict(self.vision_processor.X_CENTROS_IDEALES),
+                               ok=False, origen=origen, motivo=motivo)
+                return
+
+        self.vision_processor.aplicar_calibracion(ajuste['centros'], ajuste['paso_px'])
+        if self.monitor_deriva:
+            self.monitor_deriva.reiniciar()
+        self.logger.info(f"✅ Calibración Y ({ajuste['frames']} frames, {ajuste['columnas_vistas']} columnas vistas): "
+                         f"paso {ajuste['paso_px']} px | residuo RMS {ajuste['residuo_rms_px']} px "
+                         f"(máx {ajuste['residuo_max_px']} px) | {ajuste['descartadas']} detecciones descartadas")
+        self.logger.info(f"   Residuo RMS por columna: {ajuste['residuo_por_columna']}")
+        self.logger.info(f"   Centros Y: {self.vision_processor.X_CENTROS_IDEALES}")
+        self._guardar_y_publicar_calibracion(frame_sup, self.vision_processor.calibrado_y, {
+            'residuo_rms_px': ajuste['residuo_rms_px'],
+            'frames': ajuste['frames'],
+        }, origen)
+
+    def _desvio_comisionado(self, centros: Dict[int, int]) -> float:
+        """Máximo |x nuevo - x de la puesta en marcha| entre las columnas de ambas calibraciones"""
+        return max((abs(x - self._centros_comisionado[col]) for col, x in centros.items()
+                    if col in self._centros_comisionado), default=0.0)
+
+    def _guardar_y_publicar_calibracion(self, frame_sup, ok: bool, detalle: Optional[Dict] = None,
+                                        origen: str = 'inferencia') -> None:
+        detalle = dict(detalle or {})
+        if ok:
+            if origen != 'deriva' or not self._centros_comisionado:
+                self._centros_comisionado = dict(self.vision_processor.X_CENTROS_IDEALES)
+            detalle['centros_comisionado'] = self._centros_comisionado
+            clave = self._clave_calibracion(frame_sup)
+            if clave is not None:
+                self.almacen_calibracion.guardar(clave, self.vision_processor.X_CENTROS_IDEALES,
+                                                 dict(detalle, distancia_px=round(self.vision_processor.distancia_columnas_px, 2)))
+        self._publicar('calibrado', centros=dict(self.vision_processor.X_CENTROS_IDEALES),
+                       ok=ok, origen=origen, residuo_rms_px=detalle.get('residuo_rms_px'))
+
+    def _ciclo(self) -> Optional[float]:
+        """
+        Ejecuta un ciclo de monitoreo.
+
+        Returns:
+            Segundos a esperar antes del siguiente ciclo, o None para detener el motor
+        """
+        # 1. Capturar frames
+        t_traza = self.trazador.iniciar_ciclo()
+        ret_sup, frame_sup = self.fuente_sup.leer()
+        ret_lat, frame_lat = self.fuente_lat.leer()
+        t_traza = self.trazador.etapa(tracing.CAPTURA, t_traza)
+
+        # Cámara en vivo sin frame: la fuente sigue reconectando, se salta el ciclo
+        if (not ret_sup and self.fuente_sup.en_vivo) or (not ret_lat and self.fuente_lat.en_vivo):
+            self._publicar_estado("⚠️ Esperando cámara (reconectando)...")
+            return self.delay_lectura_plc_s
+
+        # Fin de video
+        if not ret_sup or not ret_lat:
+            self.logger.info("🎬 Fin de simulación: Uno o ambos videos terminaron o fallaron la lectura.")
+            if not ret_sup and not ret_lat:
+                msg = "Ambos videos terminaron."
+            elif not ret_sup:
+                msg = "Video Superior terminó/falló."
+            else:
+                msg = "Video Lateral terminó/falló."
+            self._publicar('fin', mensaje=msg)
+            return None
+
+        self._publicar_frames(frame_sup, frame_lat)
+
+        # Recalibración pedida por el operador durante la marcha
+        if self._recalibrar.is_set():
+            if self.frames_calibracion > 1:
+                self._iniciar_recalibracion()
+            else:
+                self._ejecutar_calibracion(frame_sup)
+                self.trazador.descartar_ciclo()
+                return 0.0
+
+        # Reconexión pedida desde otro hilo (ej. servicio)
+        if self._reconectar_plc.is_set():
+            self._reconectar_plc.clear()
+            if self.controlador_plc and not self.controlador_plc.is_connected:
+                self.controlador_plc.conectar()
+
+        # 2. Consultar PLC (o simular)
+        procesar = False
+        delay_s = self.delay_lectura_plc_s
+        if self.modo_simulacion:
+            procesar = True
+            delay_s = self.delay_simulacion_s
+        elif self.controlador_plc and self.controlador_plc.is_connected:
+            procesar = self.controlador_plc.leer_solicitud_inspeccion()
+            t_traza = self.trazador.etapa(tracing.PLC_LECTURA, t_traza)
+            log_estado_plc(self.controlador_plc, self.logger, procesar)
+            t_traza = self.trazador.etapa(tracing.REGISTRO, t_traza)
+
+        if not procesar:
+            self.trazador.descartar_ciclo()
+            if self._recalibracion is not None:
+                self._avanzar_recalibracion(frame_sup)
+            return delay_s
+
+        # 3. Procesar solicitud
+        self.perfilador.iniciar_ciclo()
+        t_inicio = time.perf_counter()
+        t_solicitud = time.time()
+        self._publicar_estado("🔄 Procesando solicitud...")
+
+        resultado = self.vision_processor.procesar_frames_dual(frame_sup, frame_lat)
+        t_traza = self.trazador.etapa(tracing.POSTPROCESO, t_traza)
+        self._trazar_inferencias(resultado)
+        parada = resultado['codigo_respuesta_plc'] == self.vision_processor.CODIGO_PARADA
+        valido, advertencias = self.vision_processor.validar_resultado(resultado)
+        t_traza = self.trazador.etapa(tracing.VALIDACION, t_traza)
+
+        # 4. Enviar a PLC ANTES de loguear/publicar (la respuesta no espera a la UI)
+        exito_escritura = None
+        t_escritura = time.perf_counter()
+        if not self.modo_simulacion and self.controlador_plc:
+            exito_escritura = self.controlador_plc.escribir_resultados(
+                desviacion_y_mm=resultado['desviacion_y_mm'],
+                num_filas=resultado['filas'],
+                correccion_z_mm=resultado['correccion_z_mm_final'],
+                codigo_respuesta=resultado['codigo_respuesta_plc']
+            )
+            if not exito_escritura:
+                self.logger.error("❌ FALLO AL ESCRIBIR EN PLC")
+                self._publicar('escritura_fallida')
+        t_traza = self.trazador.etapa(tracing.ESCRITURA_PLC, t_traza)
+
+        t_fin = time.perf_counter()
+        duracion_s = t_fin - t_inicio
+        duracion_ms = duracion_s * 1000.0
+        self.ciclos += 1
+        self._m_ciclo.observar(duracion_s)
+        self._m_ciclos.inc()
+
+        if self.diario:
+            self.diario.registrar(resultado, self.ciclos, t_solicitud, duracion_ms,
+                                  escritura_ms=(t_fin - t_escritura) * 1000.0,
+                                  escritura_ok=exito_escritura)
+        for adv in advertencias:
+            self.logger.warning(adv)
+        log_resultado_procesamiento(resultado, self.logger)
+        t_traza = self.trazador.etapa(tracing.REGISTRO, t_traza)
+
+        self._publicar('resultado', resultado=resultado, valido=valido, advertencias=advertencias,
+                       ciclo=self.ciclos, duracion_ms=duracion_ms)
+        self.trazador.etapa(tracing.PUBLICACION, t_traza)
+        self.trazador.finalizar_ciclo(self.ciclos)
+        self.perfilador.finalizar_ciclo(self.ciclos, resultado)
+
+        # Deriva de la calibración Y (ya se respondió al PLC); solo inspecciones OK: un pallet
+        # mal puesto o con fallas no debe mover la rejilla
+        if (self.monitor_deriva and resultado['codigo_respuesta_plc'] == self.vision_processor.CODIGO_OK
+                and self.monitor_deriva.actualizar(resultado.get('residuo_columnas_px'))):
+            self._iniciar_recalibracion('deriva')
+
+        # *** DETENCIÓN POR ERROR DE VISIÓN (PARADA CRÍTICA) ***
+        if parada:
+            self.logger.error("🚨 PARADA CRÍTICA DETECTADA POR VISION. Deteniendo sistema.")
+            self._publicar('parada', resultado=resultado)
+            return None
+
+        # Recalibración en marcha: después de responder al PLC, nunca durante una inspección
+        if self._recalibracion is not None:
+            self._avanzar_recalibracion(frame_sup)
+
+        self._publicar_estado("🟢 Sistema ACTIVO - Monitoreando")
+        return self.delay_post_proceso_s
+
+    def _trazar_inferencias(self, resultado: Dict) -> None:
+        """Separa del tiempo de procesar_frames_dual lo que fue inferencia YOLO"""
+        tiempos = resultado.get('tiempos_ms')
+        if not tiempos:
+            return
+        lat_ns = int(tiempos['inferencia_lat'] * 1e6)
+        sup_ns = int(tiempos['inferencia_sup'] * 1e6)
+        self.trazador.agregar(tracing.INFERENCIA_LAT, lat_ns)
+        self.trazador.agregar(tracing.INFERENCIA_SUP, sup_ns)
+        self.trazador.agregar(tracing.POSTPROCESO, -(lat_ns + sup_ns))
@@ -0,0 +1,206 @@
+"""
+ModelLoader - Carga de modelos en segundo plano
+Carga (y calienta) los modelos Superior y Lateral en paralelo apenas se
+conocen sus rutas, para que INICIAR solo tenga que armar el VisionProcessor
+con modelos ya listos.
+"""
+
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Optional, Tuple
+
+from core.stub_detector import es_ruta_stub, crear_detector_simulado
+from utils.logger_prueba import log_diferido
+
+TIPOS = ('superior', 'lateral')
+
+# Etapas de cada carga
+ETAPA_PENDIENTE = 'pendiente'
+ETAPA_CARGANDO = 'cargando'
+ETAPA_CALENTANDO = 'calentando'
+ETAPA_LISTO = 'listo'
+ETAPA_ERROR = 'error'
+
+ICONOS_ETAPA = {
+    ETAPA_PENDIENTE: '⏳',
+    ETAPA_CARGANDO: '📦',
+    ETAPA_CALENTANDO: '🔥',
+    ETAPA_LISTO: '✅',
+    ETAPA_ERROR: '❌',
+}
+
+
+def crear_modelo(path: str, config_vision: Dict):
+    """
+    YOLO para rutas .pt; DetectorSimulado para rutas 'stub:superior' / 'stub:lateral'.
+
+    Args:
+        path: Ruta del modelo
+        config_vision: Sección 'vision' del JSON
+
+    Returns:
+        Modelo con la interfaz predict()/names de ultralytics
+    """
+    if es_ruta_stub(path):
+        return crear_detector_simulado(path, config_vision)
+    # Import diferido: ultralytics/torch solo se cargan si hay modelos reales
+    from ultralytics import YOLO
+    return YOLO(path)
+
+
+class CargadorModelos:
+    """
+    Carga los modelos en un pool de 2 hilos (uno por cámara).
+
+    - cargar() vuelve de inmediato; si se elige otra ruta para la misma
+      cámara mientras carga, el resultado anterior se descarta
+    - Calentamiento: inferencias sobre un frame negro del tamaño configurado
+      (la primera inferencia de YOLO fusiona capas e inicializa el backend)
+    - estado()/resumen() se pueden consultar desde cualquier hilo (la interfaz
+      los lee con root.after, nunca espera)
+    """
+
+    def __init__(self, config: Dict, logger=None):
+        """
+        Args:
+            config: Configuración completa (del JSON)
+            logger: Instancia del logger
+        """
+        self.config_vision = config.get('vision', {})
+        config_calentamiento = self.config_vision.get('calentamiento', {})
+        self.calentar = config_calentamiento.get('habilitado', True)
+        self.iteraciones_calentamiento = max(1, int(config_calentamiento.get('iteraciones', 1)))
+        self.ancho_calentamiento = config_calentamiento.get('ancho', 1280)
+        self.alto_calentamiento = config_calentamiento.get('alto', 720)
+        self.logger = logger
+
+        self._pool = ThreadPoolExecutor(max_workers=len(TIPOS), thread_name_prefix="CargaModelo")
+        self._lock = threading.Lock()
+        self._estado = {tipo: self._estado_vacio() for tipo in TIPOS}
+        self._modelos = {tipo: None for tipo in TIPOS}
+        self._generacion = {tipo: 0 for tipo in TIPOS}
+        self._eventos = {tipo: threading.Event() for tipo in TIPOS}
+
+    @staticmethod
+    def _estado_vacio() -> Dict:
+        return {'ruta': None, 'etapa': None, 'segundos': 0.0, 'error': None, 't_inicio': 0.0}
+
+    # ==================== API ====================
+
+    def cargar(self, tipo: str, ruta: str) -> None:
+        """Inicia la carga en segundo plano del modelo 'superior' o 'lateral'"""
+        if tipo not in TIPOS:
+            raise ValueError(f"Tipo de modelo desconocido: {tipo}")
+        with self._lock:
+            if self._estado[tipo]['ruta'] == ruta and self._estado[tipo]['etapa'] != ETAPA_ERROR:
+                return  # misma ruta ya cargada o en curso
+            self._generacion[tipo] += 1
+            generacion = self._generacion[tipo]
+            self._estado[tipo] = dict(self._estado_vacio(), ruta=ruta, etapa=ETAPA_PENDIENTE,
+                                      t_inicio=time.perf_counter())
+            self._modelos[tipo] = None
+            self._eventos[tipo].clear()
+        self._pool.submit(self._cargar, tipo, ruta, generacion)
+
+    def estado(self) -> Dict[str, Dict]:
+        """Copia del estado por tipo: ruta, etapa, segundos transcurridos y error"""
+        with self._lock:
+            estado = {tipo: dict(e) for tipo, e in self._estado.items()}
+        ahora = time.perf_counter()
+        for e in estado.values():
+            if e['etapa'] in (ETAPA_PENDIENTE, ETAPA_CARGANDO, ETAPA_CALENTANDO):
+                e['segundos'] = ahora - e['t_inicio']
+            del e['t_inicio']
+        return estado
+
+    @property
+    def en_curso(self) -> bool:
+        with self._lock:
+            return any(e['etapa'] in (ETAPA_PENDIENTE, ETAPA_CARGANDO, ETAPA_CALENTANDO)
+                       for e in self._estado.values())
+
+    def listos(self) -> bool:
+        """True si ambos modelos terminaron de cargar y calentar"""
+        with self._lock:
+            return all(e['etapa'] == ETAPA_LISTO for e in self._estado.values())
+
+    def modelos(self) -> Optional[Tuple[object, object]]:
+        """(modelo_sup, modelo_lat) si ambos están listos, None si no"""
+        with self._lock:
+            if not all(e['etapa'] == ETAPA_LISTO for e in self._estado.values()):
+                return None
+            return self._modelos['superior'], self._modelos['lateral']
+
+    def esperar(self, timeout_s: Optional[float] = None) -> bool:
+        """Bloquea hasta que ambas cargas terminen (ok o error). Solo fuera del hilo de la UI."""
+        limite = None if timeout_s is None else time.monotonic() + timeout_s
+        for evento in self._eventos.values():
+            restante = None if limite is None else max(0.0, limite - time.monotonic())
+            if not evento.wait(restante):
+                return False
+        return self.listos()
+
+    def resumen(self) -> str:
+        """Texto corto para la barra de estado"""
+        partes = []
+        for tipo, e in self.estado().items():
+            if e['etapa'] is None:
+                continue
+            texto = f"{tipo.capitalize()} {ICONOS_ETAPA[e['etapa']]} {e['etapa']} ({e['segundos']:.1f} s)"
+            if e['error']:
+                texto += f": {e['error']}"
+            partes.append(texto)
+        return "Modelos: " + " | ".join(partes) if partes else ""
+
+    def detener(self) -> None:
+        """Descarta las cargas pendientes (las que están en curso terminan en su hilo)"""
+        self._pool.shutdown(wait=False, cancel_futures=True)
+
+    # ==================== CARGA (hilos del pool) ====================
+
+    def _cargar(self, tipo: str, ruta: str, generacion: int) -> None:
+        try:
+            self._actualizar(tipo, generacion, etapa=ETAPA_CARGANDO)
+            self._log(f"📦 Cargando modelo {tipo.capitalize()} desde {ruta} (segundo plano)...")
+            modelo = crear_modelo(ruta, self.config_vision)
+
+            if self.calentar:
+                self._actualizar(tipo, generacion, etapa=ETAPA_CALENTANDO)
+                self._calentar(modelo)
+
+            with self._lock:
+                if self._generacion[tipo] != generacion:
+                    return  # se eligió otra ruta mientras cargaba
+                self._modelos[tipo] = modelo
+            segundos = self._actualizar(tipo, generacion, etapa=ETAPA_LISTO)
+            self._log(f"✅ Modelo {tipo.capitalize()} listo en {segundos:.1f} s")
+        except Exception as e:
+            self._actualizar(tipo, generacion, etapa=ETAPA_ERROR, error=str(e))
+            self._log(f"❌ ERROR al cargar modelo {tipo.capitalize()} ({ruta}): {e}", 'error')
+        finally:
+            with self._lock:
+                if self._generacion[tipo] == generacion:
+                    self._eventos[tipo].set()
+
+    def _calentar(self, modelo) -> None:
+        import numpy as np
+        frame = np.zeros((self.alto_calentamiento, self.ancho_calentamiento, 3), dtype=np.uint8)
+        for _ in range(self.iteraciones_calentamiento):
+            modelo.predict(source=frame, conf=0.5, verbose=False)
+
+    def _actualizar(self, tipo: str, generacion: int, etapa: str, error: Optional[str] = None) -> float:
+        """Actualiza la etapa si la carga sigue vigente. Retorna los segundos transcurridos."""
+        with self._lock:
+            estado = self._estado[tipo]
+            segundos = time.perf_counter() - estado['t_inicio']
+            if self._generacion[tipo] == generacion:
+                estado['etapa'] = etapa
+                estado['error'] = error
+                if etapa in (ETAPA_LISTO, ETAPA_ERROR):
+                    estado['segundos'] = segundos
+        return segundos
+
+    def _log(self, mensaje: str, nivel: str = 'info', *args):
+        """Helper para loggear (formato %% diferido)"""
+        log_diferido(self.logger, mensaje, nivel, *args)
@@ -0,0 +1,158 @@
+"""
+PalletTracker - Seguimiento del estado del pallet entre inspecciones
+El robot retira una columna por ciclo, así que la ocupación esperada en la
+próxima inspección se conoce de antemano. El seguidor guarda esa ocupación,
+valida cada observación contra las transiciones posibles y habilita una
+confirmación barata (solo la zona de la columna de trabajo) mientras el
+estado es consistente.
+"""
+
+from typing import Dict, Optional
+
+import numpy as np
+
+from core.column_assignment import COLUMNA_DESCONOCIDA, COLUMNA_PRODUCTO, COLUMNA_VACIA, SIMBOLOS_COLUMNA
+from utils.logger_prueba import log_diferido
+from utils.metrics import METRICAS
+
+# Transiciones entre dos inspecciones
+SIN_REFERENCIA = 'sin_referencia'   # primera inspección (o tras reiniciar)
+RETIRADA = 'retirada'               # se retiró la columna de trabajo (caso normal)
+SIN_CAMBIO = 'sin_cambio'           # el robot no retiró (ej. tras un fallo QC)
+PALLET_NUEVO = 'nuevo'              # hay más producto que antes: cambió el pallet
+INCONSISTENTE = 'inconsistente'     # ninguna de las anteriores
+
+TRANSICIONES_CONSISTENTES = (RETIRADA, SIN_CAMBIO)
+
+
+def _texto(estados: np.ndarray) -> str:
+    return ''.join(SIMBOLOS_COLUMNA[e] for e in estados.tolist())
+
+
+class SeguidorPallet:
+    """
+    Ocupación esperada por columna (COLUMNA_PRODUCTO / COLUMNA_VACIA) del pallet actual.
+
+    - esperado(): ocupación anterior con la columna de trabajo ya retirada
+    - registrar(): compara la observación con 'retirada' y 'sin cambio'
+      (las columnas sin detección no se comparan y toman el valor esperado)
+    - puede_confirmar(): True si la última transición fue consistente y no
+      toca inspección completa ('completa_cada' acota cuánto tiempo se
+      confía solo en la zona de trabajo)
+    """
+
+    def __init__(self, total_posiciones: int, completa_cada: int = 10, columnas_vecinas: int = 1, logger=None):
+        """
+        Args:
+            total_posiciones: Columnas por pallet
+            completa_cada: Inspecciones por zona seguidas antes de forzar una completa
+            columnas_vecinas: Columnas a cada lado de la de trabajo en la zona de
+                confirmación (mínimo 1: sin la anterior no se ve si el robot no retiró)
+            logger: Instancia del logger
+        """
+        self.total_posiciones = total_posiciones
+        self.completa_cada = max(1, int(completa_cada))
+        self.logger = logger
+        self.columnas_vecinas = int(columnas_vecinas)
+        if self.columnas_vecinas < 1:
+            self._log(f"⚠️ seguimiento_pallet.columnas_vecinas={columnas_vecinas} no detecta una columna "
+                      f"sin retirar, se usa 1", 'warning')
+            self.columnas_vecinas = 1
+        self._m_transiciones = {
+            t: METRICAS.contador('pallet_transiciones_total', 'Transiciones de estado del pallet', {'transicion': t})
+            for t in (SIN_REFERENCIA, RETIRADA, SIN_CAMBIO, PALLET_NUEVO, INCONSISTENTE)
+        }
+        self.reiniciar()
+
+    def reiniciar(self) -> None:
+        self._ocupacion = None
+        self._ultima_transicion = SIN_REFERENCIA
+        self._por_zona_seguidas = 0
+
+    def esperado(self) -> Optional[np.ndarray]:
+        """Ocupación esperada si se retiró la columna de trabajo, None sin referencia"""
+        if self._ocupacion is None:
+            return None
+        esperado = self._ocupacion.copy()
+        con_producto = np.flatnonzero(esperado == COLUMNA_PRODUCTO)
+        if con_producto.size:
+            esperado[con_producto[0]] = COLUMNA_VACIA
+        return esperado
+
+    def puede_confirmar(self) -> bool:
+        if self._ultima_transicion not in TRANSICIONES_CONSISTENTES:
+            return False
+        if self._por_zona_seguidas >= self.completa_cada:
+            return False
+        esperado = self.esperado()
+        return esperado is not None and bool((esperado == COLUMNA_PRODUCTO).any())
+
+    def registrar(self, observado: np.ndarray, via: str) -> Dict:
+        """
+        Valida la observación y actualiza la ocupación.
+
+        Args:
+            observado: Estado por columna de la inspección (COLUMNA_*)
+            via: 'zona' (confirmación de la columna de trabajo) o 'completa'
+
+        Returns:
+            {'transicion', 'via', 'esperado', 'observado'} (textos 'PPV?...')
+        """
+        anterior = self._ocupacion
+        conocidas = observado != COLUMNA_DESCONOCIDA
+        if anterior is None:
+            transicion = SIN_REFERENCIA
+            ocupacion = np.where(conocidas, observado, COLUMNA_VACIA).astype(np.int8)
+            esperado = None
+        else:
+            esperado = self.esperado()
+            if np.array_equal(observado[conocidas], esperado[conocidas]):
+                transicion, base = RETIRADA, esperado
+            elif np.array_equal(observado[conocidas], anterior[conocidas]):
+                transicion, base = SIN_CAMBIO, anterior
+            elif (observado == COLUMNA_PRODUCTO).sum() > (anterior == COLUMNA_PRODUCTO).sum():
+                transicion, base = PALLET_NUEVO, np.full_like(anterior, COLUMNA_VACIA)
+            else:
+                transicion, base = INCONSISTENTE, esperado
+            ocupacion = np.where(conocidas, observado, base).astype(np.int8)
+
+        self._ocupacion = ocupacion
+        self._ultima_transicion = transicion
+        self._por_zona_seguidas = self._por_zona_seguidas + 1 if via == 'zona' else 0
+        self._m_transiciones[transicion].inc()
+
+        info = {
+            'transicion': transicion,
+            'via': via,
+            'esperado': _texto(esperado) if esperado is not None else '',
+            'observado': _texto(observado),
+        }
+        if transicion == PALLET_NUEVO:
+            self._log(f"🆕 Pallet nuevo: {info['observado']}")
+        # INCONSISTENTE se reporta en VisionProcessor.validar_resultado (advertencia del ciclo)
+        return info
+
+    def _log(self, mensaje: str, nivel: str = 'info', *args):
+        """Helper para loggear (formato %% diferido)"""
+        log_diferido(self.logger, mensaje, nivel, *args)
+
+
+def crear_seguidor_desde_config(config_vision: Dict, total_posiciones: int, logger=None) -> Optional[SeguidorPallet]:
+    """
+    Crea el seguidor si 'vision.seguimiento_pallet.habilitado' es true en el JSON.
+
+    Args:
+        config_vision: Sección 'vision' del JSON
+        total_posiciones: Columnas por pallet
+        logger: Instancia del logger
+
+    Returns:
+        SeguidorPallet, o None si está deshabilitado
+    """
+    config_seguimiento = config_vision.get('seguimiento_pallet', {})
+    if not config_seguimiento.get('habilitado', False):
+        return None
+    return SeguidorPallet(total_posiciones,
+                          completa_cada=config_seguimiento.get('completa_cada', 10),
+                          columnas_vecinas=config_seguimiento.get('columnas_vecinas', 1),
+                          logger=logger)
@@ -5,8 +5,11 @@ Implementa el protocolo MC Type3E y el handshake de control
 
 import pymcprotocol
 import json
+import time
 from typing import Optional, Dict, Tuple
 
+from utils.metrics import METRICAS
+
 
 class PLCController:
     """
@@ -46,6 +49,14 @@ class PLCController:
         self.VAL_SOLICITUD = codigos.get('valor_solicitud', 99)
         self.VAL_EXITO = codigos.get('valor_exito', 88)
         self.VAL_ERROR = codigos.get('valor_error', 77)
+        
+        # Métricas (referencias fijas: actualizar es solo un lock y una suma)
+        self._m_lectura = METRICAS.histograma('plc_lectura_segundos', 'Latencia de lectura del trigger PLC')
+        self._m_escritura = METRICAS.histograma('plc_escritura_segundos', 'Latencia de escritura de resultados al PLC')
+        self._m_solicitudes = METRICAS.contador('plc_solicitudes_total', 'Solicitudes de inspección detectadas')
+        self._m_errores_lectura = METRICAS.contador('plc_errores_total', 'Errores de comunicación PLC', {'operacion': 'lectura'})
+        self._m_errores_escritura = METRICAS.contador('plc_errores_total', 'Errores de comunicación PLC', {'operacion': 'escritura'})
+        self._m_conectado = METRICAS.medidor('plc_conectado', '1 si hay conexión con el PLC')
     
     def _cargar_configuracion(self, config_file: str) -> Dict:
         """Carga configuración desde archivo JSON"""
@@ -93,11 +104,13 @@ class PLCController:
             self.mc = pymcprotocol.Type3E()
             self.mc.connect(self.ip_plc, self.puerto_plc)
             self.is_connected = True
+            self._m_conectado.set(1)
             print("✅ Conexión PLC establecida exitosamente")
             return True
         except Exception as e:
             print(f"❌ Error al conectar con PLC: {e}")
             self.is_connected = False
+            self._m_conectado.set(0)
             return False
     
     def desconectar(self) -> None:
@@ -110,6 +123,7 @@ class PLCController:
                 print(f"⚠️ Error al desconectar: {e}")
             finally:
                 self.is_connected = False
+                self._m_conectado.set(0)
                 self.mc = None
     
     def leer_solicitud_inspeccion(self) -> bool:
@@ -126,12 +140,15 @@ class PLCController:
             return False
         
         try:
+            t_inicio = time.perf_counter()
             valor = self.mc.batchread_wordunits(
                 headdevice=self.DEV_TRIGGER, 
                 readsize=1
             )[0]
+            self._m_lectura.observar(time.perf_counter() - t_inicio)
             
             if valor == self.VAL_SOLICITUD:
+                self._m_solicitudes.inc()
                 print(f"📥 Solicitud de inspección detectada ({self.DEV_TRIGGER}={self.VAL_SOLICITUD})")
                 return True
             return False
@@ -139,6 +156,8 @@ class PLCController:
         except Exception as e:
             print(f"❌ Error al leer {self.DEV_TRIGGER}: {e}")
             self.is_connected = False
+            self._m_errores_lectura.inc()
+            self._m_conectado.set(0)
             return False
     
     def escribir_resultados(self, 
@@ -181,6 +200,7 @@ class PLCController:
             valor_filas = max(0, int(num_filas))
             
             # ORDEN CRÍTICO: Escribir D29, D31, D14, luego el estado D28
+            t_inicio = time.perf_counter()
             
             # Escribir Desviación Y (D29)
             self.mc.batchwrite_wordunits(
@@ -205,6 +225,7 @@ class PLCController:
                 headdevice=self.DEV_TRIGGER, 
                 values=[codigo_respuesta]
             )
+            self._m_escritura.observar(time.perf_counter() - t_inicio)
             
             print(f"✅ Resultados DUALES enviados: Y_Desv={desviacion_y_mm:.2f}mm ({valor_desviacion_y}), "
                     f"Z_Corr={correccion_z_mm:.2f}mm ({valor_correccion_z}), "
@@ -215,6 +236,8 @@ class PLCController:
         except Exception as e:
             print(f"❌ Error al escribir resultados: {e}")
             self.is_connected = False
+            self._m_errores_escritura.inc()
+            self._m_conectado.set(0)
             return False
     
     def _int32_to_words(self, n: int) -> list:
@@ -233,7 +256,9 @@ class PLCController:
         low_word = n & 0xFFFF
         high_word = (n >> 16) & 0xFFFF
         
-        return [low_word, high_word]
+        # pymcprotocol codifica cada palabra como int16 con signo: mismos bits,
+        # pero 0x8000..0xFFFF deben pasarse como negativos
+        return [w - 0x10000 if w & 0x8000 else w for w in (low_word, high_word)]
     
     def verificar_conexion(self) -> bool:
         """
@@ -0,0 +1,259 @@
+"""
+DetectorSimulado - Reemplazo determinista de los modelos YOLO
+Genera cajas sintéticas (columnas, vacíos, etiquetas Z, anomalías) con la
+misma interfaz que usa VisionProcessor de ultralytics:
+
+    results = modelo.predict(source=frame, conf=0.45, verbose=False)
+    for box in results[0].boxes:
+        modelo.names.get(int(box.cls.item()))
+        box.xyxy[0][0].item()
+    results[0].plot()
+
+Sirve para perfilar y cargar el post-proceso, la calibración, el PLC y la
+interfaz sin pesos .pt ni ultralytics/torch instalados.
+Se selecciona con rutas de modelo 'stub:superior' / 'stub:lateral'.
+"""
+
+import random
+import time
+from typing import Dict, List, Optional
+
+PREFIJO_STUB = 'stub:'
+
+# Tamaño asumido si el 'source' no es una imagen (ej. None en pruebas)
+ALTO_POR_DEFECTO = 720
+ANCHO_POR_DEFECTO = 1280
+
+
+class _Escalar:
+    """Imita un tensor de un elemento (solo .item())"""
+    __slots__ = ('valor',)
+
+    def __init__(self, valor):
+        self.valor = valor
+
+    def item(self):
+        return self.valor
+
+
+class Caja:
+    """Caja de detección con la forma de ultralytics (.cls, .conf, .xyxy[0])"""
+    __slots__ = ('cls', 'conf', 'xyxy')
+
+    def __init__(self, clase: int, confianza: float, x1: float, y1: float, x2: float, y2: float):
+        self.cls = _Escalar(clase)
+        self.conf = _Escalar(confianza)
+        self.xyxy = [[_Escalar(x1), _Escalar(y1), _Escalar(x2), _Escalar(y2)]]
+
+
+class Resultado:
+    """Resultado de un predict(): .boxes, .names y plot()"""
+
+    def __init__(self, frame, cajas: List[Caja], names: Dict[int, str]):
+        self.orig_img = frame
+        self.boxes = cajas
+        self.names = names
+
+    def plot(self):
+        """Frame con las cajas dibujadas (copia), como Results.plot()"""
+        if self.orig_img is None or not hasattr(self.orig_img, 'copy'):
+            return self.orig_img
+        import cv2
+        anotado = self.orig_img.copy()
+        for caja in self.boxes:
+            x1, y1, x2, y2 = (int(v.item()) for v in caja.xyxy[0])
+            cv2.rectangle(anotado, (x1, y1), (x2, y2), (0, 255, 0), 2)
+            cv2.putText(anotado, self.names[caja.cls.item()], (x1, max(12, y1 - 4)),
+                        cv2.FONT_HERSHEY_SIMPLEX, 0.5, (0, 255, 0), 1)
+        return anotado
+
+
+class DetectorSimulado:
+    """
+    Detector sintético con la interfaz de ultralytics.YOLO usada en el proyecto.
+
+    Las posiciones se expresan como fracción del ancho/alto del frame, así el
+    mismo escenario sirve para cualquier resolución. Con la misma semilla, la
+    secuencia de resultados es siempre la misma.
+    """
+
+    def __init__(self,
+                 tipo: str,
+                 names: Dict[int, str],
+                 escenario: Optional[Dict] = None,
+                 semilla: int = 0):
+        """
+        Args:
+            tipo: 'superior' (columnas/vacíos/fallos QC) o 'lateral' (etiquetas Z/anomalías)
+            names: Mapa id → nombre de clase (mismo formato que YOLO.names)
+            escenario: Parámetros de generación (ver _ESCENARIOS_POR_DEFECTO)
+            semilla: Semilla del generador aleatorio
+        """
+        if tipo not in _ESCENARIOS_POR_DEFECTO:
+            raise ValueError(f"Tipo de detector simulado desconocido: {tipo}")
+        self.tipo = tipo
+        self.names = names
+        self._ids = {nombre: clase for clase, nombre in names.items()}
+        self.escenario = dict(_ESCENARIOS_POR_DEFECTO[tipo])
+        self.escenario.update(escenario or {})
+        self._rng = random.Random(semilla)
+        self._confianza_piso = self.escenario['confianza_min']
+        self.llamadas = 0
+
+    def predict(self, source=None, conf: float = 0.25, verbose: bool = False, **kwargs) -> List[Resultado]:
+        """
+        Genera las cajas del siguiente frame.
+
+        Las confianzas se sortean en [max(conf, confianza_min), 0.99]: ninguna
+        caja queda bajo el umbral del llamador, así las únicas etiquetas que
+        faltan son las de 'prob_etiqueta_faltante' / 'prob_vacio'.
+        """
+        self._simular_latencia()
+        self.llamadas += 1
+        self._confianza_piso = min(max(conf, self.escenario['confianza_min']), 0.99)
+        alto, ancho = getattr(source, 'shape', (ALTO_POR_DEFECTO, ANCHO_POR_DEFECTO))[:2]
+        if self.tipo == 'superior':
+            cajas = self._cajas_superior(ancho, alto)
+        else:
+            cajas = self._cajas_lateral(ancho, alto)
+        return [Resultado(source, cajas, self.names)]
+
+    __call__ = predict
+
+    # ==================== GENERACIÓN ====================
+
+    def _simular_latencia(self) -> None:
+        latencia_ms = self.escenario['latencia_ms']
+        jitter_ms = self.escenario['latencia_jitter_ms']
+        if jitter_ms:
+            latencia_ms += self._rng.uniform(-jitter_ms, jitter_ms)
+        if latencia_ms > 0:
+            time.sleep(latencia_ms / 1000.0)
+
+    def _confianza(self) -> float:
+        return self._rng.uniform(self._confianza_piso, 0.99)
+
+    def _caja(self, nombre: str, x: float, y: float, ancho_caja: float, alto_caja: float) -> Optional[Caja]:
+        clase = self._ids.get(nombre)
+        if clase is None:
+            return None
+        return Caja(clase, self._confianza(),
+                     x - ancho_caja / 2, y - alto_caja / 2, x + ancho_caja / 2, y + alto_caja / 2)
+
+    def _jitter(self, escala_px: float) -> float:
+        return self._rng.uniform(-escala_px, escala_px) if escala_px else 0.0
+
+    def _cajas_superior(self, ancho: int, alto: int) -> List[Caja]:
+        e = self.escenario
+        cajas = []
+        paso = e['paso_fraccion'] * ancho
+        x0 = e['x_inicio_fraccion'] * ancho + e['desplazamiento_px']
+        y = e['y_fraccion'] * alto
+        for i in range(e['columnas']):
+            x = x0 + i * paso + self._jitter(e['jitter_px'])
+            vacia = self._rng.random() < e['prob_vacio']
+            caja = self._caja(e['clase_vacio'] if vacia else e['clase_posicion'], x, y, paso * 0.6, alto * 0.3)
+            if caja:
+                cajas.append(caja)
+        if self._rng.random() < e['prob_fallo']:
+            x = x0 + self._rng.randrange(e['columnas']) * paso
+            caja = self._caja(self._rng.choice(e['clases_fallo']), x, y, paso * 0.6, alto * 0.2)
+            if caja:
+                cajas.append(caja)
+        return cajas
+
+    def _cajas_lateral(self, ancho: int, alto: int) -> List[Caja]:
+        e = self.escenario
+        cajas = []
+        x = ancho / 2
+        for nombre, clave in ((e['clase_referencia'], 'y_referencia_fraccion'),
+                              (e['clase_borde'], 'y_borde_fraccion'),
+                              (e['clase_mitad'], 'y_mitad_fraccion')):
+            if self._rng.random() < e['prob_etiqueta_faltante']:
+                continue
+            y = e[clave] * alto + self._jitter(e['jitter_px'])
+            caja = self._caja(nombre, x, y, ancho * 0.1, alto * 0.04)
+            if caja:
+                cajas.append(caja)
+        if self._rng.random() < e['prob_anomalia']:
+            caja = self._caja(self._rng.choice(e['clases_anomalia']), x, alto * 0.5, ancho * 0.3, alto * 0.3)
+            if caja:
+                cajas.append(caja)
+        return cajas
+
+
+_ESCENARIOS_POR_DEFECTO = {
+    'superior': {
+        'columnas': 8,
+        'x_inicio_fraccion': 0.08,
+        'paso_fraccion': 0.12,
+        'y_fraccion': 0.5,
+        'desplazamiento_px': 0.0,
+        'jitter_px': 3.0,
+        'prob_vacio': 0.2,
+        'prob_fallo': 0.02,
+        'clase_posicion': 'posicion_columna',
+        'clase_vacio': 'posicion_vacia',
+        'clases_fallo': ['error_apilado', 'error_alerta'],
+        'confianza_min': 0.5,
+        'latencia_ms': 0.0,
+        'latencia_jitter_ms': 0.0,
+    },
+    'lateral': {
+        'y_referencia_fraccion': 0.3,
+        'y_borde_fraccion': 0.55,
+        'y_mitad_fraccion': 0.75,
+        'jitter_px': 2.0,
+        'prob_etiqueta_faltante': 0.02,
+        'prob_anomalia': 0.0,
+        'clase_referencia': 'referencia_fija',
+        'clase_borde': 'borde_envase',
+        'clase_mitad': 'mitad_envase',
+        'clases_anomalia': ['error_caido'],
+        'confianza_min': 0.3,
+        'latencia_ms': 0.0,
+        'latencia_jitter_ms': 0.0,
+    },
+}
+
+
+def es_ruta_stub(ruta) -> bool:
+    return isinstance(ruta, str) and ruta.startswith(PREFIJO_STUB)
+
+
+def crear_detector_simulado(ruta: str, config_vision: Dict) -> DetectorSimulado:
+    """
+    Crea el detector a partir de una ruta 'stub:superior' / 'stub:lateral'.
+
+    Los nombres de clase salen de la sección 'vision' (los mismos que espera
+    VisionProcessor) y los parámetros de 'vision.detector_simulado.<tipo>'.
+
+    Args:
+        ruta: 'stub:superior' o 'stub:lateral'
+        config_vision: Sección 'vision' del JSON
+
+    Returns:
+        DetectorSimulado listo para usar como modelo_sup / modelo_lat
+    """
+    tipo = ruta[len(PREFIJO_STUB):] or 'superior'
+    config_stub = config_vision.get('detector_simulado', {})
+    escenario = dict(config_stub.get(tipo, {}))
+
+    if tipo == 'superior':
+        clases_fallo = config_vision.get('CLASES_FALLO_SUPERIOR', ['error_apilado', 'error_alerta'])
+        escenario.setdefault('clase_posicion', config_vision.get('CLASE_POSICION', 'posicion_columna'))
+        escenario.setdefault('clase_vacio', config_vision.get('CLASE_VACIO', 'posicion_vacia'))
+        escenario.setdefault('clases_fallo', clases_fallo)
+        escenario.setdefault('columnas', config_vision.get('TOTAL_POSICIONES', 8))
+        nombres = [escenario['clase_posicion'], escenario['clase_vacio']] + list(clases_fallo)
+    else:
+        clases_anomalia = config_vision.get('CLASES_ANOMALIA_LATERAL', ['error_caido'])
+        escenario.setdefault('clase_referencia', config_vision.get('CLASE_REFERENCIA', 'referencia_fija'))
+        escenario.setdefault('clase_borde', config_vision.get('CLASE_BORDE_ENV', 'borde_envase'))
+        escenario.setdefault('clase_mitad', config_vision.get('CLASE_MITAD_ENV', 'mitad_envase'))
+        escenario.setdefault('clases_anomalia', clases_anomalia)
+        nombres = [escenario['clase_referencia'], escenario['clase_borde'], escenario['clase_mitad']] + list(clases_anomalia)
+
+    names = {i: nombre for i, nombre in enumerate(dict.fromkeys(nombres))}
+    semilla = config_stub.get('semilla', 0) + (0 if tipo == 'superior' else 1)
+    return DetectorSimulado(tipo, names, escenario, semilla)
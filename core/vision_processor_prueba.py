@@ -4,10 +4,19 @@ VisionProcessor_prueba - Módulo de procesamiento de visión artificial
 Integra la lógica de 'prueba_control.py'
 """
 
+import time
+
 import numpy as np
 import cv2
 from typing import Dict, List, Optional, Tuple
-from ultralytics import YOLO
+
+from core.column_assignment import (COLUMNA_DESCONOCIDA, COLUMNA_PRODUCTO, COLUMNA_VACIA, SIMBOLOS_COLUMNA,
+                                    asignar_columnas)
+from core.model_loader import crear_modelo
+from core.pallet_tracker import INCONSISTENTE, crear_seguidor_desde_config
+from core.stub_detector import es_ruta_stub
+from utils.logger_prueba import log_diferido
+from utils.metrics import METRICAS
 
 class VisionProcessor:
     """
@@ -21,7 +30,8 @@ class VisionProcessor:
                  config: Dict,
                  logger,
                  modelo_path_sup: str,
-                 modelo_path_lat: str):
+                 modelo_path_lat: str,
+                 modelos: Optional[Tuple[object, object]] = None):
         """
         Inicializa el procesador de visión DUAL.
         
@@ -30,6 +40,8 @@ class VisionProcessor:
             logger: Instancia del logger
             modelo_path_sup: Ruta al modelo .pt Superior
             modelo_path_lat: Ruta al modelo .pt Lateral
+            modelos: (modelo_sup, modelo_lat) ya cargados y calentados (ver
+                     CargadorModelos); si se pasan no se vuelven a cargar
         """
         self.config_vision = config.get('vision', {})
         self.logger = logger
@@ -40,6 +52,8 @@ class VisionProcessor:
         self.conf_sup = self.config_vision.get('confianza_sup', 0.45)
         self.conf_lat = self.config_vision.get('confianza_lat', 0.05)
         self.mm_per_pixel = self.config_vision.get('mm_per_pixel', 0.5) # Para conversión Y
+        # Frames anotados (plot/putText): solo útiles si alguien los muestra
+        self.generar_anotaciones = self.config_vision.get('generar_anotaciones', True)
 
         # Superior (Posicion Y(abanico), Conteo Filas (para saber a donde tiene q buscar la siguiente columna el brazo1), QC)
         self.CLASES_FALLO_SUPERIOR = self.config_vision.get('CLASES_FALLO_SUPERIOR', ['error_apilado', 'error_alerta'])
@@ -47,6 +61,8 @@ class VisionProcessor:
         self.CLASE_VACIO = self.config_vision.get('CLASE_VACIO', 'posicion_vacia')
         self.TOTAL_POSICIONES = self.config_vision.get('TOTAL_POSICIONES', 8)
         self.TOLERANCIA_COLUMNA_PX = self.config_vision.get('TOLERANCIA_COLUMNA_PX', 30)
+        # Distancia máxima detección → columna ideal (0 = medio paso entre columnas)
+        self.TOLERANCIA_ASIGNACION_PX = self.config_vision.get('TOLERANCIA_ASIGNACION_PX', 0)
         self.CORRECCION_Y_FIJA_PX = self.config_vision.get('CORRECCION_Y_FIJA_PX', 50) # Límite
         
         # Lateral (Z, Seguridad)
@@ -56,43 +72,104 @@ class VisionProcessor:
         self.CLASE_MITAD_ENV = self.config_vision.get('CLASE_MITAD_ENV', 'mitad_envase')
         self.D_REAL_MM = self.config_vision.get('D_REAL_MM', 100.0)
         self.OFFSET_CERO_PX = self.config_vision.get('OFFSET_CERO_PX', 40)
+        
+        # Cascada Lateral (opcional): pasada rápida en baja resolución + pasada
+        # fina solo sobre las etiquetas Z
+        config_cascada = self.config_vision.get('cascada_lateral', {})
+        self.cascada_lateral = config_cascada.get('habilitado', False)
+        self.imgsz_cascada_baja = config_cascada.get('imgsz_baja', 320)
+        self.imgsz_cascada_alta = config_cascada.get('imgsz_alta', 0)  # 0 = la del modelo
+        self.margen_cascada_px = config_cascada.get('margen_px', 24)
 
         # Códigos de respuesta internos
         self.CODIGO_OK = 0
         self.CODIGO_FALLO_QC = 1
         self.CODIGO_PARADA = 2
         
+        # Métricas
+        self._m_inferencia_sup = METRICAS.histograma('vision_inferencia_segundos', 'Latencia de inferencia YOLO', {'modelo': 'superior'})
+        self._m_inferencia_lat = METRICAS.histograma('vision_inferencia_segundos', 'Latencia de inferencia YOLO', {'modelo': 'lateral'})
+        self._m_pasadas_lat = {
+            pasada: METRICAS.contador('vision_lateral_pasadas_total', 'Pasadas de la cascada Lateral', {'pasada': pasada})
+            for pasada in ('baja', 'alta', 'completa')
+        }
+        self._m_procesamiento = METRICAS.histograma('vision_procesamiento_segundos', 'Duración de procesar_frames_dual')
+        self._m_resultados = {
+            codigo: METRICAS.contador('vision_resultados_total', 'Resultados por código interno', {'codigo': str(codigo)})
+            for codigo in (self.CODIGO_OK, self.CODIGO_FALLO_QC, self.CODIGO_PARADA)
+        }
+        # (ms de inferencia, cantidad de detecciones) de la última llamada, para el diario
+        self._medicion_sup = (0.0, 0)
+        self._medicion_lat = (0.0, 0)
+        self._estado_columnas = ''
+        self._residuo_columnas = None
+        
         # Estado de calibración
         self.X_CENTROS_IDEALES = {}
         self.calibrado_y = False
+        self.distancia_columnas_px = 0.0
+        # (x ideales ordenados por columna, compuerta de asignación): se reemplaza entera
+        self._rejilla = (np.empty(0), 0.0)
+        
+        # Rutas (identifican el modelo en la calibración persistida)
+        self.modelo_path_sup = modelo_path_sup
+        self.modelo_path_lat = modelo_path_lat
+        
+        # Seguimiento del pallet (opcional): con estado consistente la Superior
+        # solo confirma la zona de la columna de trabajo. El detector simulado
+        # genera cajas relativas al frame recibido, así que no admite recortes.
+        self.seguidor_pallet = crear_seguidor_desde_config(self.config_vision, self.TOTAL_POSICIONES, logger)
+        self._confirmar_por_zona = self.seguidor_pallet is not None and not es_ruta_stub(modelo_path_sup)
+        if self.cascada_lateral and es_ruta_stub(modelo_path_lat):
+            self._log("⚠️ Cascada Lateral deshabilitada: el detector simulado no admite recortes", 'warning')
+            self.cascada_lateral = False
+        self._pallet = None
+        self._m_via_sup = {
+            via: METRICAS.contador('vision_superior_via_total', 'Inspecciones Superiores por vía', {'via': via})
+            for via in ('completa', 'zona')
+        }
         
-        # Cargar modelos
+        # Cargar modelos (o usar los precargados en segundo plano)
         self.modelo_sup = None
         self.modelo_lat = None
-        self.modelos_cargados = self._cargar_modelos(modelo_path_sup, modelo_path_lat)
-
-    def _log(self, mensaje: str, nivel: str = 'info'):
-        """Helper para loggear"""
-        if self.logger:
-            if nivel == 'info': self.logger.info(mensaje)
-            elif nivel == 'warning': self.logger.warning(mensaje)
-            elif nivel == 'error': self.logger.error(mensaje)
+        if modelos is not None:
+            self.modelo_sup, self.modelo_lat = modelos
+            self.modelos_cargados = self.modelo_sup is not None and self.modelo_lat is not None
         else:
-            print(mensaje) # Fallback a print
+            self.modelos_cargados = self._cargar_modelos(modelo_path_sup, modelo_path_lat)
+
+    def _log(self, mensaje: str, nivel: str = 'info', *args):
+        """
+        Helper para loggear.
+        Con args el mensaje usa formato %% diferido: solo se arma si el nivel está habilitado.
+        """
+        log_diferido(self.logger, mensaje, nivel, *args)
+
+    def _anotar_texto(self, frame, texto: str, posicion: Tuple[int, int], escala: float, grosor: int):
+        """Copia del frame con un aviso en rojo (o el frame original si no se anotan)"""
+        if not self.generar_anotaciones:
+            return frame
+        anotado = frame.copy()
+        cv2.putText(anotado, texto, posicion, cv2.FONT_HERSHEY_SIMPLEX, escala, (0, 0, 255), grosor)
+        return anotado
 
     def _cargar_modelos(self, path_sup, path_lat):
         """Carga los modelos YOLOv8 para ambas cámaras."""
         try:
             self._log(f"📦 Cargando modelo Superior desde {path_sup}...")
-            self.modelo_sup = YOLO(path_sup)
+            self.modelo_sup = self._crear_modelo(path_sup)
             self._log(f"📦 Cargando modelo Lateral desde {path_lat}...")
-            self.modelo_lat = YOLO(path_lat)
+            self.modelo_lat = self._crear_modelo(path_lat)
             self._log("✅ Modelos Superior y Lateral cargados.")
             return True
         except Exception as e:
             self._log(f"❌ ERROR al cargar modelos: {e}", 'error')
             return False
 
+    def _crear_modelo(self, path):
+        """YOLO para rutas .pt; DetectorSimulado para rutas 'stub:superior' / 'stub:lateral'"""
+        return crear_modelo(path, self.config_vision)
+
     def calibrar_y(self, frame_calibracion):
         """
         (Lógica de 'calcular_centros_ideales')
@@ -127,11 +204,8 @@ class VisionProcessor:
             distancia_ideal_px = sum(deltas) / len(deltas)
             primer_centro_ideal = centros_x_detectados[0] 
             
-            self.X_CENTROS_IDEALES = {}
-            for i in range(self.TOTAL_POSICIONES):
-                self.X_CENTROS_IDEALES[i + 1] = int(primer_centro_ideal + i * distancia_ideal_px)
-                
-            self.calibrado_y = True
+            self._fijar_centros({i + 1: int(primer_centro_ideal + i * distancia_ideal_px)
+                                 for i in range(self.TOTAL_POSICIONES)}, distancia_ideal_px)
             self._log(f"✅ Calibración Y Exitosa: Distancia promedio: {distancia_ideal_px:.2f} px")
             self._log(f"   Centros Ideales generados: {self.X_CENTROS_IDEALES}")
 
@@ -139,6 +213,39 @@ class VisionProcessor:
             self._log(f"❌ Error durante calibración de centros Y: {e}", 'error')
             self.calibrado_y = False
 
+    def detectar_centros_columna(self, frame_sup) -> np.ndarray:
+        """
+        Centros X de las columnas y vacíos del frame (confianza baja, como calibrar_y).
+        """
+        if not self.modelo_sup:
+            raise RuntimeError("modelo Superior no cargado")
+        results = self.modelo_sup.predict(source=frame_sup, conf=0.1, verbose=False)
+        clases_columna = (self.CLASE_POSICION, self.CLASE_VACIO)
+        return np.array([(box.xyxy[0][0].item() + box.xyxy[0][2].item()) / 2
+                         for box in results[0].boxes
+                         if self.modelo_sup.names.get(int(box.cls.item())) in clases_columna],
+                        dtype=np.float64)
+
+    def aplicar_calibracion(self, centros: Dict[int, int], distancia_px: float = 0.0):
+        """
+        Usa centros ideales ya calculados (ej. recuperados de disco o de la
+        recalibración en marcha) sin inferir. El dict se reemplaza
+        entero: un ciclo en curso sigue usando el anterior.
+        """
+        self._fijar_centros(centros, distancia_px)
+
+    def _fijar_centros(self, centros: Dict[int, int], distancia_px: float):
+        """Publica centros y rejilla de asignación (un ciclo en curso usa la rejilla anterior completa)"""
+        centros = {int(col): int(x) for col, x in sorted(centros.items())}
+        x_ideales = np.array(list(centros.values()), dtype=np.float64)
+        max_asignacion_px = self.TOLERANCIA_ASIGNACION_PX
+        if not max_asignacion_px:
+            max_asignacion_px = float(np.median(np.diff(x_ideales))) / 2 if x_ideales.size > 1 else 2 * self.TOLERANCIA_COLUMNA_PX
+        self._rejilla = (x_ideales, max_asignacion_px)
+        self.X_CENTROS_IDEALES = centros
+        self.distancia_columnas_px = distancia_px
+        self.calibrado_y = len(centros) == self.TOTAL_POSICIONES
+
     def _calcular_correccion_z(self, y_referencia, y_borde, y_mitad):
         """
         (Lógica de 'calcular_correccion_z')
@@ -163,8 +270,17 @@ class VisionProcessor:
         (Lógica de 'ejecutar_inferencia_lateral')
         Ejecuta inferencia en la cámara lateral (SEGURIDAD Y CORRECCIÓN Z).
         """
-        results = self.modelo_lat.predict(source=frame_lat, conf=self.conf_lat, verbose=False) 
-        annotated_lat = results[0].plot()
+        t_inicio = time.perf_counter()
+        if self.cascada_lateral:
+            cajas_z, anomalia, annotated_lat, detecciones = self._inferencia_lateral_cascada(frame_lat)
+        else:
+            results = self.modelo_lat.predict(source=frame_lat, conf=self.conf_lat, verbose=False) 
+            cajas_z, anomalia = self._leer_detecciones_lateral(results)
+            annotated_lat = results[0].plot() if self.generar_anotaciones else frame_lat
+            detecciones = len(results[0].boxes)
+        duracion_s = time.perf_counter() - t_inicio
+        self._m_inferencia_lat.observar(duracion_s)
+        self._medicion_lat = (duracion_s * 1000.0, detecciones)
         
         response_code = self.CODIGO_OK
         correccion_z_cmm = 0 
@@ -173,23 +289,13 @@ class VisionProcessor:
         
         y_coords = {self.CLASE_REFERENCIA: None, self.CLASE_BORDE_ENV: None, self.CLASE_MITAD_ENV: None}
         y_center_ref_fallback = frame_lat.shape[0] // 2
+        for cls_name, (x1, y1, x2, y2) in cajas_z.items():
+            y_coords[cls_name] = int((y1 + y2) / 2)
         
-        # --- BÚSQUEDA DE DETECCIONES Y ANOMALÍAS ---
-        for box in results[0].boxes:
-            cls_name = self.modelo_lat.names.get(int(box.cls.item()))
-            
-            if cls_name in y_coords:
-                y_center = int((box.xyxy[0][1].item() + box.xyxy[0][3].item()) / 2)
-                # Tomar la detección con mayor confianza si hay múltiples
-                if y_coords[cls_name] is None:
-                     y_coords[cls_name] = y_center
-                # (Se podría mejorar guardando la 'conf' y tomando el más alto)
-                
-            if cls_name in self.CLASES_ANOMALIA_LATERAL:
-                self._log(f"🚨 Anomalía Lateral Crítica: {cls_name} detectada.", 'warning')
-                response_code = self.CODIGO_PARADA
-                log_z = f"PARADA CRÍTICA: {cls_name}"
-                break 
+        if anomalia is not None:
+            self._log("🚨 Anomalía Lateral Crítica: %s detectada.", 'warning', anomalia)
+            response_code = self.CODIGO_PARADA
+            log_z = f"PARADA CRÍTICA: {anomalia}"
             
         # --- CÁLCULO DE CORRECCIÓN Z ---
         if response_code != self.CODIGO_PARADA:
@@ -218,6 +324,88 @@ class VisionProcessor:
         
         return response_code, annotated_lat, correccion_z_cmm, log_final
 
+    def _leer_detecciones_lateral(self, results, x0: int = 0, y0: int = 0):
+        """
+        Recorre las cajas Laterales hasta la primera anomalía.
+
+        Args:
+            results: Salida de predict()
+            x0, y0: Desplazamiento del recorte dentro del frame
+
+        Returns:
+            ({clase Z: (x1, y1, x2, y2)} primera detección de cada etiqueta, clase de anomalía o None)
+        """
+        clases_z = (self.CLASE_REFERENCIA, self.CLASE_BORDE_ENV, self.CLASE_MITAD_ENV)
+        cajas_z = {}
+        for box in results[0].boxes:
+            cls_name = self.modelo_lat.names.get(int(box.cls.item()))
+            
+            if cls_name in clases_z and cls_name not in cajas_z:
+                # (Se podría mejorar guardando la 'conf' y tomando el más alto)
+                cajas_z[cls_name] = (box.xyxy[0][0].item() + x0, box.xyxy[0][1].item() + y0,
+                                     box.xyxy[0][2].item() + x0, box.xyxy[0][3].item() + y0)
+                
+            if cls_name in self.CLASES_ANOMALIA_LATERAL:
+                return cajas_z, cls_name
+        return cajas_z, None
+
+    def _inferencia_lateral_cascada(self, frame_lat):
+        """
+        Lateral en dos pasadas:
+        1. Baja resolución (imgsz_baja) sobre el frame: anomalías y presencia de etiquetas Z
+        2. Resolución completa solo sobre la región de las etiquetas Z (más 'margen_px'),
+           de donde salen las coordenadas Y para la corrección Z
+
+        Si la pasada baja no ve alguna de las tres etiquetas Z (la que falta
+        podría estar fuera de la región) se repite la inferencia completa sobre
+        el frame, igual que sin cascada.
+
+        Returns:
+            (cajas Z, anomalía o None, frame anotado, cantidad de detecciones)
+        """
+        results = self.modelo_lat.predict(source=frame_lat, conf=self.conf_lat, imgsz=self.imgsz_cascada_baja, verbose=False)
+        cajas_z, anomalia = self._leer_detecciones_lateral(results)
+        detecciones = len(results[0].boxes)
+        
+        clases_z = (self.CLASE_REFERENCIA, self.CLASE_BORDE_ENV, self.CLASE_MITAD_ENV)
+        if anomalia is None and any(clase not in cajas_z for clase in clases_z):
+            self._m_pasadas_lat['completa'].inc()
+            results = self.modelo_lat.predict(source=frame_lat, conf=self.conf_lat, verbose=False)
+            cajas_z, anomalia = self._leer_detecciones_lateral(results)
+            annotated_lat = results[0].plot() if self.generar_anotaciones else frame_lat
+            return cajas_z, anomalia, annotated_lat, len(results[0].boxes)
+        
+        self._m_pasadas_lat['baja'].inc()
+        annotated_lat = results[0].plot() if self.generar_anotaciones else frame_lat
+        if anomalia is not None:
+            return cajas_z, anomalia, annotated_lat, detecciones
+        
+        # Región de las etiquetas Z a resolución completa
+        cajas = np.array(list(cajas_z.values()))
+        alto, ancho = frame_lat.shape[:2]
+        x0 = int(max(0, cajas[:, 0].min() - self.margen_cascada_px))
+        y0 = int(max(0, cajas[:, 1].min() - self.margen_cascada_px))
+        x1 = int(min(ancho, cajas[:, 2].max() + self.margen_cascada_px + 1))
+        y1 = int(min(alto, cajas[:, 3].max() + self.margen_cascada_px + 1))
+        region = np.ascontiguousarray(frame_lat[y0:y1, x0:x1])
+        
+        kwargs_alta = {'imgsz': self.imgsz_cascada_alta} if self.imgsz_cascada_alta else {}
+        results_alta = self.modelo_lat.predict(source=region, conf=self.conf_lat, verbose=False, **kwargs_alta)
+        cajas_alta, anomalia = self._leer_detecciones_lateral(results_alta, x0, y0)
+        self._m_pasadas_lat['alta'].inc()
+        conservadas = len(cajas_z.keys() - cajas_alta.keys())
+        cajas_z.update(cajas_alta)  # las que la pasada fina no vio quedan con la coordenada gruesa
+        
+        # Detecciones del resultado combinado: las de la pasada fina, las gruesas
+        # fuera de la región (no se volvieron a inferir) y las Z conservadas
+        fuera = sum(1 for box in results[0].boxes
+                    if not (x0 <= (box.xyxy[0][0].item() + box.xyxy[0][2].item()) / 2 < x1
+                            and y0 <= (box.xyxy[0][1].item() + box.xyxy[0][3].item()) / 2 < y1))
+        
+        if self.generar_anotaciones:
+            annotated_lat[y0:y1, x0:x1] = results_alta[0].plot()
+        return cajas_z, anomalia, annotated_lat, len(results_alta[0].boxes) + fuera + conservadas
+
     def _ejecutar_inferencia_superior(self, frame_sup):
         """
         (Lógica de 'ejecutar_inferencia_superior')
@@ -226,63 +414,56 @@ class VisionProcessor:
         if not self.calibrado_y:
             self._log("Error: Inferencia superior llamada sin calibración Y.", 'error')
             # Retorna un fallo si no está calibrado
-            annotated_sup = frame_sup.copy() # Devuelve frame original
-            cv2.putText(annotated_sup, "ERROR: NO CALIBRADO", (50, 50), cv2.FONT_HERSHEY_SIMPLEX, 1, (0, 0, 255), 3)
+            annotated_sup = self._anotar_texto(frame_sup, "ERROR: NO CALIBRADO", (50, 50), 1, 3)
             return self.CODIGO_FALLO_QC, annotated_sup, 0, 0
             
-        results = self.modelo_sup.predict(source=frame_sup, conf=self.conf_sup, verbose=False)
-        annotated_sup = results[0].plot()
+        x_ideales, max_asignacion_px = self._rejilla  # la calibración puede cambiar entre ciclos
         
-        has_qc_error = False
-        detecciones_por_posicion = {} 
+        confirmacion = None
+        if self._confirmar_por_zona and self.seguidor_pallet.puede_confirmar():
+            confirmacion = self._confirmar_columna_trabajo(frame_sup, x_ideales, max_asignacion_px)
         
-        for box in results[0].boxes:
-            cls_name = self.modelo_sup.names.get(int(box.cls.item()))
-            x_center = int((box.xyxy[0][0].item() + box.xyxy[0][2].item()) / 2)
-
-            if cls_name in self.CLASES_FALLO_SUPERIOR:
-                has_qc_error = True
-                
-            if cls_name == self.CLASE_VACIO:
-                detecciones_por_posicion[x_center] = 'VACIO'
-            elif cls_name == self.CLASE_POSICION:
-                if x_center not in detecciones_por_posicion:
-                    detecciones_por_posicion[x_center] = 'PRODUCTO'
+        if confirmacion is not None:
+            via = 'zona'
+            estados, x_columna, annotated_sup = confirmacion
+            has_qc_error = False
+        else:
+            via = 'completa'
+            x_detecciones, estado_detecciones, has_qc_error, results = self._detectar_columnas(frame_sup)
+            annotated_sup = results[0].plot() if self.generar_anotaciones else frame_sup
+            
+            # --- ASIGNACIÓN A COLUMNAS (una detección por columna) ---
+            estados, x_columna, descartadas = asignar_columnas(x_detecciones, estado_detecciones,
+                                                               x_ideales, max_asignacion_px)
+            if descartadas:
+                self._log("Detecciones de columna descartadas (duplicadas o fuera de rejilla): %d", 'debug', descartadas)
+        
+        self._m_via_sup[via].inc()
+        if self.seguidor_pallet:
+            self._pallet = self.seguidor_pallet.registrar(estados, via)
+        self._estado_columnas = ''.join(SIMBOLOS_COLUMNA[e] for e in estados.tolist())
+        
+        # Residuo columnas asignadas - ideales (entrada del monitor de deriva)
+        asignadas = ~np.isnan(x_columna)
+        residuos = x_columna[asignadas] - x_ideales[asignadas]
+        if residuos.size:
+            self._residuo_columnas = {'media': round(float(residuos.mean()), 2),
+                                      'rms': round(float(np.sqrt(np.mean(residuos ** 2))), 2),
+                                      'columnas': int(residuos.size)}
         
         # --- CÁLCULO DE CONTEO Y COLUMNA DE TRABAJO ---
-        conteo_filas_restantes = 0
-        posicion_x_trabajo = None 
-        
-        posiciones_ordenadas = sorted(detecciones_por_posicion.keys())
-
-        for x_pos in posiciones_ordenadas:
-            estado = detecciones_por_posicion[x_pos]
-            if estado == 'PRODUCTO':
-                conteo_filas_restantes += 1
-                if posicion_x_trabajo is None:
-                    posicion_x_trabajo = x_pos
+        con_producto = estados == COLUMNA_PRODUCTO
+        conteo_filas_restantes = int(np.count_nonzero(con_producto))
                     
         # --- CORRECCIÓN Y DINÁMICA ---
         correccion_y_pixels = 0
         
-        if posicion_x_trabajo is not None:
-            columna_actual_num = None
-            min_dist = float('inf')
-            
-            for num_col, x_ideal in self.X_CENTROS_IDEALES.items():
-                dist = abs(posicion_x_trabajo - x_ideal)
-                if dist < min_dist:
-                    min_dist = dist
-                    columna_actual_num = num_col
-            
-            if columna_actual_num is not None:
-                if min_dist > self.TOLERANCIA_COLUMNA_PX:
-                    correccion_y_pixels = posicion_x_trabajo - self.X_CENTROS_IDEALES[columna_actual_num]
-                    correccion_y_pixels = max(min(correccion_y_pixels, self.CORRECCION_Y_FIJA_PX), -self.CORRECCION_Y_FIJA_PX)
-                    has_qc_error = True # Desviación = Fallo QC
-            else:
-                self._log("Error lógico: No se pudo mapear la posición de trabajo a una columna ideal.", 'error')
-                has_qc_error = True
+        if conteo_filas_restantes:
+            columna_trabajo = int(np.argmax(con_producto))  # primera columna con producto
+            desviacion_px = int(round(x_columna[columna_trabajo] - x_ideales[columna_trabajo]))
+            if abs(desviacion_px) > self.TOLERANCIA_COLUMNA_PX:
+                correccion_y_pixels = max(min(desviacion_px, self.CORRECCION_Y_FIJA_PX), -self.CORRECCION_Y_FIJA_PX)
+                has_qc_error = True # Desviación = Fallo QC
         
         # Determinar código de respuesta final
         response_code = self.CODIGO_OK
@@ -291,11 +472,91 @@ class VisionProcessor:
         
         return response_code, annotated_sup, conteo_filas_restantes, correccion_y_pixels
 
+    def _detectar_columnas(self, frame):
+        """
+        Inferencia Superior sobre el frame (o un recorte).
+
+        Returns:
+            (x de columnas/vacíos, estado por detección, hubo clase de fallo QC, results)
+        """
+        t_inicio = time.perf_counter()
+        results = self.modelo_sup.predict(source=frame, conf=self.conf_sup, verbose=False)
+        duracion_s = time.perf_counter() - t_inicio
+        self._m_inferencia_sup.observar(duracion_s)
+        self._medicion_sup = (duracion_s * 1000.0, len(results[0].boxes))
+        
+        has_qc_error = False
+        x_detecciones = []
+        estado_detecciones = []
+        
+        for box in results[0].boxes:
+            cls_name = self.modelo_sup.names.get(int(box.cls.item()))
+
+            if cls_name in self.CLASES_FALLO_SUPERIOR:
+                has_qc_error = True
+            elif cls_name == self.CLASE_VACIO or cls_name == self.CLASE_POSICION:
+                x_detecciones.append((box.xyxy[0][0].item() + box.xyxy[0][2].item()) / 2)
+                estado_detecciones.append(COLUMNA_VACIA if cls_name == self.CLASE_VACIO else COLUMNA_PRODUCTO)
+        
+        return (np.array(x_detecciones, dtype=np.float64), np.array(estado_detecciones, dtype=np.int8),
+                has_qc_error, results)
+
+    def _confirmar_columna_trabajo(self, frame_sup, x_ideales: np.ndarray, max_asignacion_px: float):
+        """
+        Confirmación barata con el pallet en estado consistente: inferencia
+        solo sobre la franja de la columna de trabajo esperada (y sus
+        'columnas_vecinas' a cada lado).
+
+        Se confirma si la columna de trabajo tiene producto, las demás
+        columnas vistas coinciden con lo esperado y no hay fallo QC en la
+        franja. Si no, retorna None y se hace la inspección completa.
+
+        Returns:
+            (estados, x por columna, frame anotado) o None
+        """
+        esperado = self.seguidor_pallet.esperado()
+        trabajo = int(np.flatnonzero(esperado == COLUMNA_PRODUCTO)[0])
+        vecinas = self.seguidor_pallet.columnas_vecinas
+        primera = max(0, trabajo - vecinas)
+        ultima = min(x_ideales.size - 1, trabajo + vecinas)
+        x0 = int(max(0, x_ideales[primera] - max_asignacion_px))
+        x1 = int(min(frame_sup.shape[1], x_ideales[ultima] + max_asignacion_px + 1))
+        zona = np.ascontiguousarray(frame_sup[:, x0:x1])
+        
+        x_detecciones, estado_detecciones, has_qc_error, results = self._detectar_columnas(zona)
+        if has_qc_error:
+            return None
+        estados_zona, x_zona, _ = asignar_columnas(x_detecciones + x0, estado_detecciones,
+                                                   x_ideales[primera:ultima + 1], max_asignacion_px)
+        esperado_zona = esperado[primera:ultima + 1]
+        vistas = estados_zona != COLUMNA_DESCONOCIDA
+        if estados_zona[trabajo - primera] != COLUMNA_PRODUCTO or \
+                not np.array_equal(estados_zona[vistas], esperado_zona[vistas]):
+            self._log("Confirmación por zona no coincide (esperado %s), inspección completa", 'debug',
+                      ''.join(SIMBOLOS_COLUMNA[e] for e in esperado_zona.tolist()))
+            return None
+        
+        estados = esperado.copy()
+        estados[primera:ultima + 1] = np.where(vistas, estados_zona, esperado_zona)
+        x_columna = np.full(x_ideales.size, np.nan)
+        x_columna[primera:ultima + 1] = x_zona
+        annotated_sup = frame_sup
+        if self.generar_anotaciones:
+            annotated_sup = frame_sup.copy()
+            annotated_sup[:, x0:x1] = results[0].plot()
+        return estados, x_columna, annotated_sup
+
     def procesar_frames_dual(self, frame_sup, frame_lat) -> Dict:
         """
         Función principal llamada por main.py.
         Ejecuta ambas inferencias y combina los resultados para el PLC.
         """
+        t_inicio = time.perf_counter()
+        self._medicion_sup = (0.0, 0)
+        self._medicion_lat = (0.0, 0)
+        self._estado_columnas = ''
+        self._residuo_columnas = None
+        self._pallet = None
         
         # 1. Inferencia Lateral (Seguridad y Z)
         resp_lat_code, annotated_lat, correccion_z, log_z = \
@@ -309,8 +570,7 @@ class VisionProcessor:
         else:
             # Si hay parada, no ejecutes la superior
             resp_sup_code = self.CODIGO_OK # No es un fallo de QC, es una parada
-            annotated_sup = frame_sup.copy() # Devuelve el frame original
-            cv2.putText(annotated_sup, "PARADA (LATERAL)", (50, 100), cv2.FONT_HERSHEY_SIMPLEX, 2, (0, 0, 255), 5)
+            annotated_sup = self._anotar_texto(frame_sup, "PARADA (LATERAL)", (50, 100), 2, 5)
             conteo = 0
             correccion_y_px = 0
 
@@ -339,6 +599,10 @@ class VisionProcessor:
             codigo_respuesta_plc = self.CODIGO_FALLO_QC # 1
         else:
             codigo_respuesta_plc = self.CODIGO_OK # 0
+        
+        self._m_resultados[codigo_respuesta_plc].inc()
+        duracion_s = time.perf_counter() - t_inicio
+        self._m_procesamiento.observar(duracion_s)
             
         # *** LÓGICA DE MAPEO IMPORTANTE ***
         # Se eliminó la lógica confusa y obsoleta de 'prueba_control' para asegurar 
@@ -358,6 +622,15 @@ class VisionProcessor:
             'annotated_sup': annotated_sup, 
             'annotated_lat': annotated_lat,
             'log_z': log_z,
+            'estado_columnas': self._estado_columnas, # str: 'P' producto, 'V' vacío, '?' sin detección (columna 1 primero)
+            'residuo_columnas_px': self._residuo_columnas, # {'media', 'rms', 'columnas'} o None
+            'pallet': self._pallet, # {'transicion', 'via', 'esperado', 'observado'} o None (sin seguimiento)
+            'tiempos_ms': {
+                'inferencia_lat': self._medicion_lat[0],
+                'inferencia_sup': self._medicion_sup[0],
+                'procesamiento': duracion_s * 1000.0,
+            },
+            'detecciones': {'superior': self._medicion_sup[1], 'lateral': self._medicion_lat[1]},
         }
 
     def validar_resultado(self, resultado: Dict) -> Tuple[bool, List[str]]:
@@ -384,6 +657,13 @@ class VisionProcessor:
                 f"⚠️ Desviación Y fuera de rango: {resultado['desviacion_y_px']} px"
             )
 
+        # Validar transición del pallet (seguimiento entre inspecciones)
+        pallet = resultado.get('pallet')
+        if pallet and pallet['transicion'] == INCONSISTENTE:
+            advertencias.append(
+                f"⚠️ Pallet inconsistente: esperado {pallet['esperado']}, observado {pallet['observado']}"
+            )
+
         # Validar número de filas
         filas = resultado['filas']
         if filas < 0 or filas > self.TOTAL_POSICIONES:
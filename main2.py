@@ -6,16 +6,31 @@ Punto de entrada principal del sistema
 
 import tkinter as tk
 from tkinter import ttk, filedialog, messagebox
-import cv2
-from PIL import Image, ImageTk
 import json
+import queue
+import threading
 import time
 from pathlib import Path
 
 # <<< Asumiendo que tus archivos están en estas carpetas >>>
 from core.plc_controller import PLCController
-from core.vision_processor_prueba import VisionProcessor
-from utils.logger_prueba import setup_logger, log_resultado_procesamiento, log_estado_plc
+from core.camera_source import FuenteCamara, crear_fuente_desde_config
+from core.inspection_engine import MotorInspeccion
+from core.model_loader import CargadorModelos, ICONOS_ETAPA
+from core.calibration_store import crear_almacen_desde_config
+from utils.frame_renderer import RenderizadorCanvas
+from utils.result_log_view import VistaResultadosAcotada
+from utils.web_dashboard import DashboardWeb
+from utils.metrics import iniciar_exportacion_metricas
+from utils.inspection_journal import crear_diario_desde_config
+from utils.tracing import crear_trazador_desde_config
+from utils.profiler import PERFILADOR_NULO, crear_perfilador_desde_config, instalar_senal
+from utils.lazy_imports import precargar_en_segundo_plano
+from utils.logger_prueba import setup_logger, cargar_config_logs
+
+
+# Dependencias pesadas, en el orden en que se usan
+MODULOS_PRECARGA = ('numpy', 'cv2', 'PIL.ImageTk', 'core.vision_processor_prueba', 'ultralytics')
 
 
 class SistemaPLCYOLO:
@@ -34,7 +49,13 @@ class SistemaPLCYOLO:
         
         # Logger
         Path('logs').mkdir(exist_ok=True) 
-        self.logger = setup_logger('SistemaPLC', archivo_log='logs/sistema.log')
+        # Modo cola: el ciclo de inspección solo encola; la E/S va en un hilo aparte
+        config_logs = cargar_config_logs('config/plc_config_prueba.json')
+        self.logger = setup_logger('SistemaPLC',
+                                   archivo_log=config_logs.get('archivo', 'logs/sistema.log'),
+                                   modo_cola=config_logs.get('modo_cola', True),
+                                   tamano_cola=config_logs.get('tamano_cola', 10000),
+                                   rotacion=config_logs.get('rotacion'))
         self.logger.info("="*70)
         self.logger.info("INICIANDO SISTEMA PLC-YOLO (DUAL CAM)")
         self.logger.info("="*70)
@@ -46,25 +67,57 @@ class SistemaPLCYOLO:
         # Componentes del sistema
         self.controlador_plc = None
         self.vision_processor = None 
+        self.motor = None
         
         # Estado del sistema
         self.modo_realtime_activo = False
         self.modo_simulacion = self.config.get('sistema', {}).get('modo_simulacion', True)
+        self.intervalo_ui_ms = self.config.get('sistema', {}).get('intervalo_ui_ms', 30)
         
-        # Dos capturas de video
+        # Dos fuentes de video (archivo, USB o cámara IP)
         self.video_cap_sup = None
         self.video_cap_lat = None
-        self.frame_actual_sup = None
-        self.frame_actual_lat = None
+        self._locks_apertura = {'superior': threading.Lock(), 'lateral': threading.Lock()}
         
-        # Dos rutas de modelo
+        # Dos rutas de modelo; se cargan y calientan en segundo plano al elegirlas
         self.modelo_path_sup = None
         self.modelo_path_lat = None
+        self.cargador_modelos = CargadorModelos(self.config, self.logger)
+        self._siguiendo_carga_modelos = False
+        
+        # Diario de inspecciones (opcional): un registro compacto por ciclo
+        self.diario = crear_diario_desde_config(self.config, self.logger)
+        
+        # Trazado por etapa del ciclo (opcional): percentiles + ciclos más lentos
+        self.trazador = crear_trazador_desde_config(self.config, self.logger)
+        
+        # Calibración Y persistida (se reutiliza si coinciden modelo, cámara y resolución)
+        self.almacen_calibracion = crear_almacen_desde_config(self.config, self.logger)
+        self._recalibrar_al_iniciar = False
+        
+        # Perfilado bajo demanda (botón, SIGUSR1 o archivo de control)
+        self.perfilador = crear_perfilador_desde_config(self.config, self.logger)
+        instalar_senal(self.perfilador)
+        
+        # Métricas (opcional): /metrics Prometheus + instantánea JSON
+        self.exportador_metricas = iniciar_exportacion_metricas(self.config, self.logger)
+        
+        # Dashboard web (opcional): mismas vistas vía HTTP para la sala de control
+        self.dashboard = None
+        config_dashboard = self.config.get('dashboard', {})
+        if config_dashboard.get('habilitado', False):
+            self.dashboard = DashboardWeb(config_dashboard, self.logger)
+            if not self.dashboard.iniciar():
+                self.dashboard = None
         
         # UI
         self._crear_interfaz() 
         self._actualizar_estado_ui()
         
+        # cv2/PIL/numpy/ultralytics se importan en segundo plano una vez que la
+        # ventana ya se dibujó (antes se importaban al cargar el módulo)
+        self.root.after(200, lambda: precargar_en_segundo_plano(MODULOS_PRECARGA, self.logger))
+        
         self.logger.info("✅ Sistema inicializado correctamente")
     
     def _cargar_configuracion(self):
@@ -151,6 +204,9 @@ class SistemaPLCYOLO:
                    command=self._cargar_video_lat).pack(fill=tk.X, pady=5)
         self.camara_lat_status_var = tk.StringVar(value="Sin video Lat.")
         ttk.Label(panel_controles, textvariable=self.camara_lat_status_var).pack(anchor=tk.W, pady=2)
+        
+        ttk.Button(panel_controles, text="📡 Conectar Cámaras (config)", 
+                   command=self._conectar_camaras_config).pack(fill=tk.X, pady=5)
 
         ttk.Separator(panel_controles, orient=tk.HORIZONTAL).pack(fill=tk.X, pady=10)
         
@@ -167,6 +223,11 @@ class SistemaPLCYOLO:
         self.btn_detener = ttk.Button(panel_controles, text="⏹️ DETENER", 
                                       command=self._detener_sistema, state=tk.DISABLED)
         self.btn_detener.pack(fill=tk.X, pady=5)
+        ttk.Button(panel_controles, text="🔧 Recalibrar Y", 
+                   command=self._recalibrar_y).pack(fill=tk.X, pady=5)
+        if self.perfilador is not PERFILADOR_NULO:
+            ttk.Button(panel_controles, text=f"🔬 Perfilar {self.perfilador.ciclos_por_defecto} ciclos", 
+                       command=self._perfilar_ciclos).pack(fill=tk.X, pady=5)
         
         # ==================== PANEL CENTRAL (Videos) ====================
         panel_videos = ttk.Frame(self.root)
@@ -182,6 +243,15 @@ class SistemaPLCYOLO:
         self.canvas_video_lat = tk.Canvas(panel_video_lat, bg='black')
         self.canvas_video_lat.pack(fill=tk.BOTH, expand=True)
         
+        # Un renderizador por canvas (reutiliza item de imagen y PhotoImage)
+        fps_display = self.config.get('sistema', {}).get('fps_display', 15)
+        self.renderizadores = {
+            self.canvas_video_sup: RenderizadorCanvas(self.root, self.canvas_video_sup, fps_display, self.logger),
+            self.canvas_video_lat: RenderizadorCanvas(self.root, self.canvas_video_lat, fps_display, self.logger),
+        }
+        for renderizador in self.renderizadores.values():
+            renderizador.iniciar()
+        
         # ==================== PANEL DERECHO (Resultados) ====================
         panel_resultados = ttk.LabelFrame(self.root, text="Logs y Resultados", padding=10)
         panel_resultados.pack(side=tk.RIGHT, fill=tk.Y, padx=10, pady=10)
@@ -193,6 +263,15 @@ class SistemaPLCYOLO:
         scrollbar = ttk.Scrollbar(panel_resultados, command=self.text_resultados.yview)
         scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
         self.text_resultados.config(yscrollcommand=scrollbar.set)
+        
+        # Solo los últimos N resultados, con inserciones agrupadas
+        config_sistema = self.config.get('sistema', {})
+        self.vista_resultados = VistaResultadosAcotada(
+            self.root,
+            self.text_resultados,
+            max_resultados=config_sistema.get('max_resultados_ui', 200),
+            lote_recorte=config_sistema.get('lote_recorte_resultados_ui', 50)
+        )
     
     def _conectar_plc(self):
         """Conecta al PLC"""
@@ -230,51 +309,120 @@ class SistemaPLCYOLO:
         archivo = filedialog.askopenfilename(title="Seleccionar modelo SUPERIOR", filetypes=[("Modelos YOLO", "*.pt")])
         if archivo:
             self.modelo_path_sup = archivo
-            self.modelo_sup_status_var.set(f"✅ {Path(archivo).name}")
-            self._actualizar_estado_ui()
             self.logger.info(f"Ruta modelo Superior: {archivo}")
+            self._precargar_modelo('superior', archivo)
 
     def _cargar_modelo_lat(self):
         archivo = filedialog.askopenfilename(title="Seleccionar modelo LATERAL", filetypes=[("ModelOS YOLO", "*.pt")])
         if archivo:
             self.modelo_path_lat = archivo
-            self.modelo_lat_status_var.set(f"✅ {Path(archivo).name}")
-            self._actualizar_estado_ui()
             self.logger.info(f"Ruta modelo Lateral: {archivo}")
+            self._precargar_modelo('lateral', archivo)
+
+    def _precargar_modelo(self, tipo, ruta):
+        """Carga y calienta el modelo en segundo plano; el avance se ve en la barra de estado"""
+        self.cargador_modelos.cargar(tipo, ruta)
+        if not self._siguiendo_carga_modelos:
+            self._siguiendo_carga_modelos = True
+            self._seguir_carga_modelos()
+
+    def _seguir_carga_modelos(self):
+        """Refleja el avance de la carga de modelos (se reagenda mientras haya cargas en curso)"""
+        estado = self.cargador_modelos.estado()
+        for tipo, status_var in (('superior', self.modelo_sup_status_var), ('lateral', self.modelo_lat_status_var)):
+            e = estado[tipo]
+            if e['ruta']:
+                status_var.set(f"{ICONOS_ETAPA[e['etapa']]} {Path(e['ruta']).name} ({e['etapa']})")
+        if not self.modo_realtime_activo:
+            self.status_var.set(self.cargador_modelos.resumen())
+            self._actualizar_estado_ui()
+        
+        if self.cargador_modelos.en_curso:
+            self.root.after(200, self._seguir_carga_modelos)
+        else:
+            self._siguiendo_carga_modelos = False
+            if self.cargador_modelos.listos() and not self.modo_realtime_activo:
+                self.status_var.set("✅ Modelos listos")
 
     def _cargar_video_sup(self):
         archivo = filedialog.askopenfilename(title="Seleccionar video SUPERIOR", filetypes=[("Archivos de video", "*.mp4 *.avi *.mkv")])
         if archivo:
-            if self.video_cap_sup: self.video_cap_sup.release()
-            self.video_cap_sup = cv2.VideoCapture(archivo)
-            if self.video_cap_sup.isOpened():
-                fps = self.video_cap_sup.get(cv2.CAP_PROP_FPS)
-                self.camara_sup_status_var.set(f"✅ {Path(archivo).name} ({int(fps)} FPS)")
-                self._actualizar_estado_ui()
-                self.logger.info(f"Video Superior cargado: {archivo}")
-                ret, frame = self.video_cap_sup.read()
-                if ret: self._mostrar_frame(frame, self.canvas_video_sup)
-                self.video_cap_sup.set(cv2.CAP_PROP_POS_FRAMES, 0) # Reiniciar
-            else:
-                messagebox.showerror("Error", f"No se pudo abrir el video Superior: {archivo}")
-                self.logger.error(f"❌ No se pudo abrir el video Superior: {archivo}")
+            config_camara = self.config.get('camaras', {}).get('superior', {})
+            self._abrir_fuente('superior', FuenteCamara(archivo, 'superior', config_camara, self.logger))
 
     def _cargar_video_lat(self):
         archivo = filedialog.askopenfilename(title="Seleccionar video LATERAL", filetypes=[("Archivos de video", "*.mp4 *.avi *.mkv")])
         if archivo:
-            if self.video_cap_lat: self.video_cap_lat.release()
-            self.video_cap_lat = cv2.VideoCapture(archivo)
-            if self.video_cap_lat.isOpened():
-                fps = self.video_cap_lat.get(cv2.CAP_PROP_FPS)
-                self.camara_lat_status_var.set(f"✅ {Path(archivo).name} ({int(fps)} FPS)")
-                self._actualizar_estado_ui()
-                self.logger.info(f"Video Lateral cargado: {archivo}")
-                ret, frame = self.video_cap_lat.read()
-                if ret: self._mostrar_frame(frame, self.canvas_video_lat)
-                self.video_cap_lat.set(cv2.CAP_PROP_POS_FRAMES, 0) # Reiniciar
-            else:
-                messagebox.showerror("Error", f"No se pudo abrir el video Lateral: {archivo}")
-                self.logger.error(f"❌ No se pudo abrir el video Lateral: {archivo}")
+            config_camara = self.config.get('camaras', {}).get('lateral', {})
+            self._abrir_fuente('lateral', FuenteCamara(archivo, 'lateral', config_camara, self.logger))
+
+    def _conectar_camaras_config(self):
+        """Abre las cámaras definidas en la sección 'camaras' del JSON (USB o IP)"""
+        fuente_sup = crear_fuente_desde_config(self.config, 'superior', self.logger)
+        fuente_lat = crear_fuente_desde_config(self.config, 'lateral', self.logger)
+        if fuente_sup is None and fuente_lat is None:
+            messagebox.showwarning("Cámaras", "No hay cámaras con 'fuente' definida en la sección 'camaras' del config.")
+            return
+        if fuente_sup: self._abrir_fuente('superior', fuente_sup)
+        if fuente_lat: self._abrir_fuente('lateral', fuente_lat)
+
+    def _abrir_fuente(self, tipo, fuente):
+        """
+        Reemplaza la fuente 'superior' o 'lateral'. Con cámaras IP liberar(),
+        abrir() y el primer leer() pueden tardar varios segundos: corren en un
+        hilo y la interfaz se actualiza en _seguir_apertura_fuente (hilo de Tk).
+        """
+        anterior = self.video_cap_sup if tipo == 'superior' else self.video_cap_lat
+        if tipo == 'superior':
+            self.video_cap_sup = fuente
+        else:
+            self.video_cap_lat = fuente
+        self._variable_estado_camara(tipo).set(f"⏳ {Path(str(fuente.fuente)).name} (conectando...)")
+        self._actualizar_estado_ui()
+
+        apertura = {'fuente': fuente, 'resultado': None}
+
+        def abrir():
+            # Una apertura por cámara a la vez: la siguiente libera esta fuente recién cuando terminó de abrirse
+            with self._locks_apertura[tipo]:
+                if anterior:
+                    anterior.liberar()
+                abierta = fuente.abrir() or fuente.en_vivo
+                frame = None
+                if abierta:
+                    ret, frame = fuente.leer()
+                    frame = frame if ret else None
+                    fuente.reiniciar()
+                apertura['resultado'] = (abierta, frame)
+
+        threading.Thread(target=abrir, name=f"AbrirCamara-{tipo}", daemon=True).start()
+        self.root.after(100, self._seguir_apertura_fuente, tipo, apertura)
+
+    def _seguir_apertura_fuente(self, tipo, apertura):
+        """Espera (sin bloquear Tk) a que termine la apertura y muestra el primer frame"""
+        if apertura['resultado'] is None:
+            self.root.after(100, self._seguir_apertura_fuente, tipo, apertura)
+            return
+        fuente = apertura['fuente']
+        if fuente is not (self.video_cap_sup if tipo == 'superior' else self.video_cap_lat):
+            return  # se eligió otra fuente mientras se abría; esa apertura la libera
+
+        abierta, frame = apertura['resultado']
+        nombre = tipo.capitalize()
+        if abierta:
+            estado = f"{int(fuente.fps)} FPS" if fuente.conectada else "reconectando..."
+            self._variable_estado_camara(tipo).set(f"✅ {Path(str(fuente.fuente)).name} ({estado})")
+            self.logger.info(f"Fuente {nombre} abierta: {fuente.fuente}")
+            if frame is not None:
+                self._mostrar_frame(frame, self.canvas_video_sup if tipo == 'superior' else self.canvas_video_lat)
+        else:
+            self._variable_estado_camara(tipo).set(f"Sin video {nombre[:3]}.")
+            messagebox.showerror("Error", f"No se pudo abrir el video {nombre}: {fuente.fuente}")
+            self.logger.error(f"❌ No se pudo abrir el video {nombre}: {fuente.fuente}")
+        self._actualizar_estado_ui()
+
+    def _variable_estado_camara(self, tipo):
+        return self.camara_sup_status_var if tipo == 'superior' else self.camara_lat_status_var
 
     def _toggle_simulacion(self):
         """Alterna modo simulación"""
@@ -285,9 +433,9 @@ class SistemaPLCYOLO:
     def _actualizar_estado_ui(self):
         """Actualiza botones según estado del sistema"""
         plc_ok = (self.controlador_plc and self.controlador_plc.is_connected) or self.modo_simulacion
-        modelos_ok = self.modelo_path_sup is not None and self.modelo_path_lat is not None
-        videos_ok = (self.video_cap_sup is not None and self.video_cap_sup.isOpened()) and \
-                    (self.video_cap_lat is not None and self.video_cap_lat.isOpened())
+        modelos_ok = self.cargador_modelos.listos()
+        videos_ok = (self.video_cap_sup is not None and self.video_cap_sup.esta_abierta()) and \
+                    (self.video_cap_lat is not None and self.video_cap_lat.esta_abierta())
         
         puede_iniciar = plc_ok and modelos_ok and videos_ok
         
@@ -300,17 +448,27 @@ class SistemaPLCYOLO:
         """Inicia el loop principal del sistema"""
         if self.modo_realtime_activo:
             return
+        if self.motor and self.motor.is_alive():
+            self.logger.warning("⚠️ El motor anterior aún está terminando su ciclo, intente de nuevo.")
+            return
             
         try:
-            self.logger.info("Inicializando VisionProcessor...")
-            self.status_var.set("Cargando modelos...")
-            self.root.update()
+            # Import diferido: normalmente ya lo hizo la precarga en segundo plano
+            from core.vision_processor_prueba import VisionProcessor
             
+            modelos = self.cargador_modelos.modelos()
+            if modelos is None:
+                self.status_var.set(self.cargador_modelos.resumen() or "Modelos no cargados")
+                return
+            
+            # Los modelos ya están cargados y calientes: no hay espera en el hilo de la UI
+            self.logger.info("Inicializando VisionProcessor...")
             self.vision_processor = VisionProcessor(
                 self.config, 
                 self.logger,
                 self.modelo_path_sup,
-                self.modelo_path_lat
+                self.modelo_path_lat,
+                modelos=modelos
             )
             
             if not self.vision_processor.modelos_cargados:
@@ -335,36 +493,34 @@ class SistemaPLCYOLO:
         self.btn_conectar_plc.config(state=tk.DISABLED)
         self.chk_simulacion.config(state=tk.DISABLED)
         
-        self._calibrar_sistema()
-
-    def _calibrar_sistema(self):
-        """Ejecuta la calibración Y (Superior) antes de iniciar el loop"""
-        if not self.video_cap_sup or not self.video_cap_sup.isOpened():
-            self.logger.error("No se puede calibrar, video superior no cargado.")
-            return
-
-        ret, frame_sup_calib = self.video_cap_sup.read()
-        if ret:
-            self.logger.info("🔧 Iniciando calibración Y (Superior)...")
-            self.status_var.set("Calibrando...")
-            self.root.update()
-            
-            self.vision_processor.calibrar_y(frame_sup_calib)
-            
-            self.video_cap_sup.set(cv2.CAP_PROP_POS_FRAMES, 0)
-            self.logger.info(f"Calibración finalizada. Centros Y: {self.vision_processor.X_CENTROS_IDEALES}")
-            self.status_var.set("Calibrado. Iniciando loop...")
-            
-            self._loop_principal()
-        else:
-            self.logger.error("❌ Error: No se pudo leer el primer frame del video Superior para calibración Y.")
-            messagebox.showerror("Error", "No se pudo leer el frame de calibración.")
-            self._detener_sistema()
-
+        # El motor calibra, captura, infiere y responde al PLC en su propio hilo;
+        # la interfaz solo consume su cola de eventos.
+        self.motor = MotorInspeccion(
+            self.config,
+            self.logger,
+            self.vision_processor,
+            self.video_cap_sup,
+            self.video_cap_lat,
+            controlador_plc=None if self.modo_simulacion else self.controlador_plc,
+            modo_simulacion=self.modo_simulacion,
+            diario=self.diario,
+            trazador=self.trazador,
+            perfilador=self.perfilador,
+            almacen_calibracion=self.almacen_calibracion,
+            recalibrar=self._recalibrar_al_iniciar
+        )
+        self._recalibrar_al_iniciar = False
+        if self.dashboard:
+            self.motor.agregar_observador(self.dashboard.observar)
+        self._seq_frames_mostrada = 0
+        self.motor.start()
+        self._consumir_eventos()
     
     def _detener_sistema(self):
         """Detiene el sistema"""
         self.modo_realtime_activo = False
+        if self.motor:
+            self.motor.detener()
         self.btn_iniciar.config(state=tk.NORMAL)
         self.btn_detener.config(state=tk.DISABLED)
         self.status_var.set("Sistema detenido")
@@ -374,159 +530,98 @@ class SistemaPLCYOLO:
             self.btn_conectar_plc.config(state=tk.NORMAL)
         self.chk_simulacion.config(state=tk.NORMAL)
     
-    def _loop_principal(self, delay_inicial=100):
+    def _recalibrar_y(self):
+        """Descarta la calibración guardada y recalibra con el próximo frame Superior"""
+        if self.motor and self.motor.activo:
+            self.motor.solicitar_recalibracion()
+            self.status_var.set("🔧 Recalibrando Y con el próximo frame...")
+        else:
+            self._recalibrar_al_iniciar = True
+            self.status_var.set("🔧 Se recalibrará Y al iniciar")
+        self.logger.info("🔧 Recalibración Y solicitada por el operador")
+    
+    def _perfilar_ciclos(self):
+        """Perfila los próximos N ciclos sin detener el sistema"""
+        if self.perfilador.activo:
+            self.status_var.set("🔬 Ya hay un perfilado en curso")
+            return
+        self.perfilador.solicitar(origen='interfaz')
+        self.status_var.set(f"🔬 Perfilando los próximos {self.perfilador.ciclos_por_defecto} ciclos...")
+    
+    def _consumir_eventos(self):
         """
-        Loop principal del sistema. Se reagenda siempre al final.
-        Solo lee frames y procesa si 'self.modo_realtime_activo' es True.
+        Consume los eventos del motor de inspección y renderiza.
+        Se reagenda mientras el motor tenga eventos pendientes o siga vivo.
+        Nunca bloquea: el PLC se atiende en el hilo del motor.
         """
-        delay_siguiente = delay_inicial # Delay por defecto para monitoreo o inactividad
+        motor = self.motor
+        if motor is None:
+            return
 
+        mostro_resultado = False
         try:
-            # --- CÓDIGO ACTIVO (Lectura y Procesamiento) ---
-            if self.modo_realtime_activo:
+            while True:
+                try:
+                    evento = motor.eventos.get_nowait()
+                except queue.Empty:
+                    break
                 
-                # 1. Capturar frames (SOLO SE EJECUTA SI EL SISTEMA ESTÁ ACTIVO)
-                ret_sup, frame_sup = self.video_cap_sup.read()
-                ret_lat, frame_lat = self.video_cap_lat.read()
-
-                # Manejar fin de video
-                if not ret_sup or not ret_lat:
-                    self.logger.info("🎬 Fin de simulación: Uno o ambos videos terminaron o fallaron la lectura.")
-                    self._detener_sistema() # Esto pone modo_realtime_activo=False
-                    
-                    # ... (código del messagebox) ...
-                    if not ret_sup and not ret_lat:
-                        msg = "Ambos videos terminaron."
-                    elif not ret_sup:
-                        msg = "Video Superior terminó/falló."
+                tipo = evento['tipo']
+                if tipo == 'estado':
+                    if self.modo_realtime_activo:
+                        self.status_var.set(evento['mensaje'])
+                elif tipo == 'calibrado':
+                    if not evento['ok']:
+                        self.status_var.set(f"⚠️ Calibración Y fallida: {evento['motivo']}" if evento.get('motivo')
+                                            else "⚠️ Calibración Y fallida")
+                    elif evento.get('origen') == 'deriva':
+                        self.status_var.set(f"📐 Calibración Y actualizada por deriva (residuo RMS {evento['residuo_rms_px']} px)")
+                    elif evento.get('origen') == 'guardada':
+                        self.status_var.set("♻️ Calibración Y recuperada. Iniciando loop...")
+                    elif evento.get('residuo_rms_px') is not None:
+                        self.status_var.set(f"Calibrado (residuo RMS {evento['residuo_rms_px']} px). Iniciando loop...")
                     else:
-                        msg = "Video Lateral terminó/falló."
-                    messagebox.showinfo("Fin de Simulación", f"{msg} Deteniendo sistema.")
-                    
-                    # Salir de la parte activa. El re-agendamiento ocurrirá al final.
-                    return 
-                    
-                self.frame_actual_sup = frame_sup.copy()
-                self.frame_actual_lat = frame_lat.copy()
-
-                # Mostrar frames *originales*
-                self._mostrar_frame(self.frame_actual_sup, self.canvas_video_sup)
-                self._mostrar_frame(self.frame_actual_lat, self.canvas_video_lat)
-
-                # 2. Consultar PLC (o simular)
-                procesar = False
-                if self.modo_simulacion:
-                    procesar = True
-                    # Usar el delay largo de simulación
-                    delay_siguiente = self.config.get('sistema', {}).get('delay_simulacion_ms', 500)
-                elif self.controlador_plc and self.controlador_plc.is_connected:
-                    procesar = self.controlador_plc.leer_solicitud_inspeccion()
-                    log_estado_plc(self.controlador_plc, self.logger, procesar)
-                    # Usar el delay rápido de lectura de PLC
-                    delay_siguiente = self.config.get('sistema', {}).get('delay_lectura_plc_ms', 100)
-                
-                # 3. Procesar si hay solicitud
-                if procesar:
-                    self.status_var.set("🔄 Procesando solicitud...")
-                    self.root.update()
-                    
-                    if not self.vision_processor:
-                         self.logger.error("Error crítico: VisionProcessor no inicializado.")
-                         self._detener_sistema()
-                         return
-
-                    resultado = self.vision_processor.procesar_frames_dual(
-                        self.frame_actual_sup,
-                        self.frame_actual_lat
-                    )
-                    
-                    # *** LÓGICA DE DETENCIÓN POR ERROR DE VISIÓN (PARADA CRÍTICA) ***
-                    if resultado['codigo_respuesta_plc'] == self.vision_processor.CODIGO_PARADA: # Asumiendo que CODIGO_PARADA = 2
-                        self.logger.error("🚨 PARADA CRÍTICA DETECTADA POR VISION. Deteniendo sistema.")
-                        self._detener_sistema() 
-                        messagebox.showwarning("Parada de Emergencia", "Parada crítica detectada. Sistema detenido.")
-                        # No es necesario el `return` aquí, el próximo ciclo lo gestionará, 
-                        # pero actualizaremos el delay para no spamear.
-                        delay_siguiente = 5000 
-                    
-                    # ... (el resto del código de procesamiento) ...
-                    
-                    valido, advertencias = self.vision_processor.validar_resultado(resultado)
-                    if advertencias:
-                        for adv in advertencias:
-                            self.logger.warning(adv)
-                    
-                    log_resultado_procesamiento(resultado, self.logger)
-                    
-                    # Mostrar en UI (Frames anotados y logs)
+                        self.status_var.set("Calibrado. Iniciando loop...")
+                elif tipo == 'resultado':
+                    resultado = evento['resultado']
                     self._mostrar_frame(resultado['annotated_sup'], self.canvas_video_sup)
                     self._mostrar_frame(resultado['annotated_lat'], self.canvas_video_lat)
                     self._mostrar_resultado(resultado)
-                    
-                    # Enviar a PLC
-                    if not self.modo_simulacion and self.controlador_plc:
-                        codigo_respuesta_final = resultado['codigo_respuesta_plc']
-                        exito_escritura = self.controlador_plc.escribir_resultados(
-                            desviacion_y_mm=resultado['desviacion_y_mm'], 
-                            num_filas=resultado['filas'], 
-                            correccion_z_mm=resultado['correccion_z_mm_final'],
-                            codigo_respuesta=codigo_respuesta_final
-                        )
-                        
-                        if not exito_escritura:
-                            self.logger.error("❌ FALLO AL ESCRIBIR EN PLC")
-                            self.plc_status_var.set("❌ Error Escritura")
-                            self.plc_status_label.config(foreground='red')
-                    
-                    # Usar delay largo después de un proceso exitoso
-                    if self.modo_simulacion or resultado['codigo_respuesta_plc'] != self.vision_processor.CODIGO_PARADA:
-                        delay_siguiente = self.config.get('sistema', {}).get('delay_post_proceso_ms', 500)
-            
-            # 4. Siguiente iteración (SIEMPRE se re-agendará)
-            self.root.after(delay_siguiente, self._loop_principal)
-                
+                    mostro_resultado = True
+                elif tipo == 'escritura_fallida':
+                    self.plc_status_var.set("❌ Error Escritura")
+                    self.plc_status_label.config(foreground='red')
+                elif tipo == 'parada':
+                    self._detener_sistema()
+                    messagebox.showwarning("Parada de Emergencia", "Parada crítica detectada. Sistema detenido.")
+                elif tipo == 'fin':
+                    self._detener_sistema()
+                    messagebox.showinfo("Fin de Simulación", f"{evento['mensaje']} Deteniendo sistema.")
+                elif tipo == 'error':
+                    self._detener_sistema()
+                    messagebox.showerror("Error de Ejecución", f"Error fatal en el sistema: {evento['mensaje']}")
+
+            # Frames *originales* (solo si en este tick no se mostró un resultado anotado)
+            seq, frame_sup, frame_lat = motor.obtener_frames()
+            if seq != self._seq_frames_mostrada:
+                self._seq_frames_mostrada = seq
+                if not mostro_resultado and frame_sup is not None:
+                    self._mostrar_frame(frame_sup, self.canvas_video_sup)
+                    self._mostrar_frame(frame_lat, self.canvas_video_lat)
+
         except Exception as e:
-            self.logger.error(f"❌ Error fatal en loop principal: {e}", exc_info=True)
-            self._detener_sistema()
-            messagebox.showerror("Error de Ejecución", f"Error fatal en el sistema: {e}")
-            # No re-agendamos aquí, pues la aplicación puede estar inestable.
+            self.logger.error(f"❌ Error mostrando resultados: {e}", exc_info=True)
+
+        if motor.is_alive() or not motor.eventos.empty():
+            self.root.after(self.intervalo_ui_ms, self._consumir_eventos)
         
     def _mostrar_frame(self, frame, canvas):
-        """Muestra frame en un canvas específico, redimensionando"""
-        try:
-            canvas_width = canvas.winfo_width()
-            canvas_height = canvas.winfo_height()
-
-            if canvas_width < 10 or canvas_height < 10:
-                canvas_width, canvas_height = 640, 480 # Default
-                
-            frame_rgb = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
-            
-            h, w, _ = frame_rgb.shape
-            ratio = min(canvas_width / w, canvas_height / h)
-            new_w, new_h = int(w * ratio), int(h * ratio)
-            
-            if new_w <= 0 or new_h <= 0: return
-            
-            frame_resized = cv2.resize(frame_rgb, (new_w, new_h), interpolation=cv2.INTER_AREA)
-            
-            imagen = Image.fromarray(frame_resized)
-            imagen_tk = ImageTk.PhotoImage(imagen)
-            
-            canvas.delete("all")
-            x_offset = (canvas_width - new_w) // 2
-            y_offset = (canvas_height - new_h) // 2
-            
-            canvas.create_image(x_offset, y_offset, anchor=tk.NW, image=imagen_tk)
-            
-            # Mantener referencia para evitar que sea eliminado por el recolector de basura (garbage collector)
-            if canvas == self.canvas_video_sup:
-                self.canvas_video_sup.image = imagen_tk
-            else:
-                self.canvas_video_lat.image = imagen_tk
-                
-        except Exception as e:
-            self.logger.warning(f"⚠️ Error al mostrar frame: {e} (Canvas: {canvas})")
+        """
+        Publica el frame para el renderizador del canvas.
+        El dibujado ocurre en el tick propio del renderizador (FPS objetivo);
+        si llegan varios frames entre ticks solo se dibuja el último.
+        """
+        self.renderizadores[canvas].publicar(frame)
 
     
     def _mostrar_resultado(self, resultado):
@@ -563,25 +658,36 @@ class SistemaPLCYOLO:
         texto += f"  • Corrección Z (D712): {resultado.get('correccion_z_mm_final', 0.00):.2f} mm\n" 
         texto += f"  • Log Z: {resultado.get('log_z', 'N/A')}\n"
 
-        self.text_resultados.insert(tk.END, texto)
-        self.text_resultados.see(tk.END)
+        self.vista_resultados.agregar(texto)
     
     def cerrar(self):
         """Limpia recursos al cerrar"""
         self.logger.info("Iniciando cierre del sistema...")
         self._detener_sistema()
+        if self.motor:
+            self.motor.join(timeout=5.0)
         
         if self.video_cap_sup:
-            self.logger.info("Liberando video Superior...")
-            self.video_cap_sup.release()
+            self.logger.info(f"Liberando video Superior... {self.video_cap_sup.estadisticas()}")
+            self.video_cap_sup.liberar()
         if self.video_cap_lat:
-            self.logger.info("Liberando video Lateral...")
-            self.video_cap_lat.release()
+            self.logger.info(f"Liberando video Lateral... {self.video_cap_lat.estadisticas()}")
+            self.video_cap_lat.liberar()
         
         if self.controlador_plc:
             self.logger.info("Desconectando PLC...")
             self.controlador_plc.desconectar()
         
+        if self.dashboard:
+            self.dashboard.detener()
+        if self.exportador_metricas:
+            self.exportador_metricas.detener()
+        if self.diario:
+            self.diario.cerrar()
+        self.trazador.volcar(self.config.get('trazado', {}).get('archivo', 'logs/traza_ciclos.json'))
+        self.perfilador.detener()
+        self.cargador_modelos.detener()
+        
         self.logger.info("👋 Sistema cerrado")
         self.root.destroy()
 
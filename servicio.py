@@ -0,0 +1,289 @@
+"""
+Sistema Integrado PLC-YOLO - Servicio de producción SIN interfaz gráfica
+Punto de entrada headless: PLCController + VisionProcessor + MotorInspeccion
+(sin Tkinter, sin ventanas de OpenCV y sin PIL)
+
+Uso:
+    python servicio.py --config config/plc_config_prueba.json
+    python servicio.py --simulacion --modelo-sup bestCS.pt --modelo-lat bestPruebaCL.pt
+"""
+
+import argparse
+import json
+import logging
+import queue
+import signal
+import sys
+import threading
+from pathlib import Path
+
+from core.plc_controller import PLCController
+from core.camera_source import crear_fuente_desde_config
+from core.inspection_engine import MotorInspeccion
+from core.model_loader import CargadorModelos
+from core.calibration_store import crear_almacen_desde_config
+from utils.logger_prueba import setup_logger
+from utils.web_dashboard import DashboardWeb
+from utils.metrics import iniciar_exportacion_metricas
+from utils.inspection_journal import crear_diario_desde_config
+from utils.tracing import crear_trazador_desde_config
+from utils.profiler import crear_perfilador_desde_config, instalar_senal
+
+
+# Códigos de salida del proceso (para el gestor de servicios)
+SALIDA_OK = 0
+SALIDA_ERROR_INICIO = 1
+SALIDA_PARADA = 2
+SALIDA_ERROR_EJECUCION = 3
+
+
+class ServicioPLCYOLO:
+    """
+    Servicio headless de inspección.
+
+    Responsabilidades:
+    - Cargar configuración y modelos, abrir cámaras y conectar el PLC
+    - Ejecutar el MotorInspeccion y consumir sus eventos
+    - Reconectar el PLC si se pierde la conexión
+    - Terminar limpio ante SIGINT/SIGTERM (Ctrl+C, systemd stop, sc stop)
+    """
+
+    def __init__(self, config: dict, args: argparse.Namespace, logger: logging.Logger):
+        self.config = config
+        self.config_servicio = config.get('servicio', {})
+        self.logger = logger
+
+        self.modo_simulacion = args.simulacion or config.get('sistema', {}).get('modo_simulacion', False)
+        self.modelo_path_sup = args.modelo_sup or self.config_servicio.get('modelo_sup')
+        self.modelo_path_lat = args.modelo_lat or self.config_servicio.get('modelo_lat')
+        self.config_plc = args.config_plc or self.config_servicio.get('config_plc', 'config/plc_config.json')
+        self.reanudar_tras_parada_s = self.config_servicio.get('reanudar_tras_parada_s')
+        self.intervalo_reconexion_plc_s = self.config_servicio.get('intervalo_reconexion_plc_s', 5.0)
+
+        # Sin interfaz no se necesitan frames anotados (results.plot() es costoso)
+        if not args.anotaciones:
+            self.config.setdefault('vision', {})['generar_anotaciones'] = False
+
+        self.controlador_plc = None
+        self.vision_processor = None
+        self.fuente_sup = None
+        self.fuente_lat = None
+        self.motor = None
+        self.dashboard = None
+        self.exportador_metricas = None
+        self.diario = None
+        self.trazador = crear_trazador_desde_config(config, logger)
+        self.almacen_calibracion = crear_almacen_desde_config(config, logger)
+        self.recalibrar = args.recalibrar
+        self.perfilador = crear_perfilador_desde_config(config, logger)
+        self._detener = threading.Event()
+
+    def detener(self, *_):
+        """Handler de señales: pide terminar al final del ciclo actual"""
+        if not self._detener.is_set():
+            self.logger.info("🛑 Señal de parada recibida, terminando servicio...")
+        self._detener.set()
+        if self.motor:
+            self.motor.detener()
+
+    # ==================== INICIO ====================
+
+    def iniciar(self) -> bool:
+        """Prepara todos los componentes. Retorna False si alguno falla."""
+        if not self.modelo_path_sup or not self.modelo_path_lat:
+            self.logger.error("❌ Faltan rutas de modelos ('servicio.modelo_sup'/'modelo_lat' o --modelo-sup/--modelo-lat)")
+            return False
+
+        # Los modelos cargan y se calientan en paralelo mientras se abren cámaras y PLC
+        cargador = CargadorModelos(self.config, self.logger)
+        cargador.cargar('superior', self.modelo_path_sup)
+        cargador.cargar('lateral', self.modelo_path_lat)
+
+        self.fuente_sup = crear_fuente_desde_config(self.config, 'superior', self.logger)
+        self.fuente_lat = crear_fuente_desde_config(self.config, 'lateral', self.logger)
+        if self.fuente_sup is None or self.fuente_lat is None:
+            self.logger.error("❌ Faltan fuentes de video en la sección 'camaras' del config")
+            return False
+        if not (self.fuente_sup.abrir() or self.fuente_sup.en_vivo) or \
+           not (self.fuente_lat.abrir() or self.fuente_lat.en_vivo):
+            self.logger.error("❌ No se pudieron abrir las fuentes de video")
+            return False
+
+        if not self.modo_simulacion:
+            self.controlador_plc = PLCController(self.config_plc)
+            if not self.controlador_plc.conectar():
+                self.logger.warning("⚠️ PLC no disponible, se reintentará en segundo plano")
+
+        from core.vision_processor_prueba import VisionProcessor
+
+        self.logger.info("Inicializando VisionProcessor...")
+        if not cargador.esperar():
+            self.logger.error(f"❌ {cargador.resumen()}")
+            return False
+        self.vision_processor = VisionProcessor(self.config, self.logger,
+                                                self.modelo_path_sup, self.modelo_path_lat,
+                                                modelos=cargador.modelos())
+        cargador.detener()
+        if not self.vision_processor.modelos_cargados:
+            self.logger.error("❌ Fallo al cargar modelos en VisionProcessor.")
+            return False
+
+        config_dashboard = self.config.get('dashboard', {})
+        if config_dashboard.get('habilitado', False):
+            self.dashboard = DashboardWeb(config_dashboard, self.logger)
+            if not self.dashboard.iniciar():
+                self.dashboard = None
+        self.exportador_metricas = iniciar_exportacion_metricas(self.config, self.logger)
+        self.diario = crear_diario_desde_config(self.config, self.logger)
+        return True
+
+    def _crear_motor(self) -> MotorInspeccion:
+        motor = MotorInspeccion(
+            self.config,
+            self.logger,
+            self.vision_processor,
+            self.fuente_sup,
+            self.fuente_lat,
+            controlador_plc=self.controlador_plc,
+            modo_simulacion=self.modo_simulacion,
+            diario=self.diario,
+            trazador=self.trazador,
+            perfilador=self.perfilador,
+            almacen_calibracion=self.almacen_calibracion,
+            recalibrar=self.recalibrar
+        )
+        self.recalibrar = False  # solo el primer arranque ignora la calibración guardada
+        if self.dashboard:
+            motor.agregar_observador(self.dashboard.observar)
+        return motor
+
+    # ==================== EJECUCIÓN ====================
+
+    def ejecutar(self) -> int:
+        """Bucle del servicio. Retorna el código de salida del proceso."""
+        codigo_salida = SALIDA_OK
+        self.motor = self._crear_motor()
+        self.motor.start()
+        self.logger.info(f"🚀 Servicio iniciado (simulación={self.modo_simulacion})")
+
+        while not self._detener.is_set():
+            try:
+                evento = self.motor.eventos.get(timeout=self.intervalo_reconexion_plc_s)
+            except queue.Empty:
+                evento = None
+
+            if evento is None:
+                self._verificar_plc()
+                if not self.motor.is_alive() and self.motor.eventos.empty():
+                    break
+                continue
+
+            tipo = evento['tipo']
+            if tipo == 'estado':
+                self.logger.debug(evento['mensaje'])
+            elif tipo == 'fin':
+                self.logger.info(f"🎬 {evento['mensaje']}")
+                break
+            elif tipo == 'error':
+                codigo_salida = SALIDA_ERROR_EJECUCION
+                break
+            elif tipo == 'parada':
+                if self.reanudar_tras_parada_s is None:
+                    codigo_salida = SALIDA_PARADA
+                    break
+                self.logger.warning(f"⏸️ Parada crítica: reanudando en {self.reanudar_tras_parada_s} s")
+                self.motor.join()
+                if self._detener.wait(self.reanudar_tras_parada_s):
+                    break
+                self.motor = self._crear_motor()
+                self.motor.start()
+
+        return codigo_salida
+
+    def _verificar_plc(self) -> None:
+        """Pide al motor que reintente la conexión PLC si se perdió (la conexión es del hilo del motor)"""
+        if self.controlador_plc and not self.controlador_plc.is_connected:
+            self.logger.warning("🔌 PLC desconectado, reintentando conexión...")
+            self.motor.solicitar_reconexion_plc()
+
+    def cerrar(self) -> None:
+        """Libera recursos"""
+        if self.motor:
+            self.motor.detener()
+            self.motor.join(timeout=10.0)
+        for fuente in (self.fuente_sup, self.fuente_lat):
+            if fuente:
+                self.logger.info(f"Liberando fuente {fuente.nombre}... {fuente.estadisticas()}")
+                fuente.liberar()
+        if self.controlador_plc:
+            self.controlador_plc.desconectar()
+        if self.dashboard:
+            self.dashboard.detener()
+        if self.exportador_metricas:
+            self.exportador_metricas.detener()
+        if self.diario:
+            self.diario.cerrar()
+        self.trazador.volcar(self.config.get('trazado', {}).get('archivo', 'logs/traza_ciclos.json'))
+        self.perfilador.detener()
+        self.logger.info("👋 Servicio cerrado")
+
+
+def _parsear_argumentos(argv=None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Servicio headless PLC-YOLO (Dual Cam)")
+    parser.add_argument('--config', default='config/plc_config_prueba.json',
+                        help="Archivo de configuración JSON (secciones vision, camaras, sistema, servicio)")
+    parser.add_argument('--config-plc', default=None,
+                        help="Configuración del PLCController (por defecto 'servicio.config_plc')")
+    parser.add_argument('--modelo-sup', default=None, help="Modelo .pt Superior")
+    parser.add_argument('--modelo-lat', default=None, help="Modelo .pt Lateral")
+    parser.add_argument('--simulacion', action='store_true', help="Procesar sin PLC")
+    parser.add_argument('--anotaciones', action='store_true', help="Generar frames anotados")
+    parser.add_argument('--recalibrar', action='store_true',
+                        help="Ignorar la calibración Y guardada y recalibrar con el primer frame")
+    parser.add_argument('--log', default=None, help="Archivo de log (por defecto 'servicio.archivo_log')")
+    parser.add_argument('--nivel-log', default='INFO', choices=['DEBUG', 'INFO', 'WARNING', 'ERROR'])
+    return parser.parse_args(argv)
+
+
+def main(argv=None) -> int:
+    args = _parsear_argumentos(argv)
+
+    try:
+        with open(args.config, 'r', encoding='utf-8') as f:
+            config = json.load(f)
+    except (OSError, json.JSONDecodeError) as e:
+        print(f"❌ CRÍTICO: No se pudo cargar {args.config}: {e}")
+        return SALIDA_ERROR_INICIO
+
+    archivo_log = args.log or config.get('servicio', {}).get('archivo_log', 'logs/servicio.log')
+    Path(archivo_log).parent.mkdir(parents=True, exist_ok=True)
+    config_logs = config.get('logs', {})
+    logger = setup_logger('ServicioPLC', nivel=getattr(logging, args.nivel_log),
+                          archivo_log=archivo_log,
+                          modo_cola=config_logs.get('modo_cola', True),
+                          tamano_cola=config_logs.get('tamano_cola', 10000),
+                          rotacion=config_logs.get('rotacion'))
+    logger.info("=" * 70)
+    logger.info("INICIANDO SERVICIO PLC-YOLO (HEADLESS)")
+    logger.info("=" * 70)
+
+    servicio = ServicioPLCYOLO(config, args, logger)
+    signal.signal(signal.SIGINT, servicio.detener)
+    signal.signal(signal.SIGTERM, servicio.detener)
+    if hasattr(signal, 'SIGBREAK'):  # Ctrl+Break en Windows
+        signal.signal(signal.SIGBREAK, servicio.detener)
+    instalar_senal(servicio.perfilador)  # kill -USR1 <pid>: perfilar los próximos N ciclos
+
+    try:
+        if not servicio.iniciar():
+            return SALIDA_ERROR_INICIO
+        return servicio.ejecutar()
+    except Exception as e:
+        logger.error(f"❌ Error fatal en servicio: {e}", exc_info=True)
+        return SALIDA_ERROR_EJECUCION
+    finally:
+        servicio.cerrar()
+
+
+if __name__ == "__main__":
+    sys.exit(main())
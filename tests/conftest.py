@@ -0,0 +1,106 @@
+import copy
+import json
+import sys
+from pathlib import Path
+
+import pytest
+
+RAIZ_PROYECTO = Path(__file__).resolve().parent.parent
+if str(RAIZ_PROYECTO) not in sys.path:
+    sys.path.insert(0, str(RAIZ_PROYECTO))
+
+import cv2
+import numpy as np
+
+from core.stub_detector import Caja, Resultado
+from core.vision_processor_prueba import VisionProcessor
+
+RUTA_CONFIG = RAIZ_PROYECTO / 'config' / 'plc_config_prueba.json'
+
+# Clases de cada modelo (mismos índices que los pesos .pt)
+NOMBRES_MODELO = {
+    'superior': {0: 'posicion_columna', 1: 'posicion_vacia', 2: 'error_apilado'},
+    'lateral': {0: 'referencia_fija', 1: 'borde_envase', 2: 'mitad_envase', 3: 'error_caido', 4: 'tapa'},
+}
+
+# Color de relleno de cada clase en las escenas sintéticas (único por clase)
+COLORES_CLASE = {
+    'posicion_columna': (0, 255, 0),
+    'posicion_vacia': (128, 128, 128),
+    'error_apilado': (0, 0, 255),
+    'referencia_fija': (255, 0, 0),
+    'borde_envase': (0, 255, 255),
+    'mitad_envase': (255, 0, 255),
+    'error_caido': (255, 255, 0),
+    'tapa': (0, 128, 255),
+}
+
+
+class ModeloPorColor:
+    """
+    Modelo falso: una caja por rectángulo de color de alguna de sus clases.
+    Con 'imgsz' reescala la imagen como YOLO y devuelve las cajas en
+    coordenadas del 'source' (funciona también sobre recortes).
+    """
+
+    def __init__(self, nombres, area_minima: int = 2):
+        self.names = nombres
+        self.area_minima = area_minima
+        self.llamadas = []  # (forma (alto, ancho) del source, imgsz)
+
+    def predict(self, source=None, conf=0.25, verbose=False, imgsz=None, **kwargs):
+        self.llamadas.append((source.shape[:2], imgsz))
+        escala, imagen = 1.0, source
+        if imgsz:
+            escala = imgsz / max(source.shape[:2])
+            imagen = cv2.resize(source, None, fx=escala, fy=escala, interpolation=cv2.INTER_NEAREST)
+        cajas = []
+        for clase, nombre in self.names.items():
+            color = np.array(COLORES_CLASE[nombre])
+            _, _, stats, _ = cv2.connectedComponentsWithStats(cv2.inRange(imagen, color, color))
+            for x, y, ancho, alto, area in stats[1:]:
+                if area >= self.area_minima:
+                    cajas.append(Caja(clase, 0.9, x / escala, y / escala, (x + ancho) / escala, (y + alto) / escala))
+        return [Resultado(source, cajas, self.names)]
+
+
+@pytest.fixture
+def modelo_por_color():
+    """Fábrica de ModeloPorColor: modelo_por_color('superior' | 'lateral', area_minima=2)"""
+    def crear(tipo: str, area_minima: int = 2) -> ModeloPorColor:
+        return ModeloPorColor(NOMBRES_MODELO[tipo], area_minima)
+    return crear
+
+
+@pytest.fixture
+def escena():
+    """Frame 1280x720 negro con un rectángulo por (clase, x1, y1, x2, y2)"""
+    def crear(*cajas) -> np.ndarray:
+        frame = np.zeros((720, 1280, 3), dtype=np.uint8)
+        for nombre, x1, y1, x2, y2 in cajas:
+            cv2.rectangle(frame, (x1, y1), (x2, y2), COLORES_CLASE[nombre], -1)
+        return frame
+    return crear
+
+
+@pytest.fixture
+def config_prueba():
+    """config/plc_config_prueba.json sin anotaciones (una copia por prueba, se puede modificar)"""
+    with open(RUTA_CONFIG, 'r', encoding='utf-8') as f:
+        config = json.load(f)
+    config['vision']['generar_anotaciones'] = False
+    return config
+
+
+@pytest.fixture
+def crear_procesador(config_prueba):
+    """
+    Fábrica de VisionProcessor con modelos inyectados:
+    crear_procesador(modelo_sup, modelo_lat, **secciones) reemplaza las
+    secciones indicadas de 'vision' en una copia de config_prueba.
+    """
+    def crear(modelo_sup, modelo_lat, **secciones) -> VisionProcessor:
+        config = copy.deepcopy(config_prueba)
+        config['vision'].update(secciones)
+        return VisionProcessor(config, None, 'sup.pt', 'lat.pt', modelos=(modelo_sup, modelo_lat))
+    return crear
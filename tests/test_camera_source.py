@@ -0,0 +1,168 @@
+"""Pruebas de FuenteCamara con un archivo corto en modo 'simular_tiempo_real'"""
+
+import threading
+import time
+
+import cv2
+import numpy as np
+import pytest
+
+from core.camera_source import FuenteCamara
+
+PASO_GRIS = 4  # el frame i se pinta con gris i * PASO_GRIS (sobrevive a la compresión MJPG)
+
+
+def crear_video(ruta, frames: int, fps: float) -> str:
+    escritor = cv2.VideoWriter(str(ruta), cv2.VideoWriter_fourcc(*'MJPG'), fps, (64, 48))
+    if not escritor.isOpened():
+        pytest.skip("OpenCV sin codificador MJPG")
+    for i in range(frames):
+        escritor.write(np.full((48, 64, 3), i * PASO_GRIS, dtype=np.uint8))
+    escritor.release()
+    return str(ruta)
+
+
+def indice(frame) -> int:
+    return int(round(float(frame.mean()) / PASO_GRIS))
+
+
+def esperar(condicion, timeout_s: float = 3.0) -> bool:
+    limite = time.monotonic() + timeout_s
+    while time.monotonic() < limite:
+        if condicion():
+            return True
+        time.sleep(0.01)
+    return condicion()
+
+
+@pytest.fixture
+def fuente_tiempo_real(tmp_path):
+    fuentes = []
+
+    def crear(frames: int = 30, fps: float = 30.0, **config):
+        ruta = crear_video(tmp_path / 'video.avi', frames, fps)
+        config = {'simular_tiempo_real': True, 'timeout_lectura_s': 1.0, **config}
+        fuente = FuenteCamara(ruta, 'prueba', config)
+        fuentes.append(fuente)
+        return fuente
+
+    yield crear
+    for fuente in fuentes:
+        fuente.liberar()
+
+
+def test_entrega_solo_el_frame_mas_reciente(fuente_tiempo_real):
+    camara = fuente_tiempo_real(frames=30, fps=30.0)
+    assert camara.abrir()
+    assert camara.en_vivo
+
+    time.sleep(0.3)  # consumidor atrasado: la cámara sigue leyendo
+    ok, frame = camara.leer()
+    assert ok
+    leidos = camara.frames_leidos
+    assert leidos >= 5
+    assert indice(frame) == leidos - 1  # el último leído, no el primero
+
+    ok, siguiente = camara.leer()
+    assert ok
+    assert indice(siguiente) > indice(frame)  # nunca repite un frame ya entregado
+
+
+def test_contadores_de_descarte(fuente_tiempo_real):
+    camara = fuente_tiempo_real(frames=60, fps=30.0)
+    assert camara.abrir()
+
+    for _ in range(5):
+        ok, _frame = camara.leer()
+        assert ok
+        time.sleep(0.1)  # ~3 frames nuevos por lectura
+
+    with camara._cond:
+        stats = camara.estadisticas()
+        pendiente = 1 if camara._seq > camara._seq_consumido else 0
+    assert stats['frames_entregados'] == 5
+    assert stats['frames_descartados'] > 0
+    # cada frame leído se entregó, se reemplazó sin consumir o es el pendiente
+    assert stats['frames_leidos'] == stats['frames_entregados'] + stats['frames_descartados'] + pendiente
+
+
+def test_fin_de_archivo_reconecta(fuente_tiempo_real):
+    camara = fuente_tiempo_real(frames=10, fps=50.0, reconexion_inicial_s=0.05)
+    assert camara.abrir()
+
+    assert esperar(lambda: camara.reconexiones >= 1)
+    assert camara.lecturas_fallidas >= 1
+
+    # tras reconectar vuelve a entregar desde el principio del archivo
+    assert esperar(lambda: camara.conectada)
+    ok, frame = camara.leer()
+    assert ok and frame is not None
+
+
+def test_reconexion_con_backoff_exponencial(tmp_path, monkeypatch):
+    camara = FuenteCamara(str(tmp_path / 'no_existe.avi'), 'prueba',
+                          {'simular_tiempo_real': True, 'reconexion_inicial_s': 0.05, 'reconexion_max_s': 0.2})
+    intentos = []
+    crear_captura = camara._crear_captura
+
+    def crear_captura_contando():
+        intentos.append(time.monotonic())
+        return crear_captura()
+
+    monkeypatch.setattr(camara, '_crear_captura', crear_captura_contando)
+    try:
+        assert not camara.abrir()  # no hay archivo, pero el hilo sigue reintentando
+        assert camara.esta_abierta()
+        assert esperar(lambda: len(intentos) >= 6)
+    finally:
+        camara.liberar()
+
+    esperas = np.diff(intentos[:6])  # intentos[0] es la apertura inicial
+    np.testing.assert_allclose(esperas, [0.05, 0.1, 0.2, 0.2, 0.2], atol=0.04)
+    assert camara.reconexiones == 0
+
+
+class _CapturaBloqueada:
+    """Captura cuyo read() queda bloqueado hasta 'soltar'"""
+
+    def __init__(self):
+        self.soltar = threading.Event()
+        self.en_lectura = threading.Event()
+        self.liberaciones = 0
+
+    def isOpened(self):
+        return True
+
+    def get(self, _prop):
+        return 100.0
+
+    def set(self, _prop, _valor):
+        return True
+
+    def read(self):
+        self.en_lectura.set()
+        self.soltar.wait(5.0)
+        if self.liberaciones:
+            raise AssertionError("read() sobre una captura liberada")
+        return False, None
+
+    def release(self):
+        self.liberaciones += 1
+
+
+def test_liberar_no_libera_con_el_lector_bloqueado(monkeypatch):
+    captura = _CapturaBloqueada()
+    camara = FuenteCamara('archivo.avi', 'prueba', {'simular_tiempo_real': True, 'timeout_lectura_s': 0.05})
+    monkeypatch.setattr(camara, '_crear_captura', lambda: captura)
+    assert camara.abrir()
+    assert captura.en_lectura.wait(2.0)
+
+    hilo = camara._hilo
+    camara.liberar()  # el join vence con el hilo dentro de read()
+    assert hilo.is_alive()
+    assert captura.liberaciones == 0
+
+    captura.soltar.set()
+    hilo.join(2.0)
+    assert not hilo.is_alive()
+    assert captura.liberaciones == 1
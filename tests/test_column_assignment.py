@@ -0,0 +1,68 @@
+"""Pruebas de asignar_columnas: uno a uno, desempate y compuerta"""
+
+import numpy as np
+
+from core.column_assignment import COLUMNA_DESCONOCIDA, COLUMNA_PRODUCTO, COLUMNA_VACIA, asignar_columnas
+
+IDEALES = np.array([100.0, 250.0, 400.0, 550.0])
+COMPUERTA = 75.0  # medio paso
+
+P, V, D = COLUMNA_PRODUCTO, COLUMNA_VACIA, COLUMNA_DESCONOCIDA
+
+
+def asignar(x, estados, ideales=IDEALES, compuerta=COMPUERTA):
+    return asignar_columnas(np.asarray(x, dtype=np.float64), np.asarray(estados, dtype=np.int8),
+                            np.asarray(ideales, dtype=np.float64), compuerta)
+
+
+def test_una_deteccion_por_columna():
+    estados, x_asignado, descartadas = asignar([402.0, 98.0, 555.0, 251.0], [P, V, P, P])
+    assert estados.tolist() == [V, P, P, P]
+    assert x_asignado.tolist() == [98.0, 251.0, 402.0, 555.0]
+    assert descartadas == 0
+
+
+def test_columna_sin_deteccion_queda_desconocida():
+    estados, x_asignado, descartadas = asignar([101.0, 399.0], [P, P])
+    assert estados.tolist() == [P, D, P, D]
+    assert np.isnan(x_asignado[1]) and np.isnan(x_asignado[3])
+    assert descartadas == 0
+
+
+def test_duplicado_no_cuenta_dos_veces():
+    # Dos cajas sobre la columna 2: gana la más cercana, la otra se descarta
+    estados, x_asignado, descartadas = asignar([245.0, 262.0], [P, P])
+    assert estados.tolist() == [D, P, D, D]
+    assert x_asignado[1] == 245.0
+    assert descartadas == 1
+
+
+def test_una_deteccion_no_ocupa_dos_columnas():
+    # A medio camino entre 1 y 2 (dentro de la compuerta de ambas): una sola columna
+    estados, _, descartadas = asignar([175.0], [P])
+    assert (estados == P).sum() == 1
+    assert descartadas == 0
+
+
+def test_vacio_gana_el_empate():
+    for orden in ([P, V], [V, P]):
+        estados, x_asignado, descartadas = asignar([240.0, 260.0], orden)
+        assert estados.tolist() == [D, V, D, D]
+        assert x_asignado[1] == (240.0 if orden[0] == V else 260.0)
+        assert descartadas == 1
+
+
+def test_compuerta_descarta_fuera_de_rejilla():
+    estados, _, descartadas = asignar([20.0, 640.0, 700.0, 551.0], [P, P, P, V])
+    assert estados.tolist() == [D, D, D, V]
+    assert descartadas == 3
+
+
+def test_sin_detecciones_ni_columnas():
+    estados, x_asignado, descartadas = asignar([], [])
+    assert estados.tolist() == [D] * IDEALES.size
+    assert np.isnan(x_asignado).all()
+    assert descartadas == 0
+    estados, _, descartadas = asignar([100.0], [P], ideales=[])
+    assert estados.size == 0
+    assert descartadas == 1
@@ -0,0 +1,98 @@
+"""Pruebas del ajuste de rejilla de ajustar_columnas con varios frames"""
+
+import numpy as np
+import pytest
+
+from core.column_calibration import ajustar_columnas
+
+TOTAL = 10
+PASO = 150.0
+OFFSET = 100.0
+TOLERANCIA = 40.0
+
+
+def frames(columnas=range(TOTAL), cantidad: int = 8, ruido_px: float = 2.0, semilla: int = 0):
+    """Centros X de 'cantidad' frames con las columnas indicadas (0 = primera)"""
+    rng = np.random.default_rng(semilla)
+    ideales = OFFSET + np.asarray(list(columnas), dtype=np.float64) * PASO
+    return np.concatenate([ideales + rng.normal(0.0, ruido_px, ideales.size) for _ in range(cantidad)])
+
+
+def test_rejilla_completa():
+    ajuste = ajustar_columnas(frames(), TOTAL, TOLERANCIA)
+    assert ajuste['ok'], ajuste['motivo']
+    assert ajuste['paso_px'] == pytest.approx(PASO, abs=0.5)
+    assert ajuste['offset_px'] == pytest.approx(OFFSET, abs=1.0)
+    assert ajuste['columnas_vistas'] == TOTAL
+    assert ajuste['descartadas'] == 0
+    assert sorted(ajuste['centros']) == list(range(1, TOTAL + 1))
+    for columna, x in ajuste['centros'].items():
+        assert x == pytest.approx(OFFSET + (columna - 1) * PASO, abs=2)
+
+
+def test_columnas_que_nunca_se_ven():
+    vistas = [0, 1, 2, 4, 5, 7, 8, 9]
+    ajuste = ajustar_columnas(frames(vistas), TOTAL, TOLERANCIA)
+    assert ajuste['ok'], ajuste['motivo']
+    assert ajuste['paso_px'] == pytest.approx(PASO, abs=0.5)
+    assert ajuste['columnas_vistas'] == len(vistas)
+    # Las columnas faltantes igual reciben su centro ideal
+    assert ajuste['centros'][4] == pytest.approx(OFFSET + 3 * PASO, abs=2)
+    assert ajuste['centros'][7] == pytest.approx(OFFSET + 6 * PASO, abs=2)
+
+
+def test_columnas_que_faltan_en_algunos_frames():
+    parciales = np.concatenate([frames(cantidad=4, semilla=1), frames([0, 1, 2, 3, 6, 7, 8, 9], cantidad=4, semilla=2)])
+    ajuste = ajustar_columnas(parciales, TOTAL, TOLERANCIA)
+    assert ajuste['ok'], ajuste['motivo']
+    assert ajuste['paso_px'] == pytest.approx(PASO, abs=0.5)
+    assert ajuste['columnas_vistas'] == TOTAL
+
+
+def test_detecciones_duplicadas():
+    base = frames(semilla=3)
+    duplicadas = np.concatenate([base, base[::3] + 3.0])
+    ajuste = ajustar_columnas(duplicadas, TOTAL, TOLERANCIA)
+    assert ajuste['ok'], ajuste['motivo']
+    assert ajuste['paso_px'] == pytest.approx(PASO, abs=0.5)
+    assert ajuste['descartadas'] == 0
+    assert len(ajuste['centros']) == TOTAL
+
+
+def test_falso_positivo_aislado_se_descarta():
+    # Una detección a medio paso entre las columnas 3 y 4
+    con_atipico = np.append(frames(semilla=4), OFFSET + 2.5 * PASO)
+    ajuste = ajustar_columnas(con_atipico, TOTAL, TOLERANCIA)
+    assert ajuste['ok'], ajuste['motivo']
+    assert ajuste['descartadas'] == 1
+    assert ajuste['paso_px'] == pytest.approx(PASO, abs=0.5)
+    assert ajuste['offset_px'] == pytest.approx(OFFSET, abs=1.0)
+
+
+def test_residuo_maximo():
+    ruidoso = frames(ruido_px=12.0, semilla=5)
+    assert ajustar_columnas(ruidoso, TOTAL, TOLERANCIA)['ok']
+    ajuste = ajustar_columnas(ruidoso, TOTAL, TOLERANCIA, max_residuo_px=3.0)
+    assert not ajuste['ok']
+    assert 'residuo RMS' in ajuste['motivo']
+    assert ajuste['centros'] == {}
+
+
+def test_una_sola_columna():
+    ajuste = ajustar_columnas(frames([4]), TOTAL, TOLERANCIA)
+    assert not ajuste['ok']
+    assert 'al menos 2 columnas' in ajuste['motivo']
+
+
+def test_rejilla_mas_ancha_que_el_pallet():
+    ajuste = ajustar_columnas(frames(range(TOTAL + 2)), TOTAL, TOLERANCIA)
+    assert not ajuste['ok']
+    assert 'abarca 12 columnas' in ajuste['motivo']
+
+
+def test_falso_positivo_antes_de_la_primera_columna():
+    con_atipico = np.append(frames(semilla=6), OFFSET - 0.4 * PASO)
+    ajuste = ajustar_columnas(con_atipico, TOTAL, TOLERANCIA)
+    assert ajuste['ok'], ajuste['motivo']
+    assert ajuste['descartadas'] == 1
+    assert ajuste['offset_px'] == pytest.approx(OFFSET, abs=1.0)
@@ -0,0 +1,102 @@
+"""Pruebas del tope de la recalibración por deriva respecto de la puesta en marcha"""
+
+import logging
+import queue
+
+import numpy as np
+import pytest
+
+from core.calibration_store import AlmacenCalibracion
+from core.column_calibration import ajustar_columnas
+from core.inspection_engine import MotorInspeccion
+from core.vision_processor_prueba import VisionProcessor
+
+FRAME = np.zeros((720, 1280, 3), dtype=np.uint8)
+
+
+class FuenteFija:
+    fuente = 'camara_prueba'
+    en_vivo = False
+
+
+def crear_motor(config, almacen):
+    logger = logging.getLogger('PruebaDeriva')
+    vp = VisionProcessor(config, logger, 'stub:superior', 'stub:lateral')
+    return MotorInspeccion(config, logger, vp, FuenteFija(), FuenteFija(), almacen_calibracion=almacen)
+
+
+def ajuste(vp, desplazamiento_px: float = 0.0):
+    centros = 100.0 + 150.0 * np.arange(vp.TOTAL_POSICIONES) + desplazamiento_px
+    resultado = ajustar_columnas(centros, vp.TOTAL_POSICIONES, vp.TOLERANCIA_COLUMNA_PX)
+    resultado['frames'] = 1
+    return resultado
+
+
+def eventos_calibrado(motor):
+    eventos = []
+    while True:
+        try:
+            evento = motor.eventos.get_nowait()
+        except queue.Empty:
+            return eventos
+        if evento['tipo'] == 'calibrado':
+            eventos.append(evento)
+
+
+@pytest.fixture
+def config(config_prueba):
+    config_prueba['vision']['deriva']['habilitado'] = True
+    return config_prueba
+
+
+@pytest.fixture
+def almacen(tmp_path):
+    return AlmacenCalibracion(str(tmp_path / 'calibracion_y.json'))
+
+
+def test_deshabilitado_por_defecto(config_prueba):
+    assert not config_prueba['vision']['deriva']['habilitado']
+
+
+def test_deriva_dentro_de_la_tolerancia_se_aplica(config, almacen):
+    motor = crear_motor(config, almacen)
+    vp = motor.vision_processor
+    motor._aplicar_ajuste(ajuste(vp), FRAME, 'inferencia')
+    comisionado = dict(vp.X_CENTROS_IDEALES)
+
+    motor._aplicar_ajuste(ajuste(vp, 12.0), FRAME, 'deriva')
+    assert vp.X_CENTROS_IDEALES[1] == comisionado[1] + 12
+    assert [e['ok'] for e in eventos_calibrado(motor)] == [True, True]
+    assert motor._centros_comisionado == comisionado
+
+
+def test_deriva_lejos_de_la_puesta_en_marcha_se_rechaza(config, almacen):
+    motor = crear_motor(config, almacen)
+    vp = motor.vision_processor
+    motor._aplicar_ajuste(ajuste(vp), FRAME, 'inferencia')
+    comisionado = dict(vp.X_CENTROS_IDEALES)
+
+    # Pasos chicos que el monitor aceptaría uno a uno no acumulan más que la tolerancia
+    motor._aplicar_ajuste(ajuste(vp, 20.0), FRAME, 'deriva')
+    motor._aplicar_ajuste(ajuste(vp, 40.0), FRAME, 'deriva')
+    assert vp.X_CENTROS_IDEALES[1] == comisionado[1] + 20
+    rechazo = eventos_calibrado(motor)[-1]
+    assert not rechazo['ok'] and 'puesta en marcha' in rechazo['motivo']
+
+    clave = motor._clave_calibracion(FRAME)
+    assert almacen.buscar(clave, vp.TOTAL_POSICIONES)['centros'][1] == comisionado[1] + 20
+
+
+def test_la_referencia_sobrevive_al_reinicio(config, almacen):
+    motor = crear_motor(config, almacen)
+    vp = motor.vision_processor
+    motor._aplicar_ajuste(ajuste(vp), FRAME, 'inferencia')
+    comisionado = dict(vp.X_CENTROS_IDEALES)
+    motor._aplicar_ajuste(ajuste(vp, 20.0), FRAME, 'deriva')
+
+    reiniciado = crear_motor(config, almacen)
+    assert reiniciado._recuperar_calibracion(FRAME)
+    assert reiniciado.vision_processor.X_CENTROS_IDEALES[1] == comisionado[1] + 20
+    assert reiniciado._centros_comisionado == comisionado
+    reiniciado._aplicar_ajuste(ajuste(reiniciado.vision_processor, 40.0), FRAME, 'deriva')
+    assert reiniciado.vision_processor.X_CENTROS_IDEALES[1] == comisionado[1] + 20
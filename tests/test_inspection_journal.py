@@ -0,0 +1,108 @@
+"""Pruebas del diario de inspecciones (escritura en lotes y lectura)"""
+
+import glob
+import os
+import threading
+import time
+
+import pytest
+
+from utils.inspection_journal import CAMPOS, DiarioInspeccion, leer_diario
+
+
+def resultado(ciclo: int, **cambios):
+    datos = {
+        'codigo_respuesta_plc': ciclo % 3,
+        'plc_success': True,
+        'filas': 5,
+        'desviacion_y_px': -12,
+        'desviacion_y_mm': -6.0,
+        'correccion_z_cmm': 34,
+        'correccion_z_mm_final': 3.4,
+        'detecciones': {'superior': 8, 'lateral': 3},
+        'tiempos_ms': {'inferencia_lat': 10.5, 'inferencia_sup': 20.25, 'procesamiento': 35.0},
+        'log_z': f'Z ciclo {ciclo}',
+    }
+    datos.update(cambios)
+    return datos
+
+
+def leer_todo(directorio):
+    registros = []
+    for ruta in sorted(glob.glob(os.path.join(directorio, 'inspecciones_*'))):
+        registros.extend(leer_diario(ruta))
+    return registros
+
+
+@pytest.mark.parametrize('formato', ['jsonl', 'binario'])
+def test_ida_y_vuelta(tmp_path, formato):
+    diario = DiarioInspeccion(str(tmp_path), formato=formato, tamano_lote=4, intervalo_volcado_s=0.05)
+    for ciclo in range(1, 11):
+        diario.registrar(resultado(ciclo), ciclo, t_solicitud=1000.0 + ciclo, duracion_ms=50.0,
+                         escritura_ms=2.5, escritura_ok=ciclo != 5)
+    diario.cerrar()
+
+    registros = leer_todo(tmp_path)
+    assert diario.registros_escritos == 10
+    assert [r['ciclo'] for r in registros] == list(range(1, 11))
+    primero = registros[0]
+    assert set(CAMPOS) <= set(primero)
+    assert primero['codigo'] == 1
+    assert primero['filas'] == 5
+    assert primero['desviacion_y_px'] == -12
+    assert primero['correccion_z_cmm'] == 34
+    assert primero['detecciones_sup'] == 8 and primero['detecciones_lat'] == 3
+    assert primero['t_solicitud'] == pytest.approx(1001.0)
+    assert primero['ms_inferencia_sup'] == pytest.approx(20.25)
+    assert primero['ms_total'] == pytest.approx(50.0)
+    assert [r['escritura_ok'] for r in registros][4] == 0
+    if formato == 'jsonl':
+        assert primero['log_z'] == 'Z ciclo 1'
+
+
+@pytest.mark.parametrize('formato', ['jsonl', 'binario'])
+def test_registro_invalido_se_descarta_sin_detener_el_hilo(tmp_path, formato):
+    diario = DiarioInspeccion(str(tmp_path), formato=formato, tamano_lote=1, intervalo_volcado_s=0.05)
+    diario.registrar(resultado(1), 1, 1000.0, 50.0)
+    invalido = resultado(2, filas=None, detecciones={'superior': object()})
+    diario.registrar(invalido, 2, 1000.0, 50.0)
+    diario.registrar(resultado(3), 3, 1000.0, 50.0)
+    diario.cerrar()
+
+    assert [r['ciclo'] for r in leer_todo(tmp_path)] == [1, 3]
+    assert diario.registros_descartados == 1
+    assert diario.registros_escritos == 2
+
+
+def test_lote_pendiente_acotado(tmp_path):
+    diario = DiarioInspeccion(str(tmp_path), tamano_lote=10, intervalo_volcado_s=0.05, max_pendientes=100)
+    escribir = diario._escribir_jsonl
+    disco_libre = threading.Event()
+
+    def escribir_bloqueado(ruta, lineas):
+        disco_libre.wait(5.0)  # disco bloqueado: el hilo queda en la primera escritura
+        escribir(ruta, lineas)
+
+    diario._escribir_jsonl = escribir_bloqueado
+    for ciclo in range(10):
+        diario.registrar(resultado(ciclo), ciclo, 1000.0, 50.0)
+    limite = time.monotonic() + 2.0
+    while diario._lote and time.monotonic() < limite:
+        time.sleep(0.01)
+
+    for ciclo in range(10, 160):
+        diario.registrar(resultado(ciclo), ciclo, 1000.0, 50.0)
+    assert len(diario._lote) == 100
+    assert diario.registros_descartados == 50
+
+    disco_libre.set()
+    diario.cerrar()
+    assert diario.registros_escritos == 110
+
+
+def test_sin_hilo_no_acumula(tmp_path):
+    diario = DiarioInspeccion(str(tmp_path), intervalo_volcado_s=0.05)
+    diario.cerrar()
+    diario.registrar(resultado(1), 1, 1000.0, 50.0)
+    assert diario._lote == []
+    assert diario.registros_descartados == 1
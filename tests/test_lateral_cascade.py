@@ -0,0 +1,48 @@
+"""Pruebas de la cascada Lateral (pasada rápida + pasada fina sobre las etiquetas Z)"""
+
+import pytest
+
+# Etiquetas Z (clase, y central): una franja de 80x7 px por etiqueta
+ETIQUETAS_Z = (('referencia_fija', 303), ('borde_envase', 346), ('mitad_envase', 425))
+
+
+@pytest.fixture
+def escena_lateral(escena):
+    def crear(sin=(), extra=False):
+        cajas = [(nombre, 600, y - 3, 680, y + 3) for nombre, y in ETIQUETAS_Z if nombre not in sin]
+        if extra:  # detección de una clase sin uso, lejos de las etiquetas Z
+            cajas.append(('tapa', 100, 600, 200, 650))
+        return escena(*cajas)
+    return crear
+
+
+@pytest.fixture
+def procesadores(crear_procesador, modelo_por_color):
+    def crear(cascada: bool):
+        modelo = modelo_por_color('lateral')
+        cascada_lateral = {'habilitado': cascada, 'imgsz_baja': 320, 'imgsz_alta': 0, 'margen_px': 24}
+        return crear_procesador(modelo, modelo, cascada_lateral=cascada_lateral), modelo
+    return crear(False), crear(True)
+
+
+def lateral(vp, frame):
+    codigo, correccion_z, mensaje, _anotado = vp._ejecutar_inferencia_lateral(frame)
+    return codigo, correccion_z, mensaje, vp._medicion_lat[1]
+
+
+@pytest.mark.parametrize('extra', [False, True])
+def test_cascada_igual_que_sin_cascada(procesadores, escena_lateral, extra):
+    (vp, _), (vp_cascada, modelo_cascada) = procesadores
+    frame = escena_lateral(extra=extra)
+    # mismo Z y misma cantidad de detecciones (sin contar dos veces las de la región)
+    assert lateral(vp_cascada, frame) == lateral(vp, frame)
+    assert [imgsz for _forma, imgsz in modelo_cascada.llamadas] == [320, None]
+    assert modelo_cascada.llamadas[1][0] != (720, 1280)  # la pasada fina es sobre un recorte
+
+
+@pytest.mark.parametrize('falta', ['referencia_fija', 'borde_envase', 'mitad_envase'])
+def test_etiqueta_faltante_repite_inferencia_completa(procesadores, escena_lateral, falta):
+    (vp, _), (vp_cascada, modelo_cascada) = procesadores
+    frame = escena_lateral(sin=(falta,))
+    assert lateral(vp_cascada, frame) == lateral(vp, frame)
+    assert modelo_cascada.llamadas == [((720, 1280), 320), ((720, 1280), None)]
@@ -0,0 +1,101 @@
+"""Pruebas del seguimiento del pallet y la confirmación por zona"""
+
+import numpy as np
+import pytest
+
+from core.column_assignment import COLUMNA_PRODUCTO, COLUMNA_VACIA
+from core.pallet_tracker import (INCONSISTENTE, PALLET_NUEVO, RETIRADA, SIN_CAMBIO, SIN_REFERENCIA,
+                                 SeguidorPallet, crear_seguidor_desde_config)
+from core.stub_detector import crear_detector_simulado
+
+COLUMNAS = 8
+X_PRIMERA, PASO = 100, 150
+
+P, V = COLUMNA_PRODUCTO, COLUMNA_VACIA
+
+
+def ocupacion(texto: str) -> np.ndarray:
+    return np.array([P if c == 'P' else V for c in texto], dtype=np.int8)
+
+
+# ==================== SEGUIDOR ====================
+
+def test_transiciones():
+    seguidor = SeguidorPallet(COLUMNAS)
+    assert seguidor.registrar(ocupacion('PPPPPPPP'), 'completa')['transicion'] == SIN_REFERENCIA
+    assert seguidor.registrar(ocupacion('VPPPPPPP'), 'completa')['transicion'] == RETIRADA
+    assert seguidor.registrar(ocupacion('VPPPPPPP'), 'completa')['transicion'] == SIN_CAMBIO
+    assert seguidor.registrar(ocupacion('VVVPPPPP'), 'completa')['transicion'] == INCONSISTENTE
+    assert seguidor.registrar(ocupacion('PPPPPPPP'), 'completa')['transicion'] == PALLET_NUEVO
+
+
+def test_completa_cada_fuerza_inspeccion_completa():
+    seguidor = SeguidorPallet(COLUMNAS, completa_cada=2)
+    seguidor.registrar(ocupacion('PPPPPPPP'), 'completa')
+    seguidor.registrar(ocupacion('VPPPPPPP'), 'completa')
+    assert seguidor.puede_confirmar()
+    seguidor.registrar(ocupacion('VVPPPPPP'), 'zona')
+    seguidor.registrar(ocupacion('VVVPPPPP'), 'zona')
+    assert not seguidor.puede_confirmar()
+
+
+@pytest.mark.parametrize('vecinas, esperado', [(0, 1), (-2, 1), (1, 1), (2, 2)])
+def test_columnas_vecinas_minimo_uno(vecinas, esperado):
+    seguidor = crear_seguidor_desde_config(
+        {'seguimiento_pallet': {'habilitado': True, 'columnas_vecinas': vecinas}}, COLUMNAS)
+    assert seguidor.columnas_vecinas == esperado
+
+
+def test_deshabilitado():
+    assert crear_seguidor_desde_config({}, COLUMNAS) is None
+
+
+# ==================== CONFIRMACIÓN POR ZONA ====================
+
+@pytest.fixture
+def procesador(crear_procesador, modelo_por_color, config_prueba):
+    config_vision = config_prueba['vision']
+    config_vision['detector_simulado']['lateral'].update(latencia_ms=0, prob_etiqueta_faltante=0)
+    modelo_sup = modelo_por_color('superior', area_minima=51)
+    # 0 se lleva a 1: con 0 la zona no ve la columna que el robot debía retirar
+    vp = crear_procesador(modelo_sup, crear_detector_simulado('stub:lateral', config_vision),
+                          seguimiento_pallet={'habilitado': True, 'completa_cada': 10, 'columnas_vecinas': 0})
+    vp.aplicar_calibracion({i + 1: X_PRIMERA + PASO * i for i in range(COLUMNAS)}, PASO)
+    return vp, modelo_sup
+
+
+@pytest.fixture
+def inspeccionar(escena):
+    """Inspecciona un pallet descrito como texto ('P' producto, 'V' vacío por columna)"""
+    def ejecutar(vp, texto):
+        cajas = [('posicion_columna' if c == 'P' else 'posicion_vacia',
+                  X_PRIMERA + PASO * i - 40, 200, X_PRIMERA + PASO * i + 40, 500) for i, c in enumerate(texto)]
+        resultado = vp.procesar_frames_dual(escena(*cajas), np.zeros((720, 1280, 3), dtype=np.uint8))
+        return resultado['pallet']
+    return ejecutar
+
+
+def ancho(llamada) -> int:
+    (_alto, ancho_source), _imgsz = llamada
+    return ancho_source
+
+
+def test_zona_confirma_la_columna_retirada(procesador, inspeccionar):
+    vp, modelo_sup = procesador
+    assert inspeccionar(vp, 'PPPPPPPP')['via'] == 'completa'
+    assert inspeccionar(vp, 'VPPPPPPP')['via'] == 'completa'  # primera transición: aún sin confirmar
+    pallet = inspeccionar(vp, 'VVPPPPPP')
+    assert (pallet['via'], pallet['transicion']) == ('zona', RETIRADA)
+    assert ancho(modelo_sup.llamadas[-1]) < 1280
+
+
+def test_zona_no_confirma_si_el_robot_no_retiro(procesador, inspeccionar):
+    vp, modelo_sup = procesador
+    inspeccionar(vp, 'PPPPPPPP')
+    assert inspeccionar(vp, 'VPPPPPPP')['transicion'] == RETIRADA
+
+    # el robot no retiró la columna 2: la zona (3 y sus vecinas) la ve con producto
+    # y se repite la inspección completa
+    pallet = inspeccionar(vp, 'VPPPPPPP')
+    assert (pallet['via'], pallet['transicion']) == ('completa', SIN_CAMBIO)
+    assert ancho(modelo_sup.llamadas[-2]) < 1280 and ancho(modelo_sup.llamadas[-1]) == 1280
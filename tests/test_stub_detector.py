@@ -0,0 +1,54 @@
+"""Pruebas del detector sintético (modelos 'stub:')"""
+
+from collections import Counter
+
+import numpy as np
+import pytest
+
+from core.stub_detector import crear_detector_simulado
+
+CONF_LLAMADOR = 0.5  # vision.confianza_minima
+FRAMES = 4000
+
+
+def etiquetas(detector, frame, conf=CONF_LLAMADOR):
+    resultado = detector.predict(source=frame, conf=conf, verbose=False)[0]
+    return [(detector.names[c.cls.item()], c.conf.item()) for c in resultado.boxes]
+
+
+@pytest.fixture
+def frame():
+    return np.zeros((720, 1280, 3), dtype=np.uint8)
+
+
+@pytest.mark.parametrize('prob_faltante', [0.0, 0.02, 0.1])
+def test_tasa_de_etiquetas_faltantes_lateral(frame, prob_faltante):
+    detector = crear_detector_simulado('stub:lateral', {
+        'detector_simulado': {'lateral': {'prob_etiqueta_faltante': prob_faltante, 'confianza_min': 0.3}}})
+    vistas = Counter()
+    for _ in range(FRAMES):
+        vistas.update(nombre for nombre, _conf in etiquetas(detector, frame))
+
+    # el umbral del llamador (0.5) no puede descartar etiquetas además de las configuradas
+    for clase in ('referencia_fija', 'borde_envase', 'mitad_envase'):
+        faltante = 1.0 - vistas[clase] / FRAMES
+        assert faltante == pytest.approx(prob_faltante, abs=0.015), clase
+
+
+def test_confianzas_respetan_el_umbral_del_llamador(frame):
+    detector = crear_detector_simulado('stub:lateral', {'detector_simulado': {'lateral': {'confianza_min': 0.3}}})
+    confianzas = [conf for _ in range(200) for _nombre, conf in etiquetas(detector, frame, conf=0.7)]
+    assert confianzas and min(confianzas) >= 0.7
+
+    # sin umbral del llamador manda 'confianza_min'
+    confianzas = [conf for _ in range(200) for _nombre, conf in etiquetas(detector, frame, conf=0.0)]
+    assert min(confianzas) >= 0.3 and min(confianzas) < 0.5
+
+
+def test_superior_genera_todas_las_columnas(frame):
+    detector = crear_detector_simulado('stub:superior', {
+        'TOTAL_POSICIONES': 8, 'detector_simulado': {'superior': {'prob_fallo': 0.0}}})
+    for _ in range(100):
+        nombres = [nombre for nombre, _conf in etiquetas(detector, frame, conf=0.9)]
+        assert len(nombres) == 8
+        assert set(nombres) <= {'posicion_columna', 'posicion_vacia'}
@@ -0,0 +1,122 @@
+"""
+Renderizado de frames en canvas Tkinter
+Desacoplado del ciclo de inspección, con FPS objetivo propio
+"""
+
+import time
+import tkinter as tk
+
+from utils.lazy_imports import ModuloDiferido
+
+# Se importan en el primer render, no al arrancar la interfaz
+cv2 = ModuloDiferido('cv2')
+Image = ModuloDiferido('PIL.Image')
+ImageTk = ModuloDiferido('PIL.ImageTk')
+
+
+class RenderizadorCanvas:
+    """
+    Dibuja frames BGR en un tk.Canvas a un FPS objetivo.
+
+    - publicar() solo guarda el frame pendiente (O(1), sin conversión); si
+      llega otro antes del siguiente tick, el anterior se descarta
+    - Reutiliza un único item de imagen del canvas y un único PhotoImage
+      (paste) mientras el tamaño no cambie
+    - Redimensiona en BGR y convierte a RGB la imagen ya reducida
+    - Si un render tarda más que el periodo, el siguiente tick se agenda
+      sin espera extra y los frames intermedios se omiten
+    """
+
+    def __init__(self, root, canvas: tk.Canvas, fps_objetivo: float = 15.0, logger=None):
+        """
+        Args:
+            root: Ventana Tk (para root.after)
+            canvas: Canvas donde dibujar
+            fps_objetivo: Máximo de renders por segundo
+            logger: Instancia del logger (opcional)
+        """
+        self.root = root
+        self.canvas = canvas
+        self.periodo_ms = max(1, int(1000 / max(fps_objetivo, 1.0)))
+        self.logger = logger
+
+        self._pendiente = None
+        self._photo = None
+        self._item = None
+        self._offset = (0, 0)
+        self._after_id = None
+
+        self.frames_renderizados = 0
+        self.frames_omitidos = 0
+        self.ultimo_render_ms = 0.0
+
+    def publicar(self, frame) -> None:
+        """Deja un frame para el próximo tick (descarta el pendiente anterior)"""
+        if self._pendiente is not None:
+            self.frames_omitidos += 1
+        self._pendiente = frame
+
+    def iniciar(self) -> None:
+        if self._after_id is None:
+            self._after_id = self.root.after(self.periodo_ms, self._tick)
+
+    def detener(self) -> None:
+        if self._after_id is not None:
+            self.root.after_cancel(self._after_id)
+            self._after_id = None
+
+    def _tick(self):
+        t_inicio = time.perf_counter()
+        frame, self._pendiente = self._pendiente, None
+        if frame is not None:
+            self._renderizar(frame)
+        self.ultimo_render_ms = (time.perf_counter() - t_inicio) * 1000.0
+        espera = max(1, self.periodo_ms - int(self.ultimo_render_ms))
+        self._after_id = self.root.after(espera, self._tick)
+
+    def _renderizar(self, frame) -> None:
+        try:
+            canvas_width = self.canvas.winfo_width()
+            canvas_height = self.canvas.winfo_height()
+            if canvas_width < 10 or canvas_height < 10:
+                canvas_width, canvas_height = 640, 480  # Default
+
+            h, w = frame.shape[:2]
+            ratio = min(canvas_width / w, canvas_height / h)
+            new_w, new_h = int(w * ratio), int(h * ratio)
+            if new_w <= 0 or new_h <= 0:
+                return
+
+            interpolacion = cv2.INTER_AREA if ratio < 1.0 else cv2.INTER_LINEAR
+            frame_resized = cv2.resize(frame, (new_w, new_h), interpolation=interpolacion)
+            imagen = Image.fromarray(cv2.cvtColor(frame_resized, cv2.COLOR_BGR2RGB))
+
+            offset = ((canvas_width - new_w) // 2, (canvas_height - new_h) // 2)
+
+            if self._photo is not None and (self._photo.width(), self._photo.height()) == (new_w, new_h):
+                self._photo.paste(imagen)
+            else:
+                # Mantener referencia para evitar que sea eliminado por el recolector de basura
+                self._photo = ImageTk.PhotoImage(imagen)
+                if self._item is not None:
+                    self.canvas.itemconfig(self._item, image=self._photo)
+
+            if self._item is None:
+                self._item = self.canvas.create_image(offset[0], offset[1], anchor=tk.NW, image=self._photo)
+                self._offset = offset
+            elif offset != self._offset:
+                self.canvas.coords(self._item, offset[0], offset[1])
+                self._offset = offset
+
+            self.frames_renderizados += 1
+
+        except Exception as e:
+            if self.logger:
+                self.logger.warning(f"⚠️ Error al mostrar frame: {e} (Canvas: {self.canvas})")
+
+    def estadisticas(self) -> dict:
+        return {
+            'frames_renderizados': self.frames_renderizados,
+            'frames_omitidos': self.frames_omitidos,
+            'ultimo_render_ms': round(self.ultimo_render_ms, 2),
+        }
@@ -0,0 +1,331 @@
+"""
+Diario de inspecciones
+Un registro compacto por ciclo (tiempos, códigos, filas, Y/Z, detecciones)
+escrito en lotes por un hilo de fondo, en JSONL o en binario empaquetado.
+
+Lectura:
+    python -m utils.inspection_journal logs/inspecciones/inspecciones_20250101.bin
+    python -m utils.inspection_journal logs/inspecciones/*.jsonl --resumen
+    python -m utils.inspection_journal logs/inspecciones/inspecciones_20250101.bin --csv > salida.csv
+"""
+
+import argparse
+import csv
+import json
+import os
+import struct
+import sys
+import threading
+import time
+from datetime import datetime
+from typing import Dict, Iterator, List, Optional
+
+from utils.logger_prueba import log_diferido
+
+
+# Formato binario: cabecera + registros de tamaño fijo (little-endian)
+MAGIA_BINARIO = b'INSP'
+VERSION_BINARIO = 1
+CABECERA = struct.Struct('<4sHH')  # magia, versión, tamaño de registro
+REGISTRO = struct.Struct('<ddIbbbHhfifHHfffff')
+CAMPOS = (
+    'ts',                 # d  fin del ciclo (epoch s)
+    't_solicitud',        # d  solicitud detectada (epoch s)
+    'ciclo',              # I
+    'codigo',             # b  0 OK / 1 FALLO QC / 2 PARADA
+    'plc_success',        # b
+    'escritura_ok',       # b  1 ok / 0 fallo / -1 sin PLC (simulación)
+    'filas',              # H
+    'desviacion_y_px',    # h
+    'desviacion_y_mm',    # f
+    'correccion_z_cmm',   # i
+    'correccion_z_mm',    # f
+    'detecciones_sup',    # H
+    'detecciones_lat',    # H
+    'ms_inferencia_lat',  # f
+    'ms_inferencia_sup',  # f
+    'ms_procesamiento',   # f
+    'ms_escritura_plc',   # f
+    'ms_total',           # f
+)
+
+
+class DiarioInspeccion:
+    """
+    Escritor del diario de inspecciones.
+
+    - registrar() solo arma una tupla y la agrega al lote (lock corto)
+    - Un hilo de fondo vuelca el lote cada 'intervalo_volcado_s' o cuando
+      alcanza 'tamano_lote' registros, con una sola escritura por lote
+    - Un archivo por día: <directorio>/inspecciones_AAAAMMDD.(jsonl|bin)
+    - Un registro que no se puede serializar se descarta solo (se cuenta en
+      'registros_descartados'); el lote pendiente se acota a 'max_pendientes'
+    """
+
+    def __init__(self,
+                 directorio: str = 'logs/inspecciones',
+                 formato: str = 'jsonl',
+                 tamano_lote: int = 64,
+                 intervalo_volcado_s: float = 1.0,
+                 max_pendientes: int = 10000,
+                 logger=None):
+        """
+        Args:
+            directorio: Carpeta de los archivos del diario
+            formato: 'jsonl' (legible, incluye log_z) o 'binario' (registro fijo de
+                     REGISTRO.size bytes, sin textos)
+            tamano_lote: Registros que fuerzan un volcado anticipado
+            intervalo_volcado_s: Periodo máximo entre volcados
+            max_pendientes: Registros sin volcar a partir de los cuales se descartan
+                            los nuevos (ej. disco bloqueado)
+            logger: Instancia del logger
+        """
+        if formato not in ('jsonl', 'binario'):
+            raise ValueError(f"Formato de diario desconocido: {formato}")
+        self.directorio = directorio
+        self.formato = formato
+        self.tamano_lote = max(1, int(tamano_lote))
+        self.intervalo_volcado_s = intervalo_volcado_s
+        self.max_pendientes = max(self.tamano_lote, int(max_pendientes))
+        self.logger = logger
+        self.registros_escritos = 0
+        self.registros_descartados = 0
+
+        os.makedirs(self.directorio, exist_ok=True)
+        self._lote = []
+        self._lock = threading.Lock()
+        self._hay_lote = threading.Event()
+        self._detener = threading.Event()
+        self._hilo = threading.Thread(target=self._bucle, name="DiarioInspeccion", daemon=True)
+        self._hilo.start()
+
+    # ==================== API ====================
+
+    def registrar(self,
+                  resultado: Dict,
+                  ciclo: int,
+                  t_solicitud: float,
+                  duracion_ms: float,
+                  escritura_ms: float = 0.0,
+                  escritura_ok: Optional[bool] = None) -> None:
+        """
+        Agrega un ciclo al lote (no hace E/S).
+
+        Args:
+            resultado: Diccionario de procesar_frames_dual
+            ciclo: Número de ciclo del motor
+            t_solicitud: time.time() al detectar la solicitud
+            duracion_ms: Solicitud → respuesta escrita
+            escritura_ms: Duración de la escritura al PLC
+            escritura_ok: Resultado de la escritura (None = sin PLC)
+        """
+        tiempos = resultado.get('tiempos_ms', {})
+        detecciones = resultado.get('detecciones', {})
+        registro = (
+            time.time(),
+            t_solicitud,
+            ciclo,
+            resultado.get('codigo_respuesta_plc', -1),
+            int(bool(resultado.get('plc_success', False))),
+            -1 if escritura_ok is None else int(escritura_ok),
+            resultado.get('filas', 0),
+            int(resultado.get('desviacion_y_px', 0)),
+            resultado.get('desviacion_y_mm', 0.0),
+            int(resultado.get('correccion_z_cmm', 0)),
+            resultado.get('correccion_z_mm_final', 0.0),
+            detecciones.get('superior', 0),
+            detecciones.get('lateral', 0),
+            tiempos.get('inferencia_lat', 0.0),
+            tiempos.get('inferencia_sup', 0.0),
+            tiempos.get('procesamiento', 0.0),
+            escritura_ms,
+            duracion_ms,
+        )
+        texto = resultado.get('log_z', '') if self.formato == 'jsonl' else None
+        with self._lock:
+            if len(self._lote) >= self.max_pendientes or not self._hilo.is_alive():
+                self.registros_descartados += 1
+                return
+            self._lote.append((registro, texto))
+            lleno = len(self._lote) >= self.tamano_lote
+        if lleno:
+            self._hay_lote.set()
+
+    def cerrar(self) -> None:
+        """Vuelca lo pendiente y detiene el hilo"""
+        self._detener.set()
+        self._hay_lote.set()
+        self._hilo.join(timeout=5.0)
+
+    # ==================== ESCRITURA (hilo de fondo) ====================
+
+    def _bucle(self) -> None:
+        while not self._detener.is_set():
+            self._hay_lote.wait(self.intervalo_volcado_s)
+            self._hay_lote.clear()
+            self._volcar()
+        self._volcar()
+
+    def _volcar(self) -> None:
+        with self._lock:
+            lote, self._lote = self._lote, []
+        if not lote:
+            return
+
+        # Serializar de a uno (un registro inválido no tira el lote ni el hilo)
+        # y agrupar por día (un lote puede cruzar la medianoche)
+        por_archivo = {}
+        descartados = 0
+        for registro, texto in lote:
+            try:
+                serializado = self._serializar(registro, texto)
+            except (struct.error, TypeError, ValueError, OverflowError) as e:
+                descartados += 1
+                error = e
+                continue
+            por_archivo.setdefault(self._ruta_archivo(registro[0]), []).append(serializado)
+        if descartados:
+            self.registros_descartados += descartados
+            self._log(f"⚠️ Diario: {descartados} registros descartados por valores inválidos ({error})", 'warning')
+
+        for ruta, serializados in por_archivo.items():
+            try:
+                if self.formato == 'binario':
+                    self._escribir_binario(ruta, serializados)
+                else:
+                    self._escribir_jsonl(ruta, serializados)
+                self.registros_escritos += len(serializados)
+            except OSError as e:
+                self._log(f"⚠️ No se pudo escribir el diario {ruta} ({len(serializados)} registros perdidos): {e}", 'warning')
+
+    def _ruta_archivo(self, ts: float) -> str:
+        extension = 'bin' if self.formato == 'binario' else 'jsonl'
+        return os.path.join(self.directorio, f"inspecciones_{datetime.fromtimestamp(ts):%Y%m%d}.{extension}")
+
+    def _serializar(self, registro: tuple, texto: Optional[str]):
+        """Bytes de REGISTRO (binario) o línea JSON (jsonl) de un ciclo"""
+        if self.formato == 'binario':
+            return REGISTRO.pack(*registro)
+        datos = dict(zip(CAMPOS, registro))
+        datos['log_z'] = texto
+        return json.dumps(datos, ensure_ascii=False, separators=(',', ':'))
+
+    def _escribir_jsonl(self, ruta: str, lineas: List[str]) -> None:
+        with open(ruta, 'a', encoding='utf-8') as f:
+            f.write('\n'.join(lineas) + '\n')
+
+    def _escribir_binario(self, ruta: str, registros: List[bytes]) -> None:
+        datos = b''.join(registros)
+        nuevo = not os.path.exists(ruta) or os.path.getsize(ruta) == 0
+        with open(ruta, 'ab') as f:
+            if nuevo:
+                f.write(CABECERA.pack(MAGIA_BINARIO, VERSION_BINARIO, REGISTRO.size))
+            f.write(datos)
+
+    def _log(self, mensaje: str, nivel: str = 'info', *args):
+        """Helper para loggear (formato %% diferido)"""
+        log_diferido(self.logger, mensaje, nivel, *args)
+
+
+def crear_diario_desde_config(config: Dict, logger=None) -> Optional[DiarioInspeccion]:
+    """
+    Crea el diario si 'diario.habilitado' es true en el JSON.
+
+    Returns:
+        DiarioInspeccion en marcha, o None si está deshabilitado
+    """
+    config_diario = config.get('diario', {})
+    if not config_diario.get('habilitado', False):
+        return None
+    return DiarioInspeccion(
+        directorio=config_diario.get('directorio', 'logs/inspecciones'),
+        formato=config_diario.get('formato', 'jsonl'),
+        tamano_lote=config_diario.get('tamano_lote', 64),
+        intervalo_volcado_s=config_diario.get('intervalo_volcado_s', 1.0),
+        max_pendientes=config_diario.get('max_pendientes', 10000),
+        logger=logger
+    )
+
+
+# ==================== LECTURA ====================
+
+def leer_diario(ruta: str) -> Iterator[Dict]:
+    """
+    Itera los registros de un archivo del diario (JSONL o binario).
+
+    Args:
+        ruta: Archivo .jsonl o .bin
+
+    Yields:
+        Diccionario por ciclo con las claves de CAMPOS (+ 'log_z' en JSONL)
+    """
+    if ruta.endswith('.jsonl'):
+        with open(ruta, 'r', encoding='utf-8') as f:
+            for linea in f:
+                if linea.strip():
+                    yield json.loads(linea)
+        return
+
+    with open(ruta, 'rb') as f:
+        magia, version, tamano = CABECERA.unpack(f.read(CABECERA.size))
+        if magia != MAGIA_BINARIO or version != VERSION_BINARIO or tamano != REGISTRO.size:
+            raise ValueError(f"{ruta}: no es un diario binario v{VERSION_BINARIO}")
+        while True:
+            bloque = f.read(REGISTRO.size * 1024)
+            if not bloque:
+                break
+            # Un registro truncado al final (corte de energía) se ignora
+            utiles = len(bloque) - len(bloque) % REGISTRO.size
+            for valores in REGISTRO.iter_unpack(bloque[:utiles]):
+                yield dict(zip(CAMPOS, valores))
+
+
+def resumir(registros: Iterator[Dict]) -> Dict:
+    """Totales por código y percentiles de latencia total"""
+    codigos = {}
+    totales_ms = []
+    for r in registros:
+        codigos[r['codigo']] = codigos.get(r['codigo'], 0) + 1
+        totales_ms.append(r['ms_total'])
+    totales_ms.sort()
+
+    def percentil(p):
+        return round(totales_ms[min(len(totales_ms) - 1, int(p * len(totales_ms)))], 2) if totales_ms else None
+
+    return {
+        'ciclos': len(totales_ms),
+        'por_codigo': codigos,
+        'ms_total_p50': percentil(0.50),
+        'ms_total_p95': percentil(0.95),
+        'ms_total_p99': percentil(0.99),
+        'ms_total_max': round(totales_ms[-1], 2) if totales_ms else None,
+    }
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Lector del diario de inspecciones")
+    parser.add_argument('archivos', nargs='+', help="Archivos .jsonl o .bin del diario")
+    salida = parser.add_mutually_exclusive_group()
+    salida.add_argument('--csv', action='store_true', help="Exportar como CSV")
+    salida.add_argument('--resumen', action='store_true', help="Solo totales y percentiles")
+    args = parser.parse_args(argv)
+
+    def registros():
+        for ruta in args.archivos:
+            yield from leer_diario(ruta)
+
+    if args.resumen:
+        print(json.dumps(resumir(registros()), indent=2, ensure_ascii=False))
+    elif args.csv:
+        escritor = csv.DictWriter(sys.stdout, fieldnames=list(CAMPOS) + ['log_z'], extrasaction='ignore')
+        escritor.writeheader()
+        for r in registros():
+            escritor.writerow(r)
+    else:
+        for r in registros():
+            print(json.dumps(r, ensure_ascii=False))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,98 @@
+"""
+Imports diferidos de dependencias pesadas
+cv2, PIL, numpy y ultralytics (torch) tardan segundos en importarse en los PC
+de operación. Los módulos del proyecto los referencian con ModuloDiferido y
+el import real ocurre en el primer uso o en la precarga en segundo plano,
+después de que la ventana ya está visible.
+"""
+
+import importlib
+import threading
+import time
+from typing import Callable, Iterable, Optional
+
+
+class ModuloDiferido:
+    """
+    Referencia a un módulo que se importa en el primer acceso a un atributo.
+
+        cv2 = ModuloDiferido('cv2')
+        ...
+        cv2.resize(...)   # aquí se importa cv2 (una sola vez)
+
+    Tras el primer acceso cada atributo usado queda cacheado en la instancia,
+    así el costo por llamada en el ciclo es el de un atributo normal.
+    """
+
+    def __init__(self, nombre: str):
+        self.__dict__['_nombre'] = nombre
+        self.__dict__['_modulo'] = None
+
+    def _cargar(self):
+        modulo = self.__dict__['_modulo']
+        if modulo is None:
+            # import_module es seguro entre hilos (lock de import por módulo)
+            modulo = importlib.import_module(self.__dict__['_nombre'])
+            self.__dict__['_modulo'] = modulo
+        return modulo
+
+    def __getattr__(self, atributo: str):
+        valor = getattr(self._cargar(), atributo)
+        self.__dict__[atributo] = valor
+        return valor
+
+    def __setattr__(self, atributo: str, valor):
+        setattr(self._cargar(), atributo, valor)
+
+    @property
+    def cargado(self) -> bool:
+        return self.__dict__['_modulo'] is not None
+
+    def __repr__(self) -> str:
+        estado = 'cargado' if self.cargado else 'sin cargar'
+        return f"<ModuloDiferido '{self.__dict__['_nombre']}' ({estado})>"
+
+
+def precargar_en_segundo_plano(modulos: Iterable[str],
+                               logger=None,
+                               al_terminar: Optional[Callable[[dict], None]] = None) -> threading.Thread:
+    """
+    Importa los módulos en un hilo daemon para que el primer uso no espere.
+
+    Los módulos que no estén instalados se omiten (ej. ultralytics en un
+    equipo que solo usa modelos 'stub:').
+
+    Args:
+        modulos: Nombres de módulos en orden de importación
+        logger: Instancia del logger
+        al_terminar: Callback opcional con {modulo: segundos | None si falló}
+                     (corre en el hilo de precarga)
+
+    Returns:
+        Hilo de precarga (ya iniciado)
+    """
+    modulos = list(modulos)
+
+    def _precargar():
+        tiempos = {}
+        t_total = time.perf_counter()
+        for nombre in modulos:
+            t_inicio = time.perf_counter()
+            try:
+                importlib.import_module(nombre)
+                tiempos[nombre] = round(time.perf_counter() - t_inicio, 3)
+            except ImportError:
+                tiempos[nombre] = None
+            except Exception as e:
+                tiempos[nombre] = None
+                if logger:
+                    logger.warning(f"⚠️ Error precargando {nombre}: {e}")
+        if logger:
+            detalle = ", ".join(f"{n} {t:.2f}s" for n, t in tiempos.items() if t is not None)
+            logger.info(f"📦 Dependencias precargadas en {time.perf_counter() - t_total:.2f} s ({detalle})")
+        if al_terminar:
+            al_terminar(tiempos)
+
+    hilo = threading.Thread(target=_precargar, name="PrecargaModulos", daemon=True)
+    hilo.start()
+    return hilo
@@ -0,0 +1,182 @@
+"""
+Rotación de archivos de log por tamaño y por día
+Los archivos rotados se comprimen (gzip) en un hilo de fondo y el total en
+disco se mantiene bajo una cuota borrando primero los más viejos
+"""
+
+import glob
+import gzip
+import logging
+import logging.handlers
+import os
+import queue
+import shutil
+import threading
+from datetime import datetime, timedelta
+from typing import Optional
+
+
+class ManejadorArchivoRotativo(logging.handlers.BaseRotatingHandler):
+    """
+    Handler de archivo con rotación por tamaño y/o al cambiar el día.
+
+    - Archivo activo: 'sistema.log'
+    - Rotados: 'sistema.log.AAAAMMDD.N' → 'sistema.log.AAAAMMDD.N.gz'
+    - La compresión y la aplicación de la cuota corren en un hilo propio,
+      así el hilo que escribe solo paga un rename
+    """
+
+    def __init__(self,
+                 archivo: str,
+                 max_bytes: int = 20 * 1024 * 1024,
+                 diario: bool = True,
+                 comprimir: bool = True,
+                 cuota_total_bytes: Optional[int] = None,
+                 encoding: str = 'utf-8'):
+        """
+        Args:
+            archivo: Ruta del archivo de log activo
+            max_bytes: Tamaño que dispara la rotación (0 = sin límite)
+            diario: Rotar también al cambiar el día
+            comprimir: Comprimir con gzip los archivos rotados
+            cuota_total_bytes: Máximo total en disco (activo + rotados); None = sin cuota
+            encoding: Codificación del archivo
+        """
+        directorio = os.path.dirname(archivo)
+        if directorio:
+            os.makedirs(directorio, exist_ok=True)
+        super().__init__(archivo, 'a', encoding=encoding, delay=False)
+        self.max_bytes = max_bytes
+        self.diario = diario
+        self.comprimir = comprimir
+        self.cuota_total_bytes = cuota_total_bytes
+
+        self._fecha_archivo = datetime.now().date()
+        self._siguiente_medianoche = self._calcular_medianoche()
+
+        # Hilo de mantenimiento (compresión + cuota)
+        self._pendientes = queue.Queue()
+        self._hilo = threading.Thread(target=self._mantenimiento, name="LogRotacion", daemon=True)
+        self._hilo.start()
+
+        # Rotados de una ejecución anterior que quedaron sin comprimir
+        for ruta in self._archivos_rotados():
+            if not ruta.endswith('.gz'):
+                self._pendientes.put(ruta)
+        self._pendientes.put('')  # solo aplicar la cuota
+
+    def _calcular_medianoche(self) -> float:
+        manana = datetime.combine(self._fecha_archivo + timedelta(days=1), datetime.min.time())
+        return manana.timestamp()
+
+    # ==================== ROTACIÓN ====================
+
+    def shouldRollover(self, record: logging.LogRecord) -> bool:
+        if self.diario and record.created >= self._siguiente_medianoche:
+            return True
+        if self.max_bytes > 0:
+            if self.stream is None:
+                self.stream = self._open()
+            if self.stream.tell() >= self.max_bytes:
+                return True
+        return False
+
+    def doRollover(self) -> None:
+        if self.stream:
+            self.stream.close()
+            self.stream = None
+
+        destino = self._nombre_rotado(self._fecha_archivo)
+        if os.path.exists(self.baseFilename) and os.path.getsize(self.baseFilename) > 0:
+            os.replace(self.baseFilename, destino)
+            self._pendientes.put(destino)
+
+        self._fecha_archivo = datetime.now().date()
+        self._siguiente_medianoche = self._calcular_medianoche()
+        self.stream = self._open()
+
+    def _nombre_rotado(self, fecha) -> str:
+        prefijo = f"{self.baseFilename}.{fecha:%Y%m%d}"
+        indice = 1
+        while os.path.exists(f"{prefijo}.{indice}") or os.path.exists(f"{prefijo}.{indice}.gz"):
+            indice += 1
+        return f"{prefijo}.{indice}"
+
+    def _archivos_rotados(self) -> list:
+        return [r for r in glob.glob(glob.escape(self.baseFilename) + '.*')
+                if not r.endswith('.tmp')]
+
+    # ==================== MANTENIMIENTO (hilo de fondo) ====================
+
+    def _mantenimiento(self) -> None:
+        while True:
+            ruta = self._pendientes.get()
+            if ruta is False:  # cierre
+                break
+            if ruta and self.comprimir and os.path.exists(ruta):
+                self._comprimir(ruta)
+            self._aplicar_cuota()
+
+    def _comprimir(self, ruta: str) -> None:
+        temporal = ruta + '.gz.tmp'
+        try:
+            with open(ruta, 'rb') as origen, gzip.open(temporal, 'wb', compresslevel=6) as destino:
+                shutil.copyfileobj(origen, destino, 1024 * 1024)
+            os.replace(temporal, ruta + '.gz')
+            os.remove(ruta)
+        except OSError as e:
+            # No loguear con el propio logger: podría reentrar en este handler
+            print(f"⚠️ No se pudo comprimir {ruta}: {e}")
+            if os.path.exists(temporal):
+                os.remove(temporal)
+
+    def _aplicar_cuota(self) -> None:
+        if not self.cuota_total_bytes:
+            return
+        try:
+            rotados = []
+            for ruta in self._archivos_rotados():
+                estado = os.stat(ruta)
+                rotados.append((estado.st_mtime, estado.st_size, ruta))
+            total = sum(tam for _, tam, _ in rotados)
+            if os.path.exists(self.baseFilename):
+                total += os.path.getsize(self.baseFilename)
+            # El archivo activo nunca se borra; se desalojan los rotados más viejos
+            for _, tam, ruta in sorted(rotados):
+                if total <= self.cuota_total_bytes:
+                    break
+                os.remove(ruta)
+                total -= tam
+        except OSError as e:
+            print(f"⚠️ Error aplicando cuota de logs: {e}")
+
+    def close(self) -> None:
+        if self._hilo.is_alive():
+            self._pendientes.put(False)
+            self._hilo.join(timeout=10.0)
+        super().close()
+
+
+def crear_manejador_archivo(archivo: str, config_rotacion: Optional[dict] = None) -> logging.Handler:
+    """
+    Crea el handler de archivo según la sección 'logs.rotacion' del JSON.
+
+    Args:
+        archivo: Ruta del archivo de log
+        config_rotacion: {'habilitada', 'max_mb', 'diaria', 'comprimir', 'cuota_total_mb'}
+
+    Returns:
+        ManejadorArchivoRotativo, o FileHandler simple si la rotación está deshabilitada
+    """
+    config_rotacion = config_rotacion or {}
+    if not config_rotacion.get('habilitada', False):
+        return logging.FileHandler(archivo, encoding='utf-8')
+
+    cuota_mb = config_rotacion.get('cuota_total_mb')
+    return ManejadorArchivoRotativo(
+        archivo,
+        max_bytes=int(config_rotacion.get('max_mb', 20) * 1024 * 1024),
+        diario=config_rotacion.get('diaria', True),
+        comprimir=config_rotacion.get('comprimir', True),
+        cuota_total_bytes=int(cuota_mb * 1024 * 1024) if cuota_mb else None
+    )
@@ -2,22 +2,140 @@
 Sistema de logging para debugging y análisis
 """
 
+import atexit
+import json
 import logging
+import logging.handlers
+import queue
+import threading
+import time
 from datetime import datetime
 from typing import Dict
 import os
 
+from utils.log_rotation import crear_manejador_archivo
+
+
+# Listeners activos del modo cola (nombre del logger → QueueListener)
+_LISTENERS = {}
+
+# Nombre de nivel usado por los helpers _log → nivel de logging
+NIVELES_LOG = {'debug': logging.DEBUG, 'info': logging.INFO, 'warning': logging.WARNING, 'error': logging.ERROR}
+
+
+def log_diferido(logger: logging.Logger, mensaje: str, nivel: str = 'info', *args) -> None:
+    """
+    Loguea con formato %% diferido: el mensaje solo se arma si el nivel está habilitado.
+
+    Args:
+        logger: Logger destino (None → print por consola)
+        mensaje: Mensaje o plantilla con %s
+        nivel: 'debug', 'info', 'warning' o 'error'
+        *args: Argumentos de la plantilla
+    """
+    if logger:
+        nivel_num = NIVELES_LOG.get(nivel, logging.INFO)
+        if logger.isEnabledFor(nivel_num):
+            logger.log(nivel_num, mensaje, *args)
+    else:
+        print(mensaje % args if args else mensaje) # Fallback a print
+
+
+class ManejadorColaAcotada(logging.handlers.QueueHandler):
+    """
+    QueueHandler que nunca bloquea al hilo que loguea.
+    
+    - No formatea: el registro se encola tal cual y el listener hace el
+      formato y la E/S (consola/archivo) en su propio hilo
+    - Si la cola está llena, descarta el registro y lo cuenta; cuando vuelve
+      a haber lugar, encola un resumen con la cantidad descartada
+    """
+    
+    def __init__(self, cola: queue.Queue):
+        super().__init__(cola)
+        self.descartados = 0
+        self._lock_descartados = threading.Lock()
+    
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        # Mismo proceso: no hace falta formatear ni copiar en el hilo caliente
+        return record
+    
+    def enqueue(self, record: logging.LogRecord) -> None:
+        if self.descartados:
+            with self._lock_descartados:
+                descartados, self.descartados = self.descartados, 0
+            resumen = logging.LogRecord(
+                record.name, logging.WARNING, __file__, 0,
+                "⚠️ Logging sobrecargado: %d registros descartados", (descartados,), None
+            )
+            try:
+                self.queue.put_nowait(resumen)
+            except queue.Full:
+                with self._lock_descartados:
+                    self.descartados += descartados + 1
+                return
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            with self._lock_descartados:
+                self.descartados += 1
+
+
+def detener_logger(nombre: str = None) -> None:
+    """
+    Detiene el/los listener(s) del modo cola, vaciando los registros pendientes.
+    
+    Args:
+        nombre: Logger a detener (None = todos)
+    """
+    nombres = [nombre] if nombre else list(_LISTENERS)
+    for n in nombres:
+        listener = _LISTENERS.pop(n, None)
+        if listener:
+            listener.stop()
+
+
+atexit.register(detener_logger)
+
+
+def cargar_config_logs(config_path: str) -> Dict:
+    """
+    Lee solo la sección 'logs' del JSON de configuración.
+    Se usa antes de crear el logger (el logger aún no existe para reportar errores).
+    
+    Args:
+        config_path: Ruta del archivo de configuración
+        
+    Returns:
+        Sección 'logs' o {} si no existe / no se puede leer
+    """
+    try:
+        with open(config_path, 'r', encoding='utf-8') as f:
+            return json.load(f).get('logs', {})
+    except (OSError, ValueError) as e:
+        print(f"⚠️ No se pudo leer la sección 'logs' de {config_path}: {e}")
+        return {}
+
 
 def setup_logger(nombre: str = 'PLCSystem', 
                 nivel: int = logging.INFO,
-                archivo_log: str = None) -> logging.Logger:
+                archivo_log: str = None,
+                modo_cola: bool = False,
+                tamano_cola: int = 10000,
+                rotacion: Dict = None) -> logging.Logger:
     """
     Configura el sistema de logging.
     
     Args:
-        nombre: Nombre del logger
+        nombre: Logger a usar
         nivel: Nivel de logging (INFO, DEBUG, etc.)
         archivo_log: Ruta opcional para guardar logs en archivo
+        modo_cola: Si es True, el hilo que loguea solo encola el registro y un
+                   hilo de fondo (QueueListener) formatea y escribe a consola/archivo
+        tamano_cola: Capacidad de la cola (modo_cola); al llenarse se descarta
+                     y se resume en lugar de bloquear
+        rotacion: Sección 'logs.rotacion' del JSON (tamaño/día, gzip, cuota);
+                  None = archivo único sin rotar
         
     Returns:
         Objeto Logger configurado
@@ -35,18 +153,31 @@ def setup_logger(nombre: str = 'PLCSystem',
         datefmt='%Y-%m-%d %H:%M:%S'
     )
     
+    handlers = []
+    
     # Handler para consola
     console_handler = logging.StreamHandler()
     console_handler.setFormatter(formatter)
-    logger.addHandler(console_handler)
+    handlers.append(console_handler)
     
     # Handler para archivo (opcional)
     if archivo_log:
         os.makedirs(os.path.dirname(archivo_log) if os.path.dirname(archivo_log) else '.', 
                    exist_ok=True)
-        file_handler = logging.FileHandler(archivo_log, encoding='utf-8')
+        file_handler = crear_manejador_archivo(archivo_log, rotacion)
         file_handler.setFormatter(formatter)
-        logger.addHandler(file_handler)
+        handlers.append(file_handler)
+    
+    if modo_cola:
+        # El hilo caliente solo encola; formato y E/S van en el hilo del listener
+        cola = queue.Queue(maxsize=tamano_cola)
+        logger.addHandler(ManejadorColaAcotada(cola))
+        listener = logging.handlers.QueueListener(cola, *handlers, respect_handler_level=True)
+        listener.start()
+        _LISTENERS[nombre] = listener
+    else:
+        for handler in handlers:
+            logger.addHandler(handler)
     
     return logger
 
@@ -54,21 +185,26 @@ def setup_logger(nombre: str = 'PLCSystem',
 # <<< FUNCIÓN CORREGIDA >>>
 def log_resultado_procesamiento(resultado: Dict, logger: logging.Logger = None):
     """
-    Registra un resultado de procesamiento DUAL de forma estructurada.
+    Registra un resultado de procesamiento DUAL de forma legible.
+    
+    El bloque completo solo se arma para fallos (QC / parada) o con el logger
+    en DEBUG; el registro por ciclo para análisis es el diario de inspecciones
+    (utils/inspection_journal.py).
     
     Args:
         resultado: Diccionario con el resultado del procesamiento
         logger: Logger a usar (si es None, usa print)
     """
+    codigo_plc = resultado.get('codigo_respuesta_plc', -1)
+    if codigo_plc == 0 and logger and not logger.isEnabledFor(logging.DEBUG):
+        return
+    
     separador = "=" * 70
     
     mensaje = f"\n{separador}\n"
     mensaje += "RESULTADO DE PROCESAMIENTO DUAL → PLC\n"
     mensaje += f"{separador}\n"
     
-    # <<< CORRECCIÓN: Leer 'codigo_respuesta_plc' en lugar de 'success' o 'metadata' >>>
-    codigo_plc = resultado.get('codigo_respuesta_plc', -1)
-    
     if codigo_plc == 2: # PARADA
         mensaje += f"🛑 Estado: PARADA CRÍTICA (Código {codigo_plc})\n"
         mensaje += f"📋 Razón: {resultado.get('log_z', 'Error lateral desconocido')}\n"
@@ -85,23 +221,40 @@ def log_resultado_procesamiento(resultado: Dict, logger: logging.Logger = None):
     mensaje += "\n--- DATOS DE DIAGNÓSTICO ---\n"
     mensaje += f"  • Corrección Z (cálculo): {resultado.get('correccion_z_cmm', 0)} cMM\n"
     mensaje += f"  • Desviación Y (cálculo): {resultado.get('desviacion_y_px', 0)} px\n"
+    if resultado.get('estado_columnas'):
+        mensaje += f"  • Columnas (1→{len(resultado['estado_columnas'])}): {resultado['estado_columnas']}\n"
     mensaje += f"  • Log Lateral (Z): {resultado.get('log_z', 'N/A')}\n"
+    tiempos = resultado.get('tiempos_ms')
+    if tiempos:
+        mensaje += (f"  • Tiempos: lat {tiempos['inferencia_lat']:.1f} ms | "
+                    f"sup {tiempos['inferencia_sup']:.1f} ms | total {tiempos['procesamiento']:.1f} ms\n")
     
     mensaje += f"{separador}\n"
     
     if logger:
         if codigo_plc == 2:
             logger.error(mensaje) # Loguear paradas como ERROR
+        elif codigo_plc == 0:
+            logger.debug(mensaje)
         else:
             logger.info(mensaje)
     else:
         print(mensaje)
 
 
+# Consultas "esperando solicitud" por logger: [cantidad, inicio de la ventana]
+_CONSULTAS_EN_ESPERA = {}
+INTERVALO_RESUMEN_CONSULTAS_S = 10.0
+
+
 def log_estado_plc(controlador_plc, logger: logging.Logger, solicitud_detectada: bool):
     """
     Registra el estado del PLC de forma legible.
     
+    Se llama en cada consulta al PLC: los mensajes usan formato diferido y
+    solo se arman si DEBUG está habilitado. Las consultas sin solicitud no se
+    loguean una por una sino como resumen cada INTERVALO_RESUMEN_CONSULTAS_S.
+    
     Args:
         controlador_plc: Objeto PLCController
         logger: Logger a usar
@@ -113,23 +266,38 @@ def log_estado_plc(controlador_plc, logger: logging.Logger, solicitud_detectada:
         else: print(mensaje)
         return
 
+    if logger and not logger.isEnabledFor(logging.DEBUG):
+        return
+
     try:
         if solicitud_detectada:
-            mensaje = f"🟢 PLC Estado: SOLICITUD RECIBIDA (D28={controlador_plc.VAL_SOLICITUD})"
-        else:
-            # Leer el valor actual para saber por qué no está listo (opcional)
-            # valor_actual = controlador_plc.mc.batchread_wordunits(headdevice=controlador_plc.DEV_TRIGGER, readsize=1)[0]
-            # mensaje = f"⚪ PLC Estado: Esperando (D28={valor_actual})"
-            
-            # Mensaje simple para no saturar el log
-            mensaje = f"⚪ PLC Estado: Esperando solicitud (D28 != {controlador_plc.VAL_SOLICITUD})"
+            if logger:
+                logger.debug("🟢 PLC Estado: SOLICITUD RECIBIDA (D28=%s)", controlador_plc.VAL_SOLICITUD)
+            else:
+                print(f"🟢 PLC Estado: SOLICITUD RECIBIDA (D28={controlador_plc.VAL_SOLICITUD})")
+            return
+        
+        # Esperando: contar y resumir periódicamente para no saturar el log
+        clave = logger.name if logger else None
+        ahora = time.monotonic()
+        muestreo = _CONSULTAS_EN_ESPERA.get(clave)
+        if muestreo is None:
+            muestreo = _CONSULTAS_EN_ESPERA[clave] = [0, ahora]
+        muestreo[0] += 1
+        transcurrido = ahora - muestreo[1]
+        if transcurrido < INTERVALO_RESUMEN_CONSULTAS_S:
+            return
+        cantidad = muestreo[0]
+        muestreo[0], muestreo[1] = 0, ahora
         
         if logger:
-            logger.debug(mensaje) # Usar DEBUG para no saturar el log de INFO
+            logger.debug("⚪ PLC Estado: Esperando solicitud (D28 != %s) - %d consultas en los últimos %.0f s",
+                         controlador_plc.VAL_SOLICITUD, cantidad, transcurrido)
         else:
-            print(mensaje)
+            print(f"⚪ PLC Estado: Esperando solicitud (D28 != {controlador_plc.VAL_SOLICITUD}) - "
+                  f"{cantidad} consultas en los últimos {transcurrido:.0f} s")
             
     except Exception as e:
         mensaje = f"⚠️ Error leyendo estado de PLC: {e}"
         if logger: logger.error(mensaje)
-        else: print(mensaje)
\ No newline at end of file
+        else: print(mensaje)
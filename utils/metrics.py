@@ -0,0 +1,319 @@
+"""
+Métricas de ejecución del sistema
+Contadores, medidores e histogramas de buckets fijos, exportados en formato
+de texto Prometheus por HTTP local y como instantánea JSON periódica en disco
+"""
+
+import json
+import os
+import threading
+import time
+from bisect import bisect_left
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, Optional, Sequence, Tuple
+
+from utils.logger_prueba import log_diferido
+
+
+# Buckets por defecto para latencias en segundos (1 ms .. 10 s)
+BUCKETS_LATENCIA_S = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+def _formatear_etiquetas(etiquetas: Tuple[Tuple[str, str], ...], extra: str = '') -> str:
+    partes = [f'{k}="{v}"' for k, v in etiquetas]
+    if extra:
+        partes.append(extra)
+    return '{' + ','.join(partes) + '}' if partes else ''
+
+
+class Contador:
+    """Valor monótono creciente (eventos, errores, frames)"""
+    tipo = 'counter'
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.valor = 0
+
+    def inc(self, n: float = 1) -> None:
+        with self._lock:
+            self.valor += n
+
+    def exportar(self, nombre: str, etiquetas) -> list:
+        return [f'{nombre}{_formatear_etiquetas(etiquetas)} {self.valor}']
+
+    def instantanea(self):
+        return self.valor
+
+
+class Medidor:
+    """Valor instantáneo que sube y baja (conexión, tamaño de cola)"""
+    tipo = 'gauge'
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.valor = 0.0
+
+    def set(self, valor: float) -> None:
+        self.valor = valor
+
+    def inc(self, n: float = 1) -> None:
+        with self._lock:
+            self.valor += n
+
+    def dec(self, n: float = 1) -> None:
+        with self._lock:
+            self.valor -= n
+
+    def exportar(self, nombre: str, etiquetas) -> list:
+        return [f'{nombre}{_formatear_etiquetas(etiquetas)} {self.valor}']
+
+    def instantanea(self):
+        return self.valor
+
+
+class Histograma:
+    """
+    Distribución con buckets fijos (límites superiores).
+    observar() es una búsqueda binaria y dos sumas: barato para el ciclo caliente.
+    """
+    tipo = 'histogram'
+
+    def __init__(self, buckets: Sequence[float] = BUCKETS_LATENCIA_S):
+        self._lock = threading.Lock()
+        self.buckets = tuple(sorted(buckets))
+        self.cuentas = [0] * (len(self.buckets) + 1)  # último = +Inf
+        self.suma = 0.0
+        self.total = 0
+
+    def observar(self, valor: float) -> None:
+        indice = bisect_left(self.buckets, valor)
+        with self._lock:
+            self.cuentas[indice] += 1
+            self.suma += valor
+            self.total += 1
+
+    def cronometrar(self):
+        """Context manager que observa la duración del bloque en segundos"""
+        return _Cronometro(self)
+
+    def exportar(self, nombre: str, etiquetas) -> list:
+        lineas = []
+        with self._lock:
+            cuentas, suma, total = list(self.cuentas), self.suma, self.total
+        acumulado = 0
+        for limite, cuenta in zip(self.buckets, cuentas):
+            acumulado += cuenta
+            le = f'le="{limite}"'
+            lineas.append(f'{nombre}_bucket{_formatear_etiquetas(etiquetas, le)} {acumulado}')
+        le = 'le="+Inf"'
+        lineas.append(f'{nombre}_bucket{_formatear_etiquetas(etiquetas, le)} {total}')
+        lineas.append(f'{nombre}_sum{_formatear_etiquetas(etiquetas)} {suma}')
+        lineas.append(f'{nombre}_count{_formatear_etiquetas(etiquetas)} {total}')
+        return lineas
+
+    def instantanea(self):
+        with self._lock:
+            return {
+                'total': self.total,
+                'suma': round(self.suma, 6),
+                'promedio': round(self.suma / self.total, 6) if self.total else 0.0,
+                'buckets': {str(b): c for b, c in zip(self.buckets + ('+Inf',), self.cuentas)},
+            }
+
+
+class _Cronometro:
+    __slots__ = ('histograma', 't_inicio')
+
+    def __init__(self, histograma: Histograma):
+        self.histograma = histograma
+
+    def __enter__(self):
+        self.t_inicio = time.perf_counter()
+        return self
+
+    def __exit__(self, *_):
+        self.histograma.observar(time.perf_counter() - self.t_inicio)
+        return False
+
+
+class RegistroMetricas:
+    """
+    Registro de métricas con nombre + etiquetas.
+
+    Las métricas se crean una vez (get-or-create) y el código caliente guarda
+    la referencia; actualizar cuesta un lock y una suma.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._familias = {}  # nombre → (tipo, ayuda, {etiquetas: metrica})
+
+    def _obtener(self, clase, nombre: str, ayuda: str, etiquetas: Optional[Dict[str, str]], **kwargs):
+        clave = tuple(sorted((etiquetas or {}).items()))
+        with self._lock:
+            familia = self._familias.get(nombre)
+            if familia is None:
+                familia = (clase.tipo, ayuda, {})
+                self._familias[nombre] = familia
+            elif familia[0] != clase.tipo:
+                raise ValueError(f"La métrica '{nombre}' ya existe como {familia[0]}")
+            metrica = familia[2].get(clave)
+            if metrica is None:
+                metrica = clase(**kwargs)
+                familia[2][clave] = metrica
+            return metrica
+
+    def contador(self, nombre: str, ayuda: str = '', etiquetas: Optional[Dict[str, str]] = None) -> Contador:
+        return self._obtener(Contador, nombre, ayuda, etiquetas)
+
+    def medidor(self, nombre: str, ayuda: str = '', etiquetas: Optional[Dict[str, str]] = None) -> Medidor:
+        return self._obtener(Medidor, nombre, ayuda, etiquetas)
+
+    def histograma(self, nombre: str, ayuda: str = '', etiquetas: Optional[Dict[str, str]] = None,
+                   buckets: Sequence[float] = BUCKETS_LATENCIA_S) -> Histograma:
+        return self._obtener(Histograma, nombre, ayuda, etiquetas, buckets=buckets)
+
+    def exportar_prometheus(self) -> str:
+        """Formato de exposición de texto Prometheus (version 0.0.4)"""
+        with self._lock:
+            familias = [(n, t, a, list(m.items())) for n, (t, a, m) in sorted(self._familias.items())]
+        lineas = []
+        for nombre, tipo, ayuda, metricas in familias:
+            if ayuda:
+                lineas.append(f'# HELP {nombre} {ayuda}')
+            lineas.append(f'# TYPE {nombre} {tipo}')
+            for etiquetas, metrica in metricas:
+                lineas.extend(metrica.exportar(nombre, etiquetas))
+        return '\n'.join(lineas) + '\n'
+
+    def instantanea(self) -> Dict:
+        """Todas las métricas como diccionario serializable a JSON"""
+        with self._lock:
+            familias = [(n, t, list(m.items())) for n, (t, a, m) in sorted(self._familias.items())]
+        datos = {'timestamp': time.time(), 'metricas': {}}
+        for nombre, tipo, metricas in familias:
+            datos['metricas'][nombre] = {
+                'tipo': tipo,
+                'valores': [{'etiquetas': dict(etiquetas), 'valor': m.instantanea()} for etiquetas, m in metricas],
+            }
+        return datos
+
+
+# Registro global del proceso (lo usan cámara, visión, PLC y motor)
+METRICAS = RegistroMetricas()
+
+
+class ExportadorMetricas:
+    """
+    Exporta un RegistroMetricas:
+    - HTTP local: /metrics (texto Prometheus) y /metrics.json
+    - Instantánea JSON periódica en disco (escritura atómica)
+    """
+
+    def __init__(self, config: Optional[Dict] = None, registro: RegistroMetricas = METRICAS, logger=None):
+        """
+        Args:
+            config: Sección 'metricas' del JSON
+            registro: Registro a exportar
+            logger: Instancia del logger
+        """
+        config = config or {}
+        self.registro = registro
+        self.logger = logger
+        self.host = config.get('host', '127.0.0.1')
+        self.puerto = config.get('puerto', 9100)
+        self.archivo_json = config.get('archivo_json', 'logs/metricas.json')
+        self.intervalo_json_s = config.get('intervalo_json_s', 30)
+
+        self._servidor = None
+        self._detener = threading.Event()
+        self._hilos = []
+
+    def iniciar(self) -> None:
+        if self.puerto:
+            try:
+                self._servidor = ThreadingHTTPServer((self.host, self.puerto), _crear_manejador(self.registro))
+                self._servidor.daemon_threads = True
+                hilo = threading.Thread(target=self._servidor.serve_forever, name="MetricasHTTP", daemon=True)
+                hilo.start()
+                self._hilos.append(hilo)
+                self._log(f"📈 Métricas en http://{self.host}:{self.puerto}/metrics")
+            except OSError as e:
+                self._log(f"❌ No se pudo iniciar el endpoint de métricas en {self.host}:{self.puerto}: {e}", 'error')
+                self._servidor = None
+
+        if self.archivo_json and self.intervalo_json_s:
+            hilo = threading.Thread(target=self._bucle_json, name="MetricasJSON", daemon=True)
+            hilo.start()
+            self._hilos.append(hilo)
+
+    def detener(self) -> None:
+        self._detener.set()
+        if self._servidor:
+            self._servidor.shutdown()
+            self._servidor.server_close()
+            self._servidor = None
+        if self.archivo_json and self.intervalo_json_s:
+            self.escribir_json()
+
+    def escribir_json(self) -> None:
+        """Escribe la instantánea actual (tmp + replace para no dejar archivos a medias)"""
+        try:
+            directorio = os.path.dirname(self.archivo_json)
+            if directorio:
+                os.makedirs(directorio, exist_ok=True)
+            temporal = self.archivo_json + '.tmp'
+            with open(temporal, 'w', encoding='utf-8') as f:
+                json.dump(self.registro.instantanea(), f, ensure_ascii=False)
+            os.replace(temporal, self.archivo_json)
+        except OSError as e:
+            self._log(f"⚠️ No se pudo escribir {self.archivo_json}: {e}", 'warning')
+
+    def _bucle_json(self):
+        while not self._detener.wait(self.intervalo_json_s):
+            self.escribir_json()
+
+    def _log(self, mensaje: str, nivel: str = 'info', *args):
+        """Helper para loggear (formato %% diferido)"""
+        log_diferido(self.logger, mensaje, nivel, *args)
+
+
+def iniciar_exportacion_metricas(config: Dict, logger=None) -> Optional[ExportadorMetricas]:
+    """
+    Arranca el exportador si 'metricas.habilitado' es true en el JSON.
+
+    Returns:
+        ExportadorMetricas iniciado, o None si está deshabilitado
+    """
+    config_metricas = config.get('metricas', {})
+    if not config_metricas.get('habilitado', False):
+        return None
+    exportador = ExportadorMetricas(config_metricas, METRICAS, logger)
+    exportador.iniciar()
+    return exportador
+
+
+def _crear_manejador(registro: RegistroMetricas):
+    class ManejadorMetricas(BaseHTTPRequestHandler):
+        def log_message(self, formato, *args):
+            pass
+
+        def do_GET(self):
+            ruta = self.path.split('?', 1)[0]
+            if ruta == '/metrics':
+                cuerpo = registro.exportar_prometheus().encode('utf-8')
+                tipo = 'text/plain; version=0.0.4; charset=utf-8'
+            elif ruta == '/metrics.json':
+                cuerpo = json.dumps(registro.instantanea(), ensure_ascii=False).encode('utf-8')
+                tipo = 'application/json; charset=utf-8'
+            else:
+                self.send_response(404)
+                self.end_headers()
+                return
+            self.send_response(200)
+            self.send_header('Content-Type', tipo)
+            self.send_header('Content-Length', str(len(cuerpo)))
+            self.end_headers()
+            self.wfile.write(cuerpo)
+
+    return ManejadorMetricas
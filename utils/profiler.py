@@ -0,0 +1,354 @@
+"""
+Perfilado bajo demanda de los ciclos de inspección
+Activa cProfile o un perfilador por muestreo sobre los próximos N ciclos
+procesados, sin reiniciar el sistema. Se dispara desde la interfaz, con la
+señal SIGUSR1 (Linux) o creando un archivo de control (Windows incluido):
+
+    echo 50 muestreo > logs/perfilar.txt
+    kill -USR1 <pid>
+
+Cada sesión se guarda en <directorio>/perfil_AAAAMMDD_HHMMSS_<modo>.*:
+- cprofile: .prof (pstats, abrir con snakeviz) + .txt (top por tiempo acumulado)
+- muestreo: .folded (pilas colapsadas, para flamegraph/speedscope)
+- ambos: .json con los metadatos de cada ciclo perfilado
+"""
+
+import cProfile
+import io
+import json
+import os
+import pstats
+import signal
+import sys
+import threading
+import time
+from collections import Counter
+from typing import Dict, List, Optional
+
+from utils.logger_prueba import log_diferido
+
+
+MODOS = ('cprofile', 'muestreo')
+
+
+class PerfiladorCiclos:
+    """
+    Perfilador de ciclos de inspección, apagado hasta que se lo solicita.
+
+    El motor llama iniciar_ciclo() / finalizar_ciclo() en cada ciclo con
+    solicitud; sin sesión activa ambas vuelven tras comparar un atributo.
+
+    - cprofile: perfil determinista del hilo del motor (solo durante los ciclos)
+    - muestreo: un hilo lee la pila del motor cada 'intervalo_muestreo_ms'
+      (sys._current_frames); sobrecarga baja, apto para producción
+    """
+
+    def __init__(self,
+                 directorio: str = 'logs/perfiles',
+                 ciclos: int = 50,
+                 modo: str = 'muestreo',
+                 intervalo_muestreo_ms: float = 5.0,
+                 archivo_control: Optional[str] = 'logs/perfilar.txt',
+                 intervalo_control_s: float = 1.0,
+                 logger=None):
+        """
+        Args:
+            directorio: Carpeta de salida de los perfiles
+            ciclos: Ciclos a perfilar por sesión si la solicitud no lo indica
+            modo: 'cprofile' o 'muestreo' si la solicitud no lo indica
+            intervalo_muestreo_ms: Período del perfilador por muestreo
+            archivo_control: Archivo cuya aparición solicita una sesión (None = no vigilar)
+            intervalo_control_s: Cada cuánto se busca el archivo de control
+            logger: Instancia del logger
+        """
+        if modo not in MODOS:
+            raise ValueError(f"Modo de perfilado desconocido: {modo}")
+        self.directorio = directorio
+        self.ciclos_por_defecto = max(1, int(ciclos))
+        self.modo_por_defecto = modo
+        self.intervalo_muestreo_s = max(0.001, intervalo_muestreo_ms / 1000.0)
+        self.archivo_control = archivo_control
+        self.intervalo_control_s = intervalo_control_s
+        self.logger = logger
+
+        # Solicitud pendiente (ciclos, modo, origen): asignación atómica, se
+        # puede escribir desde un handler de señal sin tomar locks
+        self._pendiente = None
+        self._sesion = None
+        self._en_ciclo = False
+        self._t_ciclo = 0.0
+
+        self._detener = threading.Event()
+        self._hilo_control = None
+        self._escritores: List[threading.Thread] = []
+        self.sesiones = 0
+
+    # ==================== SOLICITUD (cualquier hilo) ====================
+
+    def solicitar(self, ciclos: Optional[int] = None, modo: Optional[str] = None, origen: str = 'api') -> None:
+        """
+        Pide perfilar los próximos 'ciclos' ciclos. Empieza en el siguiente
+        ciclo con solicitud; si ya hay una sesión en curso, se ignora (una
+        solicitud todavía no iniciada se reemplaza por la nueva).
+        """
+        if self._sesion is not None:
+            self._log(f"⚠️ Perfilado en curso: se ignora la solicitud ({origen})", 'warning')
+            return
+        modo = modo or self.modo_por_defecto
+        if modo not in MODOS:
+            self._log(f"⚠️ Modo de perfilado desconocido '{modo}', se usa '{self.modo_por_defecto}'", 'warning')
+            modo = self.modo_por_defecto
+        self._pendiente = (max(1, int(ciclos or self.ciclos_por_defecto)), modo, origen)
+
+    @property
+    def activo(self) -> bool:
+        return self._sesion is not None or self._pendiente is not None
+
+    def iniciar(self) -> None:
+        """Arranca la vigilancia del archivo de control"""
+        if self.archivo_control and self._hilo_control is None:
+            self._hilo_control = threading.Thread(target=self._vigilar_control, name="PerfiladorControl", daemon=True)
+            self._hilo_control.start()
+
+    def detener(self) -> None:
+        """Detiene la vigilancia, cierra la sesión en curso (parcial) y espera las escrituras"""
+        self._detener.set()
+        if self._sesion is not None:
+            self._en_ciclo = False
+            self._cerrar_sesion(completa=False)
+        for hilo in self._escritores:
+            hilo.join(timeout=10.0)
+        if self._hilo_control:
+            self._hilo_control.join(timeout=2.0)
+
+    # ==================== CICLO (hilo del motor) ====================
+
+    def iniciar_ciclo(self) -> None:
+        """Inicio de un ciclo con solicitud"""
+        if self._sesion is None:
+            if self._pendiente is None:
+                return
+            pendiente, self._pendiente = self._pendiente, None
+            self._abrir_sesion(*pendiente)
+            if self._sesion is None:
+                return
+
+        self._t_ciclo = time.perf_counter()
+        if self._sesion['perfil'] is not None:
+            self._sesion['perfil'].enable()
+        self._en_ciclo = True
+
+    def finalizar_ciclo(self, ciclo: int, resultado: Optional[Dict] = None) -> None:
+        """Fin del ciclo: agrega sus metadatos y cierra la sesión al llegar a N ciclos"""
+        sesion = self._sesion
+        if sesion is None or not self._en_ciclo:
+            return
+        self._en_ciclo = False
+        if sesion['perfil'] is not None:
+            sesion['perfil'].disable()
+
+        datos = {'ciclo': ciclo, 'duracion_ms': round((time.perf_counter() - self._t_ciclo) * 1000.0, 3)}
+        if resultado:
+            datos['codigo'] = resultado.get('codigo_respuesta_plc')
+            datos['filas'] = resultado.get('filas')
+            if resultado.get('tiempos_ms'):
+                datos['tiempos_ms'] = {k: round(v, 3) for k, v in resultado['tiempos_ms'].items()}
+        sesion['ciclos'].append(datos)
+
+        if len(sesion['ciclos']) >= sesion['objetivo']:
+            self._cerrar_sesion(completa=True)
+
+    # ==================== SESIÓN ====================
+
+    def _abrir_sesion(self, ciclos: int, modo: str, origen: str) -> None:
+        sesion = {
+            'modo': modo,
+            'origen': origen,
+            'objetivo': ciclos,
+            'inicio': time.time(),
+            'ciclos': [],
+            'perfil': None,
+            'pilas': Counter(),
+            'hojas': Counter(),
+            'muestras': 0,
+            'hilo_muestreo': None,
+            'fin_muestreo': threading.Event(),
+        }
+        if modo == 'cprofile':
+            sesion['perfil'] = cProfile.Profile()
+        else:
+            hilo = threading.Thread(target=self._bucle_muestreo, args=(sesion, threading.get_ident()),
+                                    name="PerfiladorMuestreo", daemon=True)
+            sesion['hilo_muestreo'] = hilo
+            hilo.start()
+        self._sesion = sesion
+        self._log(f"🔬 Perfilando {ciclos} ciclos ({modo}, solicitado por {origen})")
+
+    def _cerrar_sesion(self, completa: bool) -> None:
+        sesion, self._sesion = self._sesion, None
+        sesion['fin'] = time.time()
+        sesion['completa'] = completa
+        if sesion['hilo_muestreo'] is not None:
+            sesion['fin_muestreo'].set()
+            sesion['hilo_muestreo'].join(timeout=1.0)
+        # La escritura (pstats, JSON) no se hace en el hilo del motor
+        self._escritores = [h for h in self._escritores if h.is_alive()]
+        escritor = threading.Thread(target=self._escribir_sesion, args=(sesion,), name="PerfiladorEscritura")
+        self._escritores.append(escritor)
+        escritor.start()
+
+    def _bucle_muestreo(self, sesion: Dict, ident: int) -> None:
+        """Toma la pila del hilo del motor mientras está dentro de un ciclo"""
+        pilas = sesion['pilas']
+        hojas = sesion['hojas']
+        fin = sesion['fin_muestreo']
+        while not fin.wait(self.intervalo_muestreo_s):
+            if not self._en_ciclo:
+                continue
+            marco = sys._current_frames().get(ident)
+            if marco is None:
+                continue
+            hojas[f"{marco.f_code.co_filename}:{marco.f_lineno} ({marco.f_code.co_name})"] += 1
+            pila = []
+            while marco is not None:
+                codigo = marco.f_code
+                pila.append(f"{os.path.basename(codigo.co_filename)}:{codigo.co_name}")
+                marco = marco.f_back
+            pilas[';'.join(reversed(pila))] += 1
+            sesion['muestras'] += 1
+
+    def _escribir_sesion(self, sesion: Dict) -> None:
+        try:
+            os.makedirs(self.directorio, exist_ok=True)
+            base = os.path.join(self.directorio,
+                                f"perfil_{time.strftime('%Y%m%d_%H%M%S', time.localtime(sesion['inicio']))}"
+                                f"_{sesion['modo']}")
+            duraciones = sorted(c['duracion_ms'] for c in sesion['ciclos'])
+            metadatos = {
+                'modo': sesion['modo'],
+                'origen': sesion['origen'],
+                'inicio': time.strftime('%Y-%m-%d %H:%M:%S', time.localtime(sesion['inicio'])),
+                'duracion_s': round(sesion['fin'] - sesion['inicio'], 3),
+                'completa': sesion['completa'],
+                'ciclos_solicitados': sesion['objetivo'],
+                'ciclos_perfilados': len(sesion['ciclos']),
+                'duracion_ciclo_ms': {
+                    'p50': duraciones[len(duraciones) // 2],
+                    'max': duraciones[-1],
+                    'media': round(sum(duraciones) / len(duraciones), 3),
+                } if duraciones else {},
+                'python': sys.version.split()[0],
+                'plataforma': sys.platform,
+                'ciclos': sesion['ciclos'],
+            }
+            archivos = [base + '.json']
+
+            if sesion['perfil'] is not None:
+                sesion['perfil'].dump_stats(base + '.prof')
+                texto = io.StringIO()
+                pstats.Stats(sesion['perfil'], stream=texto).sort_stats('cumulative').print_stats(40)
+                with open(base + '.txt', 'w', encoding='utf-8') as f:
+                    f.write(texto.getvalue())
+                archivos += [base + '.prof', base + '.txt']
+            else:
+                with open(base + '.folded', 'w', encoding='utf-8') as f:
+                    for pila, cuenta in sesion['pilas'].most_common():
+                        f.write(f"{pila} {cuenta}\n")
+                archivos.append(base + '.folded')
+                metadatos['muestras'] = sesion['muestras']
+                metadatos['intervalo_muestreo_ms'] = round(self.intervalo_muestreo_s * 1000.0, 3)
+                metadatos['top_lineas'] = [
+                    {'linea': linea, 'muestras': n, 'porcentaje': round(100.0 * n / sesion['muestras'], 1)}
+                    for linea, n in sesion['hojas'].most_common(25)
+                ] if sesion['muestras'] else []
+
+            with open(base + '.json', 'w', encoding='utf-8') as f:
+                json.dump(metadatos, f, indent=2, ensure_ascii=False)
+            self.sesiones += 1
+            self._log(f"🔬 Perfil guardado ({len(sesion['ciclos'])} ciclos): {', '.join(archivos)}")
+        except Exception as e:
+            self._log(f"❌ No se pudo guardar el perfil: {e}", 'error')
+
+    # ==================== ARCHIVO DE CONTROL ====================
+
+    def _vigilar_control(self) -> None:
+        """
+        Busca el archivo de control; si aparece lo consume y solicita una
+        sesión. Contenido opcional: "<ciclos> [cprofile|muestreo]".
+        """
+        while not self._detener.wait(self.intervalo_control_s):
+            if not os.path.exists(self.archivo_control):
+                continue
+            try:
+                with open(self.archivo_control, 'r', encoding='utf-8') as f:
+                    partes = f.read().split()
+                os.remove(self.archivo_control)
+            except OSError as e:
+                self._log(f"⚠️ No se pudo leer el archivo de control {self.archivo_control}: {e}", 'warning')
+                continue
+            ciclos = int(partes[0]) if partes and partes[0].isdigit() else None
+            modo = next((p for p in partes if p in MODOS), None)
+            self.solicitar(ciclos, modo, origen='archivo')
+
+    def _log(self, mensaje: str, nivel: str = 'info', *args):
+        """Helper para loggear (formato %% diferido)"""
+        log_diferido(self.logger, mensaje, nivel, *args)
+
+
+class PerfiladorNulo:
+    """Perfilado deshabilitado: mismas firmas, sin trabajo"""
+    activo = False
+
+    def solicitar(self, ciclos: Optional[int] = None, modo: Optional[str] = None, origen: str = 'api') -> None:
+        pass
+
+    def iniciar(self) -> None:
+        pass
+
+    def detener(self) -> None:
+        pass
+
+    def iniciar_ciclo(self) -> None:
+        pass
+
+    def finalizar_ciclo(self, ciclo: int, resultado: Optional[Dict] = None) -> None:
+        pass
+
+
+PERFILADOR_NULO = PerfiladorNulo()
+
+
+def instalar_senal(perfilador) -> bool:
+    """
+    Solicita una sesión al recibir SIGUSR1 (solo POSIX, llamar desde el hilo principal).
+
+    Returns:
+        True si se instaló el handler
+    """
+    if perfilador is PERFILADOR_NULO or not hasattr(signal, 'SIGUSR1'):
+        return False
+    signal.signal(signal.SIGUSR1, lambda *_: perfilador.solicitar(origen='señal'))
+    return True
+
+
+def crear_perfilador_desde_config(config: Dict, logger=None):
+    """
+    Crea el perfilador según la sección 'perfilado' del JSON.
+
+    Returns:
+        PerfiladorCiclos en marcha si 'perfilado.habilitado' es true, PERFILADOR_NULO si no
+    """
+    config_perfilado = config.get('perfilado', {})
+    if not config_perfilado.get('habilitado', False):
+        return PERFILADOR_NULO
+    perfilador = PerfiladorCiclos(
+        directorio=config_perfilado.get('directorio', 'logs/perfiles'),
+        ciclos=config_perfilado.get('ciclos', 50),
+        modo=config_perfilado.get('modo', 'muestreo'),
+        intervalo_muestreo_ms=config_perfilado.get('intervalo_muestreo_ms', 5.0),
+        archivo_control=config_perfilado.get('archivo_control', 'logs/perfilar.txt'),
+        intervalo_control_s=config_perfilado.get('intervalo_control_s', 1.0),
+        logger=logger
+    )
+    perfilador.iniciar()
+    return perfilador
@@ -0,0 +1,82 @@
+"""
+Vista acotada de resultados para un tk.Text
+Mantiene solo los últimos N resultados con costo de memoria y redibujado constante
+"""
+
+import tkinter as tk
+from collections import deque
+
+
+class VistaResultadosAcotada:
+    """
+    Buffer circular de resultados mostrado en un widget Text.
+
+    - agregar() solo encola el texto; las inserciones se agrupan y se hacen
+      en un único insert() cada 'intervalo_ms'
+    - El widget conserva como máximo 'max_resultados' bloques; los más viejos
+      se recortan por lotes de 'lote_recorte' (un solo delete() por lote)
+    - Solo hace see(END) si el operador no se desplazó hacia arriba
+    """
+
+    def __init__(self,
+                 root,
+                 text_widget: tk.Text,
+                 max_resultados: int = 200,
+                 lote_recorte: int = 50,
+                 intervalo_ms: int = 250):
+        """
+        Args:
+            root: Ventana Tk (para root.after)
+            text_widget: Widget Text donde mostrar los resultados
+            max_resultados: Cantidad de resultados que se conservan
+            lote_recorte: Resultados extra tolerados antes de recortar en lote
+            intervalo_ms: Periodo de agrupación de inserciones
+        """
+        self.root = root
+        self.text = text_widget
+        self.max_resultados = max(1, int(max_resultados))
+        self.lote_recorte = max(1, int(lote_recorte))
+        self.intervalo_ms = intervalo_ms
+
+        # Últimos N resultados (texto) y líneas de cada bloque presente en el widget
+        self.resultados = deque(maxlen=self.max_resultados)
+        self._lineas_bloques = deque()
+        self._pendientes = []
+        self._after_id = None
+
+    def agregar(self, texto: str) -> None:
+        """Encola un resultado para la próxima actualización del widget"""
+        self.resultados.append(texto)
+        self._pendientes.append(texto)
+        # Si se acumulan más pendientes que el máximo, los más viejos nunca se verían
+        if len(self._pendientes) > self.max_resultados:
+            del self._pendientes[:-self.max_resultados]
+        if self._after_id is None:
+            self._after_id = self.root.after(self.intervalo_ms, self._volcar)
+
+    def limpiar(self) -> None:
+        self.resultados.clear()
+        self._lineas_bloques.clear()
+        self._pendientes.clear()
+        self.text.delete('1.0', tk.END)
+
+    def _volcar(self) -> None:
+        """Inserta los pendientes en una sola operación y recorta si corresponde"""
+        self._after_id = None
+        if not self._pendientes:
+            return
+
+        en_el_final = self.text.yview()[1] >= 0.999
+
+        self.text.insert(tk.END, ''.join(self._pendientes))
+        for texto in self._pendientes:
+            self._lineas_bloques.append(texto.count('\n'))
+        self._pendientes.clear()
+
+        exceso = len(self._lineas_bloques) - self.max_resultados
+        if exceso >= self.lote_recorte:
+            lineas = sum(self._lineas_bloques.popleft() for _ in range(exceso))
+            self.text.delete('1.0', f'{lineas + 1}.0')
+
+        if en_el_final:
+            self.text.see(tk.END)
@@ -0,0 +1,254 @@
+"""
+Trazado por ciclo de inspección
+Duración de cada etapa (captura, PLC, inferencias, validación, escritura...)
+con reloj monotónico en ns, percentiles móviles por etapa y detalle completo
+de los ciclos más lentos
+"""
+
+import heapq
+import json
+import os
+import threading
+import time
+from array import array
+from typing import Dict, List
+
+from utils.logger_prueba import log_diferido
+
+
+# Etapas del ciclo (índices fijos: el ciclo caliente no usa diccionarios)
+ETAPAS = (
+    'captura',
+    'plc_lectura',
+    'inferencia_lat',
+    'inferencia_sup',
+    'postproceso',
+    'validacion',
+    'escritura_plc',
+    'registro',
+    'publicacion',
+)
+CAPTURA, PLC_LECTURA, INFERENCIA_LAT, INFERENCIA_SUP, POSTPROCESO, \
+    VALIDACION, ESCRITURA_PLC, REGISTRO, PUBLICACION = range(len(ETAPAS))
+
+
+class Trazador:
+    """
+    Acumula la duración por etapa de cada ciclo.
+
+    Uso en el ciclo caliente:
+        t = trazador.iniciar_ciclo()
+        ...captura...
+        t = trazador.etapa(CAPTURA, t)
+        ...inferencia...
+        t = trazador.etapa(INFERENCIA_LAT, t)
+        trazador.finalizar_ciclo(numero_ciclo)
+
+    El registro del ciclo y las ventanas por etapa están preasignados: medir
+    cuesta un perf_counter_ns() y una resta.
+    """
+
+    def __init__(self,
+                 ventana_ciclos: int = 1000,
+                 ciclos_lentos: int = 10,
+                 reporte_cada_ciclos: int = 0,
+                 logger=None):
+        """
+        Args:
+            ventana_ciclos: Ciclos recientes sobre los que se calculan percentiles
+            ciclos_lentos: Cantidad de ciclos más lentos que se guardan completos
+            reporte_cada_ciclos: Loguear percentiles cada N ciclos (0 = nunca)
+            logger: Instancia del logger
+        """
+        self.ventana_ciclos = max(1, int(ventana_ciclos))
+        self.ciclos_lentos = max(0, int(ciclos_lentos))
+        self.reporte_cada_ciclos = reporte_cada_ciclos
+        self.logger = logger
+
+        n = len(ETAPAS)
+        self._actual = array('q', [0] * n)
+        self._ceros = array('q', [0] * n)
+        self._t_inicio_ns = 0
+        self._t_inicio_epoch = 0.0
+
+        # Ventanas circulares: una fila por etapa + total
+        self._ventanas = [array('q', [0] * self.ventana_ciclos) for _ in range(n + 1)]
+        self._indice = 0
+        self._llenos = 0
+        self.ciclos = 0
+
+        # Min-heap (total_ns, ciclo, epoch, duraciones) con los más lentos
+        self._lentos = []
+        self._lock = threading.Lock()
+
+    # ==================== CICLO CALIENTE ====================
+
+    def iniciar_ciclo(self) -> int:
+        """Comienza un ciclo. Retorna el instante inicial (ns) para encadenar etapa()"""
+        self._actual[:] = self._ceros
+        self._t_inicio_epoch = time.time()
+        self._t_inicio_ns = time.perf_counter_ns()
+        return self._t_inicio_ns
+
+    def etapa(self, indice: int, t_desde_ns: int) -> int:
+        """
+        Suma a la etapa el tiempo transcurrido desde t_desde_ns.
+
+        Returns:
+            Instante actual (ns), para usarlo como inicio de la siguiente etapa
+        """
+        ahora = time.perf_counter_ns()
+        self._actual[indice] += ahora - t_desde_ns
+        return ahora
+
+    def agregar(self, indice: int, duracion_ns: int) -> None:
+        """Suma una duración ya medida (ej. la reportada por el VisionProcessor)"""
+        self._actual[indice] += duracion_ns
+
+    def descartar_ciclo(self) -> None:
+        """El ciclo no llegó a procesarse (sin solicitud): no se contabiliza"""
+        self._t_inicio_ns = 0
+
+    def finalizar_ciclo(self, ciclo: int) -> None:
+        """Cierra el ciclo y lo incorpora a ventanas y ciclos lentos"""
+        if not self._t_inicio_ns:
+            return
+        total = time.perf_counter_ns() - self._t_inicio_ns
+        self._t_inicio_ns = 0
+
+        with self._lock:
+            i = self._indice
+            for etapa, duracion in enumerate(self._actual):
+                self._ventanas[etapa][i] = duracion
+            self._ventanas[-1][i] = total
+            self._indice = (i + 1) % self.ventana_ciclos
+            self._llenos = min(self._llenos + 1, self.ventana_ciclos)
+            self.ciclos += 1
+
+            if self.ciclos_lentos:
+                if len(self._lentos) < self.ciclos_lentos:
+                    heapq.heappush(self._lentos, (total, ciclo, self._t_inicio_epoch, tuple(self._actual)))
+                elif total > self._lentos[0][0]:
+                    heapq.heapreplace(self._lentos, (total, ciclo, self._t_inicio_epoch, tuple(self._actual)))
+
+        if self.reporte_cada_ciclos and self.ciclos % self.reporte_cada_ciclos == 0:
+            self._reportar()
+
+    # ==================== CONSULTA ====================
+
+    def percentiles(self) -> Dict[str, Dict[str, float]]:
+        """
+        Percentiles de la ventana reciente por etapa (en ms).
+
+        Returns:
+            {etapa: {'p50', 'p95', 'p99', 'max'}} incluyendo 'total'
+        """
+        with self._lock:
+            # Antes de llenar la ventana solo son válidas las primeras n posiciones
+            n = self._llenos
+            ventanas = [sorted(v[:n]) for v in self._ventanas]
+        resultado = {}
+        for nombre, valores in zip(ETAPAS + ('total',), ventanas):
+            if not valores:
+                continue
+            resultado[nombre] = {
+                'p50': _percentil_ms(valores, 0.50),
+                'p95': _percentil_ms(valores, 0.95),
+                'p99': _percentil_ms(valores, 0.99),
+                'max': round(valores[-1] / 1e6, 3),
+            }
+        return resultado
+
+    def ciclos_mas_lentos(self) -> List[Dict]:
+        """Detalle completo (ms por etapa) de los ciclos más lentos, del peor al mejor"""
+        with self._lock:
+            lentos = sorted(self._lentos, reverse=True)
+        return [{
+            'ciclo': ciclo,
+            'inicio': time.strftime('%Y-%m-%d %H:%M:%S', time.localtime(epoch)),
+            'total_ms': round(total / 1e6, 3),
+            'etapas_ms': {nombre: round(d / 1e6, 3) for nombre, d in zip(ETAPAS, duraciones)},
+        } for total, ciclo, epoch, duraciones in lentos]
+
+    def volcar(self, ruta: str) -> None:
+        """Escribe percentiles y ciclos más lentos en un JSON"""
+        try:
+            directorio = os.path.dirname(ruta)
+            if directorio:
+                os.makedirs(directorio, exist_ok=True)
+            datos = {
+                'ciclos': self.ciclos,
+                'ventana_ciclos': self.ventana_ciclos,
+                'percentiles_ms': self.percentiles(),
+                'ciclos_mas_lentos': self.ciclos_mas_lentos(),
+            }
+            with open(ruta, 'w', encoding='utf-8') as f:
+                json.dump(datos, f, indent=2, ensure_ascii=False)
+            self._log(f"📊 Traza de ciclos guardada en {ruta}")
+        except OSError as e:
+            self._log(f"⚠️ No se pudo guardar la traza en {ruta}: {e}", 'warning')
+
+    def _reportar(self) -> None:
+        percentiles = self.percentiles()
+        partes = [f"{nombre} {p['p50']:.1f}/{p['p95']:.1f}/{p['p99']:.1f}"
+                  for nombre, p in percentiles.items() if p['p99'] > 0]
+        self._log(f"⏱️ Ciclos p50/p95/p99 ms (últimos {self._llenos}): " + " | ".join(partes))
+
+    def _log(self, mensaje: str, nivel: str = 'info', *args):
+        """Helper para loggear (formato %% diferido)"""
+        log_diferido(self.logger, mensaje, nivel, *args)
+
+
+class TrazadorNulo:
+    """Trazador deshabilitado: mismas firmas, sin trabajo"""
+    ciclos = 0
+
+    def iniciar_ciclo(self) -> int:
+        return 0
+
+    def etapa(self, indice: int, t_desde_ns: int) -> int:
+        return 0
+
+    def agregar(self, indice: int, duracion_ns: int) -> None:
+        pass
+
+    def descartar_ciclo(self) -> None:
+        pass
+
+    def finalizar_ciclo(self, ciclo: int) -> None:
+        pass
+
+    def percentiles(self) -> Dict:
+        return {}
+
+    def ciclos_mas_lentos(self) -> List:
+        return []
+
+    def volcar(self, ruta: str) -> None:
+        pass
+
+
+TRAZADOR_NULO = TrazadorNulo()
+
+
+def _percentil_ms(valores_ordenados: List[int], p: float) -> float:
+    indice = min(len(valores_ordenados) - 1, int(p * len(valores_ordenados)))
+    return round(valores_ordenados[indice] / 1e6, 3)
+
+
+def crear_trazador_desde_config(config: Dict, logger=None):
+    """
+    Crea el trazador según la sección 'trazado' del JSON.
+
+    Returns:
+        Trazador si 'trazado.habilitado' es true, TRAZADOR_NULO si no
+    """
+    config_trazado = config.get('trazado', {})
+    if not config_trazado.get('habilitado', False):
+        return TRAZADOR_NULO
+    return Trazador(
+        ventana_ciclos=config_trazado.get('ventana_ciclos', 1000),
+        ciclos_lentos=config_trazado.get('ciclos_lentos', 10),
+        reporte_cada_ciclos=config_trazado.get('reporte_cada_ciclos', 0),
+        logger=logger
+    )
@@ -0,0 +1,341 @@
+"""
+Dashboard web local
+Servidor HTTP embebido con video MJPEG (Superior/Lateral) y resultados
+por Server-Sent Events, para supervisar la línea desde la sala de control
+"""
+
+import json
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, Optional
+
+from utils.lazy_imports import ModuloDiferido
+from utils.logger_prueba import log_diferido
+
+cv2 = ModuloDiferido('cv2')  # solo se necesita al codificar JPEG
+
+
+BOUNDARY = 'frame'
+
+PAGINA_HTML = """<!DOCTYPE html>
+<html lang="es">
+<head>
+<meta charset="utf-8">
+<title>Sistema PLC-YOLO (Dual Cam)</title>
+<style>
+  body { background:#111; color:#ddd; font-family:Consolas, monospace; margin:0; display:flex; }
+  .videos { flex:3; display:flex; flex-direction:column; gap:8px; padding:8px; }
+  .videos img { width:100%; background:#000; }
+  .log { flex:1; padding:8px; height:100vh; overflow-y:auto; font-size:12px; }
+  .ok { color:#6c6; } .qc { color:#fc6; } .parada { color:#f66; }
+</style>
+</head>
+<body>
+<div class="videos">
+  <div>Vista Superior (Posición Y, Conteo Filas, QC)<br><img src="/stream/superior"></div>
+  <div>Vista Lateral (Corrección Z, Seguridad)<br><img src="/stream/lateral"></div>
+</div>
+<div class="log" id="log"></div>
+<script>
+  const log = document.getElementById('log');
+  const clases = {0: 'ok', 1: 'qc', 2: 'parada'};
+  new EventSource('/eventos').onmessage = (e) => {
+    const r = JSON.parse(e.data);
+    const div = document.createElement('div');
+    div.className = clases[r.codigo_respuesta_plc] || '';
+    div.textContent = `[${r.hora}] #${r.ciclo} código=${r.codigo_respuesta_plc} filas=${r.filas} ` +
+                      `Y=${r.desviacion_y_mm.toFixed(2)}mm Z=${r.correccion_z_mm_final.toFixed(2)}mm ${r.log_z}`;
+    log.prepend(div);
+    while (log.childNodes.length > 200) log.removeChild(log.lastChild);
+  };
+</script>
+</body>
+</html>
+"""
+
+
+class CanalMJPEG:
+    """
+    Último JPEG de una cámara, compartido por todos los espectadores.
+
+    Cada frame se reduce y codifica UNA sola vez (en el pool de hilos); si
+    llega un frame mientras otro se codifica, queda pendiente y los
+    intermedios se descartan. Los espectadores esperan por secuencia y
+    siempre reciben el JPEG más reciente.
+    """
+
+    def __init__(self, nombre: str, ancho_max: int, calidad: int, fps_max: float):
+        self.nombre = nombre
+        self.ancho_max = ancho_max
+        self.parametros_jpeg = [int(cv2.IMWRITE_JPEG_QUALITY), int(calidad)]
+        self.periodo_min_s = 1.0 / fps_max if fps_max > 0 else 0.0
+
+        self._cond = threading.Condition()
+        self._jpeg = None
+        self._seq = 0
+        self._pendiente = None
+        self._codificando = False
+        self._t_ultimo = 0.0
+
+        self.frames_codificados = 0
+        self.frames_descartados = 0
+
+    def publicar(self, frame, ejecutor: ThreadPoolExecutor) -> None:
+        """Entrega un frame sin bloquear al llamador"""
+        ahora = time.monotonic()
+        with self._cond:
+            if ahora - self._t_ultimo < self.periodo_min_s:
+                self.frames_descartados += 1
+                return
+            if self._codificando:
+                if self._pendiente is not None:
+                    self.frames_descartados += 1
+                self._pendiente = frame
+                return
+            self._codificando = True
+            self._t_ultimo = ahora
+        ejecutor.submit(self._codificar, frame)
+
+    def _codificar(self, frame) -> None:
+        while frame is not None:
+            try:
+                h, w = frame.shape[:2]
+                if w > self.ancho_max:
+                    nuevo_h = int(h * self.ancho_max / w)
+                    frame = cv2.resize(frame, (self.ancho_max, nuevo_h), interpolation=cv2.INTER_AREA)
+                ok, buffer = cv2.imencode('.jpg', frame, self.parametros_jpeg)
+            except Exception:
+                ok = False
+
+            with self._cond:
+                if ok:
+                    self._jpeg = buffer.tobytes()
+                    self._seq += 1
+                    self.frames_codificados += 1
+                    self._cond.notify_all()
+                frame, self._pendiente = self._pendiente, None
+                if frame is None:
+                    self._codificando = False
+
+    def esperar(self, seq_visto: int, timeout_s: float):
+        """
+        Espera un JPEG más nuevo que 'seq_visto'.
+
+        Returns:
+            (seq, jpeg) o (seq_visto, None) si venció el timeout
+        """
+        with self._cond:
+            if self._seq <= seq_visto:
+                self._cond.wait(timeout_s)
+            if self._seq <= seq_visto:
+                return seq_visto, None
+            return self._seq, self._jpeg
+
+
+class CanalEventos:
+    """Últimos resultados serializados, con secuencia para Server-Sent Events"""
+
+    def __init__(self, capacidad: int = 100):
+        self._cond = threading.Condition()
+        self._eventos = deque(maxlen=capacidad)
+        self._seq = 0
+
+    def publicar(self, datos: Dict) -> None:
+        with self._cond:
+            self._seq += 1
+            self._eventos.append((self._seq, json.dumps(datos, ensure_ascii=False)))
+            self._cond.notify_all()
+
+    def esperar(self, seq_visto: int, timeout_s: float):
+        """Retorna la lista de (seq, json) posteriores a 'seq_visto'"""
+        with self._cond:
+            if self._seq <= seq_visto:
+                self._cond.wait(timeout_s)
+            return [e for e in self._eventos if e[0] > seq_visto]
+
+    @property
+    def ultimo(self) -> Optional[str]:
+        with self._cond:
+            return self._eventos[-1][1] if self._eventos else None
+
+
+class DashboardWeb:
+    """
+    Dashboard HTTP embebido.
+
+    Rutas:
+    - /                    Página con ambas vistas y el registro de resultados
+    - /stream/superior     MJPEG de la cámara Superior
+    - /stream/lateral      MJPEG de la cámara Lateral
+    - /eventos             Resultados como Server-Sent Events
+    - /estado              Último resultado (JSON)
+
+    Se conecta al MotorInspeccion como observador (ver observar()); todas
+    las publicaciones son O(1) y no bloquean el pipeline, sin importar
+    cuántos espectadores haya conectados.
+    """
+
+    def __init__(self, config: Optional[Dict] = None, logger=None):
+        """
+        Args:
+            config: Sección 'dashboard' del JSON
+            logger: Instancia del logger
+        """
+        config = config or {}
+        self.host = config.get('host', '127.0.0.1')
+        self.puerto = config.get('puerto', 8080)
+        self.logger = logger
+
+        ancho_max = config.get('ancho_max_px', 640)
+        calidad = config.get('calidad_jpeg', 70)
+        fps_max = config.get('fps_max', 10)
+        self.canales = {
+            'superior': CanalMJPEG('superior', ancho_max, calidad, fps_max),
+            'lateral': CanalMJPEG('lateral', ancho_max, calidad, fps_max),
+        }
+        self.eventos = CanalEventos(config.get('eventos_max', 100))
+        self._ejecutor = ThreadPoolExecutor(max_workers=config.get('hilos_codificacion', 2),
+                                            thread_name_prefix='DashboardJPEG')
+        self._servidor = None
+        self._hilo = None
+        self._activo = threading.Event()
+
+    # ==================== PUBLICACIÓN (hilo del motor) ====================
+
+    def publicar_frame(self, nombre: str, frame) -> None:
+        if frame is not None and self._activo.is_set():
+            self.canales[nombre].publicar(frame, self._ejecutor)
+
+    def publicar_resultado(self, resultado: Dict, ciclo: int = 0, duracion_ms: float = 0.0) -> None:
+        if not self._activo.is_set():
+            return
+        self.eventos.publicar({
+            'hora': time.strftime("%H:%M:%S"),
+            'ciclo': ciclo,
+            'duracion_ms': round(duracion_ms, 1),
+            'codigo_respuesta_plc': resultado.get('codigo_respuesta_plc', -1),
+            'plc_success': bool(resultado.get('plc_success', False)),
+            'filas': int(resultado.get('filas', 0)),
+            'desviacion_y_mm': float(resultado.get('desviacion_y_mm', 0.0)),
+            'desviacion_y_px': float(resultado.get('desviacion_y_px', 0)),
+            'correccion_z_mm_final': float(resultado.get('correccion_z_mm_final', 0.0)),
+            'log_z': resultado.get('log_z', ''),
+        })
+
+    def observar(self, tipo: str, datos: Dict) -> None:
+        """Observador para MotorInspeccion.agregar_observador()"""
+        if tipo == 'frames':
+            self.publicar_frame('superior', datos['frame_sup'])
+            self.publicar_frame('lateral', datos['frame_lat'])
+        elif tipo == 'resultado':
+            resultado = datos['resultado']
+            self.publicar_frame('superior', resultado.get('annotated_sup'))
+            self.publicar_frame('lateral', resultado.get('annotated_lat'))
+            self.publicar_resultado(resultado, datos.get('ciclo', 0), datos.get('duracion_ms', 0.0))
+
+    # ==================== SERVIDOR ====================
+
+    def iniciar(self) -> bool:
+        """Arranca el servidor HTTP en un hilo propio"""
+        try:
+            self._servidor = ThreadingHTTPServer((self.host, self.puerto), _crear_manejador(self))
+        except OSError as e:
+            self._log(f"❌ No se pudo iniciar el dashboard web en {self.host}:{self.puerto}: {e}", 'error')
+            return False
+        self._servidor.daemon_threads = True
+        self._activo.set()
+        self._hilo = threading.Thread(target=self._servidor.serve_forever, name="DashboardWeb", daemon=True)
+        self._hilo.start()
+        self._log(f"🌐 Dashboard web en http://{self.host}:{self.puerto}/")
+        return True
+
+    def detener(self) -> None:
+        self._activo.clear()
+        if self._servidor:
+            self._servidor.shutdown()
+            self._servidor.server_close()
+            self._servidor = None
+        self._ejecutor.shutdown(wait=False)
+
+    @property
+    def activo(self) -> bool:
+        return self._activo.is_set()
+
+    def _log(self, mensaje: str, nivel: str = 'info', *args):
+        """Helper para loggear (formato %% diferido)"""
+        log_diferido(self.logger, mensaje, nivel, *args)
+
+
+def _crear_manejador(dashboard: DashboardWeb):
+    """Crea la clase de handler HTTP ligada a una instancia del dashboard"""
+
+    class ManejadorDashboard(BaseHTTPRequestHandler):
+        protocol_version = 'HTTP/1.1'
+
+        def log_message(self, formato, *args):
+            pass  # Sin log por petición
+
+        def do_GET(self):
+            ruta = self.path.split('?', 1)[0]
+            if ruta in ('/', '/index.html'):
+                self._responder(200, 'text/html; charset=utf-8', PAGINA_HTML.encode('utf-8'))
+            elif ruta.startswith('/stream/') and ruta[len('/stream/'):] in dashboard.canales:
+                self._stream_mjpeg(dashboard.canales[ruta[len('/stream/'):]])
+            elif ruta == '/eventos':
+                self._stream_eventos()
+            elif ruta == '/estado':
+                cuerpo = (dashboard.eventos.ultimo or '{}').encode('utf-8')
+                self._responder(200, 'application/json; charset=utf-8', cuerpo)
+            else:
+                self._responder(404, 'text/plain; charset=utf-8', b'No encontrado')
+
+        def _responder(self, codigo: int, tipo: str, cuerpo: bytes):
+            self.send_response(codigo)
+            self.send_header('Content-Type', tipo)
+            self.send_header('Content-Length', str(len(cuerpo)))
+            self.end_headers()
+            self.wfile.write(cuerpo)
+
+        def _stream_mjpeg(self, canal: CanalMJPEG):
+            self.send_response(200)
+            self.send_header('Content-Type', f'multipart/x-mixed-replace; boundary={BOUNDARY}')
+            self.send_header('Cache-Control', 'no-cache')
+            self.send_header('Connection', 'close')
+            self.end_headers()
+            seq = 0
+            try:
+                while dashboard.activo:
+                    seq, jpeg = canal.esperar(seq, timeout_s=1.0)
+                    if jpeg is None:
+                        continue
+                    self.wfile.write(f'--{BOUNDARY}\r\nContent-Type: image/jpeg\r\n'
+                                     f'Content-Length: {len(jpeg)}\r\n\r\n'.encode('ascii'))
+                    self.wfile.write(jpeg)
+                    self.wfile.write(b'\r\n')
+            except (BrokenPipeError, ConnectionResetError):
+                pass  # El espectador cerró la conexión
+            self.close_connection = True
+
+        def _stream_eventos(self):
+            self.send_response(200)
+            self.send_header('Content-Type', 'text/event-stream; charset=utf-8')
+            self.send_header('Cache-Control', 'no-cache')
+            self.send_header('Connection', 'close')
+            self.end_headers()
+            seq = 0
+            try:
+                while dashboard.activo:
+                    nuevos = dashboard.eventos.esperar(seq, timeout_s=15.0)
+                    if not nuevos:
+                        self.wfile.write(b': keepalive\n\n')
+                    for seq, datos in nuevos:
+                        self.wfile.write(f'id: {seq}\ndata: {datos}\n\n'.encode('utf-8'))
+                    self.wfile.flush()
+            except (BrokenPipeError, ConnectionResetError):
+                pass
+            self.close_connection = True
+
+    return ManejadorDashboard